@@ -0,0 +1,130 @@
+"""
+条目正文的磁盘存储（按内容寻址，压缩，mmap 读取）
+
+采集到的正文（Reddit 帖子、发布说明、网页段落）大部分在关键词过滤阶段就被丢弃，
+之后也只读取开头一小段；整次运行都把全部正文放在内存里，采集量增长时峰值内存随之增长。
+采集后立即把较长的正文写入本次运行的存储文件（NewsItem.offload），条目只保留句柄和开头的预览：
+- 按内容寻址：键为正文 sha256 的前 16 字节，多个来源转载的相同正文只存一份
+- 每段正文 zlib 压缩后追加到文件末尾，读取时通过 mmap 定位解压，不整体读入文件
+- 最近读取的少量正文解压结果缓存在内存中（LLM 阶段同一条目会被多次读取）
+存储文件只在本次运行中使用，close() 时删除；异常退出留下的旧文件在下次创建时清理
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# 句柄中保留的正文预览长度（过滤、日志等只读开头的场景不需要加载全文）
+PREVIEW_CHARS = 300
+_COMPRESS_LEVEL = 6
+_DECODED_CACHE_ITEMS = 64
+# 超过该时长的遗留存储文件（异常退出未删除）在创建新存储时清理
+_STALE_SECONDS = 86400
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ContentRef:
+    """一段正文的句柄：存储位置、字符数和开头的预览"""
+
+    store: BlobStore
+    key: bytes
+    length: int
+    preview: str
+
+    def load(self) -> str:
+        return self.store.get(self.key)
+
+
+class BlobStore:
+    """线程安全；写入在采集后进行，读取可以来自 LLM 阶段的多个线程"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "w+b")
+        self._size = 0
+        self._map: mmap.mmap | None = None
+        self._index: dict[bytes, tuple[int, int]] = {}
+        self._decoded: OrderedDict[bytes, str] = OrderedDict()
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    @classmethod
+    def create(cls, directory: str) -> BlobStore:
+        """在 directory 下创建本次运行的存储文件，并清理遗留的旧文件"""
+        os.makedirs(directory, exist_ok=True)
+        cutoff = time.time() - _STALE_SECONDS
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.startswith("content-") and name.endswith(".bin"):
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    pass
+        fd, path = tempfile.mkstemp(prefix="content-", suffix=".bin", dir=directory)
+        os.close(fd)
+        return cls(path)
+
+    def put(self, text: str) -> ContentRef:
+        """写入一段正文，返回句柄；相同的正文只存一份"""
+        data = text.encode("utf-8")
+        key = hashlib.sha256(data).digest()[:16]
+        with self._lock:
+            self.raw_bytes += len(data)
+            if key not in self._index:
+                blob = zlib.compress(data, _COMPRESS_LEVEL)
+                self._file.seek(self._size)
+                self._file.write(blob)
+                self._index[key] = (self._size, len(blob))
+                self._size += len(blob)
+                self.stored_bytes += len(blob)
+        return ContentRef(self, key, len(text), text[:PREVIEW_CHARS])
+
+    def get(self, key: bytes) -> str:
+        with self._lock:
+            text = self._decoded.get(key)
+            if text is not None:
+                self._decoded.move_to_end(key)
+                return text
+            offset, size = self._index[key]
+            if self._map is None or offset + size > len(self._map):
+                # 映射之后又有写入：刷新文件后重新映射
+                self._file.flush()
+                if self._map is not None:
+                    self._map.close()
+                self._map = mmap.mmap(self._file.fileno(), self._size, access=mmap.ACCESS_READ)
+            text = zlib.decompress(self._map[offset : offset + size]).decode("utf-8")
+            self._decoded[key] = text
+            if len(self._decoded) > _DECODED_CACHE_ITEMS:
+                self._decoded.popitem(last=False)
+            return text
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "blobs": len(self._index),
+                "raw_bytes": self.raw_bytes,
+                "stored_bytes": self.stored_bytes,
+            }
+
+    def close(self) -> None:
+        """关闭并删除存储文件；之后不能再读取句柄"""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._file.close()
+            self._decoded.clear()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,163 @@
+"""
+单次运行的 LLM 预算
+
+按阶段（相关性判断、相关性判断 + 分类的合并调用、分类、摘要、概览）统计实际发出的请求次数、估算 token 数和耗时：
+- 总预算（token、请求次数、耗时）按 shares 中的比例分给各阶段；预算为 0 表示不限制
+- 某阶段的预算用完后，该阶段后续请求不再发出（抛出 BudgetExceeded），由调用方降级：
+  分类回退到关键词分类，灰色地带条目直接丢弃，摘要改为本地抽取的短摘要
+- 命中响应缓存的请求不计入预算
+- 耗时按阶段第一次请求开始到最后一次请求结束计算（并发请求不重复计时），
+  另外整次运行从第一次请求开始不超过总耗时预算
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from config import Settings
+
+STAGES = ("relevance", "relevance_classify", "classify", "summary", "overview")
+DEFAULT_SHARES = {
+    "relevance": 0.1,
+    "relevance_classify": 0.3,
+    "classify": 0.1,
+    "summary": 0.4,
+    "overview": 0.1,
+}
+
+
+class BudgetExceeded(Exception):
+    """阶段预算已用完，请求没有发出"""
+
+    def __init__(self, stage: str, resource: str) -> None:
+        super().__init__(f"LLM {stage} budget exhausted ({resource})")
+        self.stage = stage
+        self.resource = resource
+
+
+@dataclass
+class StageUsage:
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    denied: int = 0  # 因预算用完没有发出的请求数
+    started: float | None = None
+    finished: float | None = None
+
+    @property
+    def tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def seconds(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class RunBudget:
+    """线程安全；一次运行一个实例（随 LLMRouter 创建）"""
+
+    def __init__(
+        self,
+        max_tokens: int = 0,
+        max_calls: int = 0,
+        max_seconds: float = 0,
+        shares: dict[str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.max_calls = max_calls
+        self.max_seconds = max_seconds
+        self.shares = dict(DEFAULT_SHARES if shares is None else shares)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._usage: dict[str, StageUsage] = {}
+        self._started: float | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> RunBudget:
+        return cls(
+            max_tokens=settings.llm_budget_tokens,
+            max_calls=settings.llm_budget_calls,
+            max_seconds=settings.llm_budget_seconds,
+            shares=settings.llm_budget_shares,
+        )
+
+    def limits(self, stage: str) -> dict[str, float]:
+        """阶段的预算上限（0 表示不限制）；未配置比例的阶段只受总预算限制"""
+        share = self.shares.get(stage, 1.0)
+        return {
+            "tokens": int(self.max_tokens * share),
+            "calls": max(1, int(self.max_calls * share)) if self.max_calls else 0,
+            "seconds": self.max_seconds * share,
+        }
+
+    def reserve(self, stage: str, input_tokens: int) -> None:
+        """发出请求前调用：预算允许时计入一次请求和输入 token，否则抛出 BudgetExceeded"""
+        now = self._clock()
+        limits = self.limits(stage)
+        with self._lock:
+            usage = self._usage.setdefault(stage, StageUsage())
+            exceeded = None
+            if limits["calls"] and usage.calls >= limits["calls"]:
+                exceeded = "calls"
+            elif limits["tokens"] and usage.tokens + input_tokens > limits["tokens"]:
+                exceeded = "tokens"
+            elif limits["seconds"] and usage.started is not None:
+                if now - usage.started > limits["seconds"]:
+                    exceeded = "time"
+            if exceeded is None and self.max_seconds and self._started is not None:
+                if now - self._started > self.max_seconds:
+                    exceeded = "time"
+            if exceeded is not None:
+                usage.denied += 1
+                raise BudgetExceeded(stage, exceeded)
+            usage.calls += 1
+            usage.input_tokens += input_tokens
+            if usage.started is None:
+                usage.started = now
+            if self._started is None:
+                self._started = now
+
+    def record(self, stage: str, output_tokens: int) -> None:
+        """请求结束（成功或失败）后调用"""
+        now = self._clock()
+        with self._lock:
+            usage = self._usage.setdefault(stage, StageUsage())
+            usage.output_tokens += output_tokens
+            usage.finished = now
+
+    def exhausted(self, stage: str) -> bool:
+        """是否已有请求因预算用完被拒绝"""
+        with self._lock:
+            usage = self._usage.get(stage)
+            return usage is not None and usage.denied > 0
+
+    def usage(self) -> list[dict]:
+        """各阶段用量（用于日志和日报），按 STAGES 顺序，其后是其他阶段"""
+        with self._lock:
+            stages = [s for s in STAGES if s in self._usage]
+            stages += [s for s in self._usage if s not in STAGES]
+            rows = []
+            for stage in stages:
+                usage = self._usage[stage]
+                limits = self.limits(stage)
+                rows.append(
+                    {
+                        "stage": stage,
+                        "calls": usage.calls,
+                        "tokens": usage.tokens,
+                        "seconds": round(usage.seconds, 1),
+                        "denied": usage.denied,
+                        "max_calls": limits["calls"],
+                        "max_tokens": limits["tokens"],
+                        "max_seconds": round(limits["seconds"], 1),
+                    }
+                )
+            return rows
@@ -0,0 +1,235 @@
+"""
+本地相关性/分类模型（LLM 之前的第一级）
+
+用历史 LLM 判定结果增量训练的轻量线性模型，只用 CPU：
+- 特征：标题与正文的英文词、中文 2-gram（复用 dedup.content_features），标题相邻词对、来源类型，
+  哈希到 2^18 个桶，二值特征按 1/sqrt(n) 归一化
+- 模型：多分类逻辑回归（softmax），每条标注做一次 SGD 更新；相关性、分类各一个模型
+- 标注数达到 min_labels 且预测概率不低于 threshold 时才在本地决定，其余条目交给 LLM；
+  另按 audit_rate 抽取一部分高置信条目照常交给 LLM，持续校验并补充训练数据
+
+LLM 的每次判定追加到标注日志（JSONL），scripts/eval_local_classifier.py 按时间顺序回放日志，
+离线评估本地模型与 LLM 的一致率和可在本地处理的比例。
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import zlib
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from dedup import content_features
+
+if TYPE_CHECKING:
+    from models import NewsItem
+
+_BUCKETS = 1 << 18
+_LATIN_WORD = re.compile(r"[a-z0-9]+")
+# 正文只取开头部分（与 LLM prompt 中看到的内容大致相当）
+_CONTENT_CHARS = 1000
+_LEARNING_RATE = 1.0
+# 标注日志中保存的正文长度
+_LOG_CONTENT_CHARS = 1000
+
+
+def _bucket(feature: str) -> int:
+    return zlib.crc32(feature.encode("utf-8")) % _BUCKETS
+
+
+def text_features(title: str, content: str, source_type: str = "") -> list[int]:
+    """条目的哈希特征（去重后排序的桶编号）"""
+    features = {f"t:{f}" for f in content_features(title)}
+    words = _LATIN_WORD.findall(title.lower())
+    features.update(f"tb:{a} {b}" for a, b in zip(words, words[1:], strict=False))
+    features.update(f"c:{f}" for f in content_features(content[:_CONTENT_CHARS]))
+    if source_type:
+        features.add(f"s:{source_type}")
+    return sorted({_bucket(f) for f in features})
+
+
+def item_features(item: NewsItem) -> list[int]:
+    return text_features(item.title, item.content, item.source_type)
+
+
+class LinearModel:
+    """哈希特征上的多分类逻辑回归，标签在第一次出现时加入"""
+
+    def __init__(self) -> None:
+        self.labels: list[str] = []
+        self.bias: dict[str, float] = {}
+        self.weights: dict[str, dict[int, float]] = {}
+        self.examples = 0
+
+    def predict_proba(self, features: list[int]) -> dict[str, float]:
+        if not self.labels:
+            return {}
+        scale = 1 / math.sqrt(len(features)) if features else 0.0
+        logits = {}
+        for label in self.labels:
+            weights = self.weights[label]
+            logits[label] = self.bias[label] + scale * sum(weights.get(f, 0.0) for f in features)
+        top = max(logits.values())
+        exp = {label: math.exp(v - top) for label, v in logits.items()}
+        total = sum(exp.values())
+        return {label: v / total for label, v in exp.items()}
+
+    def predict(self, features: list[int]) -> tuple[str | None, float]:
+        """返回 (最可能的标签, 概率)；只见过一种标签时概率按 0 处理（无法区分）"""
+        proba = self.predict_proba(features)
+        if len(proba) < 2:
+            return None, 0.0
+        label = max(proba, key=proba.__getitem__)
+        return label, proba[label]
+
+    def update(self, features: list[int], label: str) -> None:
+        """一次 SGD 更新（交叉熵损失）"""
+        if label not in self.bias:
+            self.labels.append(label)
+            self.bias[label] = 0.0
+            self.weights[label] = {}
+        proba = self.predict_proba(features)
+        scale = 1 / math.sqrt(len(features)) if features else 0.0
+        for name in self.labels:
+            gradient = proba[name] - (1.0 if name == label else 0.0)
+            if abs(gradient) < 1e-6:
+                continue
+            self.bias[name] -= _LEARNING_RATE * gradient
+            step = _LEARNING_RATE * gradient * scale
+            weights = self.weights[name]
+            for f in features:
+                weights[f] = weights.get(f, 0.0) - step
+        self.examples += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "examples": self.examples,
+            "labels": {
+                label: {
+                    "bias": round(self.bias[label], 6),
+                    "weights": {str(f): round(w, 6) for f, w in self.weights[label].items()},
+                }
+                for label in self.labels
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> LinearModel:
+        model = cls()
+        model.examples = data.get("examples", 0)
+        for label, params in data.get("labels", {}).items():
+            model.labels.append(label)
+            model.bias[label] = params["bias"]
+            model.weights[label] = {int(f): w for f, w in params["weights"].items()}
+        return model
+
+
+class LocalClassifier:
+    """
+    相关性 + 分类的本地模型
+    judge_relevance / classify 返回 None 表示没有把握，需要交给 LLM
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        min_labels: int = 300,
+        audit_rate: float = 0.05,
+        label_log_path: str | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.min_labels = min_labels
+        self.audit_rate = audit_rate
+        self.label_log_path = label_log_path
+        self.relevance = LinearModel()
+        self.category = LinearModel()
+        # 本次运行新增、尚未写入标注日志的 LLM 判定
+        self._pending_labels: list[dict] = []
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> LocalClassifier:
+        """加载模型参数；文件不存在时从空模型开始"""
+        classifier = cls(**kwargs)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            classifier.relevance = LinearModel.from_dict(data.get("relevance", {}))
+            classifier.category = LinearModel.from_dict(data.get("category", {}))
+        return classifier
+
+    def save(self, path: str) -> None:
+        """保存模型参数（原子替换），并把本次运行的 LLM 判定追加到标注日志"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"relevance": self.relevance.to_dict(), "category": self.category.to_dict()}, f
+            )
+        os.replace(tmp, path)
+        if self.label_log_path and self._pending_labels:
+            append_labels(self.label_log_path, self._pending_labels)
+        self._pending_labels = []
+
+    def judge_relevance(self, features: list[int]) -> bool | None:
+        label = self._confident(self.relevance, features)
+        return None if label is None else label == "relevant"
+
+    def classify(self, features: list[int]) -> str | None:
+        return self._confident(self.category, features)
+
+    def audit(self, item: NewsItem) -> bool:
+        """是否抽查该条目（按标题哈希抽样，同一条目每次结果相同）"""
+        return zlib.crc32(item.title.encode("utf-8")) % 10_000 < self.audit_rate * 10_000
+
+    def learn(self, item: NewsItem, relevant: bool | None, category: str | None) -> None:
+        """记录一条 LLM 判定并增量训练；relevant / category 为 None 表示该项没有判定"""
+        if relevant is None and category is None:
+            return
+        features = item_features(item)
+        if relevant is not None:
+            self.relevance.update(features, "relevant" if relevant else "irrelevant")
+        if category is not None:
+            self.category.update(features, category)
+        self._pending_labels.append(label_record(item, relevant, category))
+
+    def _confident(self, model: LinearModel, features: list[int]) -> str | None:
+        if model.examples < self.min_labels:
+            return None
+        label, probability = model.predict(features)
+        return label if probability >= self.threshold else None
+
+
+def label_record(item: NewsItem, relevant: bool | None, category: str | None) -> dict:
+    """标注日志中的一行"""
+    return {
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "fingerprint": item.fingerprint,
+        "source_type": item.source_type,
+        "title": item.title,
+        "content": item.content_prefix(_LOG_CONTENT_CHARS),
+        "relevant": relevant,
+        "category": category,
+    }
+
+
+def append_labels(path: str, records: Iterable[dict]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def read_labels(path: str) -> Iterator[dict]:
+    """按写入顺序读取标注日志，跳过损坏的行"""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
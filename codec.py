@@ -0,0 +1,458 @@
+"""
+NewsItem 批量二进制编码（带版本号、按 schema 分列存储）
+
+用于把一批条目写入文件或在进程间传递。逐条 JSON 每条都重复键名、日期要格式化再解析；
+pickle 与类定义绑定、不能安全地读取外部数据。这里按列存储，一帧（batch_size 条）为单位：
+
+    文件头  MAGIC(4) | 版本 u16 | schema 长度 u16 | schema（JSON：[[字段名, 列类型], ...]）| 填充
+    帧      负载长度 u32 | 条数 u32 | 各列（按 schema 顺序）
+    列      列长度 u32 | 填充 | 列数据 | 填充（列数据从 8 字节对齐处开始）
+
+列类型（整数、浮点均为小端序）：
+- f64:   float64 数组（raw_score、score）
+- time:  int64 UTC 微秒 + int32 时区偏移秒数（无时区的为 _NAIVE），还原后时刻和偏移不变
+- str:   字节偏移 uint32[n+1]（含非 ASCII 字符时另有字符偏移 uint32[n+1]）+ UTF-8 数据
+- dict:  低基数字符串（来源、类别、作者）：int32 编码（-1 为 None）+ 字典（str 列）
+- tags:  每条的标签数偏移 uint32[n+1] + 展开后的 dict 列
+- pairs: related：每条的对数偏移 uint32[n+1] + 来源（dict 列）+ 链接（str 列）
+
+- 流式：write_items 按帧写入，read_items 逐帧读取，内存中只有一帧
+- 零拷贝：BatchView 直接在缓冲区（bytes、mmap）上读取，数值列是 np.frombuffer 视图，
+  字符串只解码用到的那一条；整列解码时每列只调用一次 UTF-8 解码，再按字符偏移切片
+- 兼容：按字段名读取，不认识的列跳过，缺少的列取字段默认值；布局变化时增加 FORMAT_VERSION
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from collections.abc import Iterable, Iterator
+from dataclasses import MISSING, fields
+from datetime import datetime, timedelta, timezone
+from itertools import starmap
+from typing import BinaryIO
+
+import numpy as np
+
+from models import NewsItem
+
+MAGIC = b"NIB\x00"
+FORMAT_VERSION = 1
+DEFAULT_BATCH_SIZE = 4096
+
+# 与 NewsItem 的字段顺序一致（解码时按位置构造条目）
+SCHEMA: tuple[tuple[str, str], ...] = (
+    ("title", "str"),
+    ("url", "str"),
+    ("source", "dict"),
+    ("source_type", "dict"),
+    ("content", "str"),
+    ("published_at", "time"),
+    ("author", "dict"),
+    ("tags", "tags"),
+    ("raw_score", "f64"),
+    ("fingerprint", "str"),
+    ("category", "dict"),
+    ("score", "f64"),
+    ("summary", "str"),
+    ("related", "pairs"),
+)
+
+_U32 = struct.Struct("<I")
+_PREAMBLE = struct.Struct("<4sHH")
+_FRAME = struct.Struct("<II")
+_ALIGN = 8
+_MAX_U32 = 0xFFFFFFFF
+_NAIVE = -(2**31)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_SECOND = timedelta(seconds=1)
+_FIELDS = {f.name: f.default for f in fields(NewsItem)}
+
+
+class CodecError(ValueError):
+    """数据不是本格式、版本不支持或已损坏"""
+
+
+def _pad(size: int) -> int:
+    return -size % _ALIGN
+
+
+# ---------- 编码 ----------
+
+
+def _offsets(lengths: Iterable[int], n: int) -> bytes:
+    offsets = np.zeros(n + 1, dtype="<u8")
+    np.cumsum(np.fromiter(lengths, dtype="<u8", count=n), out=offsets[1:])
+    if offsets[-1] > _MAX_U32:
+        raise CodecError("column larger than 4 GiB; use a smaller batch_size")
+    return offsets.astype("<u4").tobytes()
+
+
+def _encode_str(values: list[str]) -> bytes:
+    encoded = [value.encode("utf-8") for value in values]
+    n = len(values)
+    parts = [b"", bytes(_ALIGN - 1), _offsets(map(len, encoded), n)]
+    char_count = sum(map(len, values))
+    byte_count = sum(map(len, encoded))
+    if char_count == byte_count:
+        parts[0] = b"\1"  # 纯 ASCII：字符偏移与字节偏移相同
+    else:
+        parts[0] = b"\0"
+        parts.append(_offsets(map(len, values), n))
+    parts.extend(encoded)
+    return b"".join(parts)
+
+
+def _encode_dict(values: Iterable[str | None]) -> bytes:
+    codes_by_value: dict[str, int] = {}
+    codes = np.fromiter(
+        (-1 if v is None else codes_by_value.setdefault(v, len(codes_by_value)) for v in values),
+        dtype="<i4",
+    )
+    header = _U32.pack(len(codes_by_value)) + bytes(4)
+    return header + codes.tobytes() + _encode_str(list(codes_by_value))
+
+
+def _encode_pairs(pairs: list[tuple[str, str]]) -> bytes:
+    sources = _encode_dict(source for source, _ in pairs)
+    return (
+        _U32.pack(len(sources))
+        + bytes(4)
+        + sources
+        + bytes(_pad(len(sources)))
+        + _encode_str([url for _, url in pairs])
+    )
+
+
+def _encode_column(kind: str, values: list) -> bytes:
+    if kind == "str":
+        return _encode_str(values)
+    if kind == "dict":
+        return _encode_dict(values)
+    if kind == "f64":
+        return np.asarray(values, dtype="<f8").tobytes()
+    if kind == "time":
+        n = len(values)
+        micros = np.fromiter(
+            (
+                ((v if v.tzinfo else v.replace(tzinfo=timezone.utc)) - _EPOCH) // _MICROSECOND
+                for v in values
+            ),
+            dtype="<i8",
+            count=n,
+        )
+        offsets = np.fromiter(
+            (_NAIVE if v.tzinfo is None else v.utcoffset() // _SECOND for v in values),
+            dtype="<i4",
+            count=n,
+        )
+        return micros.tobytes() + offsets.tobytes()
+    # tags / pairs：每条的元素数偏移 + 展开后的元素
+    flat = [value for group in values for value in group]
+    encode_flat = _encode_dict if kind == "tags" else _encode_pairs
+    return _offsets(map(len, values), len(values)) + encode_flat(flat)
+
+
+def encode_header() -> bytes:
+    schema = json.dumps(SCHEMA, separators=(",", ":")).encode("utf-8")
+    header = _PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(schema)) + schema
+    return header + bytes(_pad(len(header)))
+
+
+def encode_frame(items: list[NewsItem]) -> bytes:
+    """一帧：帧头 + 各列（正文已移入 BlobStore 的条目会加载全文写入）"""
+    parts = []
+    for name, kind in SCHEMA:
+        column = _encode_column(kind, [getattr(item, name) for item in items])
+        parts += [_U32.pack(len(column)), bytes(4), column, bytes(_pad(len(column)))]
+    payload = b"".join(parts)
+    if len(payload) > _MAX_U32:
+        raise CodecError("frame larger than 4 GiB; use a smaller batch_size")
+    return _FRAME.pack(len(payload), len(items)) + payload
+
+
+def _encode_stream(items: Iterable[NewsItem], batch_size: int) -> Iterator[tuple[bytes, int]]:
+    yield encode_header(), 0
+    batch: list[NewsItem] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield encode_frame(batch), len(batch)
+            batch = []
+    if batch:
+        yield encode_frame(batch), len(batch)
+
+
+def encode(items: Iterable[NewsItem], batch_size: int = DEFAULT_BATCH_SIZE) -> bytes:
+    return b"".join(chunk for chunk, _ in _encode_stream(items, batch_size))
+
+
+def write_items(
+    stream: BinaryIO, items: Iterable[NewsItem], batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """把条目按每 batch_size 条一帧写入 stream（含文件头），返回条数；items 可以是生成器"""
+    count = 0
+    for chunk, n in _encode_stream(items, batch_size):
+        stream.write(chunk)
+        count += n
+    return count
+
+
+# ---------- 解码 ----------
+
+
+def _array(buf: memoryview, dtype: str, count: int, offset: int) -> np.ndarray:
+    try:
+        return np.frombuffer(buf, dtype=dtype, count=count, offset=offset)
+    except ValueError as e:
+        raise CodecError("truncated column") from e
+
+
+class _StrColumn:
+    def __init__(self, buf: memoryview, n: int) -> None:
+        if not len(buf):
+            raise CodecError("truncated column")
+        self.byte_offsets = _array(buf, "<u4", n + 1, _ALIGN)
+        start = _ALIGN + 4 * (n + 1)
+        if buf[0]:
+            self.char_offsets = self.byte_offsets
+        else:
+            self.char_offsets = _array(buf, "<u4", n + 1, start)
+            start += 4 * (n + 1)
+        self.data = buf[start:]
+        if len(self.data) < self.byte_offsets[-1]:
+            raise CodecError("truncated column")
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.data[self.byte_offsets[i] : self.byte_offsets[i + 1]], "utf-8")
+
+    def to_list(self) -> list[str]:
+        text = str(self.data[: self.byte_offsets[-1]], "utf-8")
+        offsets = self.char_offsets.tolist()
+        return [text[a:b] for a, b in zip(offsets, offsets[1:], strict=False)]
+
+
+class _DictColumn:
+    def __init__(self, buf: memoryview, n: int) -> None:
+        size = int(_array(buf, "<u4", 1, 0)[0])
+        self.codes = _array(buf, "<i4", n, _ALIGN)
+        # 同一帧内相同的值共用一个字符串对象；不驻留（作者等高基数列驻留后会常驻解释器），
+        # 构造条目时由 NewsItem.__post_init__ 驻留低基数字段
+        self.values = _StrColumn(buf[_ALIGN + 4 * n :], size).to_list()
+
+    def __getitem__(self, i: int) -> str | None:
+        code = self.codes[i]
+        return None if code < 0 else self.values[code]
+
+    def to_list(self) -> list[str | None]:
+        lookup = [*self.values, None]  # 编码 -1 取到末尾的 None
+        return [lookup[code] for code in self.codes.tolist()]
+
+
+class _F64Column:
+    def __init__(self, buf: memoryview, n: int) -> None:
+        self.array = _array(buf, "<f8", n, 0)
+
+    def __getitem__(self, i: int) -> float:
+        return float(self.array[i])
+
+    def to_list(self) -> list[float]:
+        return self.array.tolist()
+
+
+class _TimeColumn:
+    def __init__(self, buf: memoryview, n: int) -> None:
+        self.array = _array(buf, "<i8", n, 0)
+        self.offsets = _array(buf, "<i4", n, 8 * n)
+        self._zones: dict[int, timezone] = {0: timezone.utc}
+
+    def _value(self, micros: int, offset: int) -> datetime:
+        if offset == _NAIVE:
+            return _EPOCH_NAIVE + timedelta(microseconds=micros)
+        value = _EPOCH + timedelta(microseconds=micros)
+        if offset:
+            zone = self._zones.get(offset)
+            if zone is None:
+                zone = self._zones[offset] = timezone(timedelta(seconds=offset))
+            value = value.astimezone(zone)
+        return value
+
+    def __getitem__(self, i: int) -> datetime:
+        return self._value(int(self.array[i]), int(self.offsets[i]))
+
+    def to_list(self) -> list[datetime]:
+        return list(
+            starmap(self._value, zip(self.array.tolist(), self.offsets.tolist(), strict=True))
+        )
+
+
+class _ListColumn:
+    def __init__(self, buf: memoryview, n: int, kind: str) -> None:
+        self.offsets = _array(buf, "<u4", n + 1, 0)
+        flat = int(self.offsets[-1])
+        rest = buf[4 * (n + 1) :]
+        if kind == "tags":
+            self.values = _DictColumn(rest, flat)
+            self._pair = False
+        else:
+            size = int(_array(rest, "<u4", 1, 0)[0])
+            self.values = _DictColumn(rest[_ALIGN : _ALIGN + size], flat)
+            self.urls = _StrColumn(rest[_ALIGN + size + _pad(size) :], flat)
+            self._pair = True
+
+    def __getitem__(self, i: int) -> tuple:
+        a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+        if self._pair:
+            return tuple((self.values[j], self.urls[j]) for j in range(a, b))
+        return tuple(self.values[j] for j in range(a, b))
+
+    def to_list(self) -> list[tuple]:
+        flat = self.values.to_list()
+        if self._pair:
+            flat = list(zip(flat, self.urls.to_list(), strict=True))
+        offsets = self.offsets.tolist()
+        return [
+            tuple(flat[a:b]) if a != b else () for a, b in zip(offsets, offsets[1:], strict=False)
+        ]
+
+
+def _parse_column(kind: str, buf: memoryview, n: int):
+    if kind == "str":
+        return _StrColumn(buf, n)
+    if kind == "dict":
+        return _DictColumn(buf, n)
+    if kind == "f64":
+        return _F64Column(buf, n)
+    if kind == "time":
+        return _TimeColumn(buf, n)
+    return _ListColumn(buf, n, kind)
+
+
+class BatchView:
+    """
+    一帧的只读视图，直接引用底层缓冲区（不复制）；各列在第一次访问时解析
+    缓冲区（如 mmap）在视图使用期间须保持打开
+    """
+
+    def __init__(self, payload: memoryview, count: int, schema: list[tuple[str, str]]) -> None:
+        self.count = count
+        self._raw: dict[str, tuple[str, memoryview]] = {}
+        self._columns: dict[str, object] = {}
+        known = dict(SCHEMA)
+        pos = 0
+        for name, kind in schema:
+            if pos + _ALIGN > len(payload):
+                raise CodecError("truncated frame")
+            (length,) = _U32.unpack_from(payload, pos)
+            start = pos + _ALIGN
+            if start + length > len(payload):
+                raise CodecError("truncated frame")
+            if known.get(name) == kind:
+                self._raw[name] = (kind, payload[start : start + length])
+            pos = start + length + _pad(length)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _column(self, name: str):
+        column = self._columns.get(name)
+        if column is None:
+            if name not in self._raw:
+                raise KeyError(name)
+            kind, buf = self._raw[name]
+            column = self._columns[name] = _parse_column(kind, buf, self.count)
+        return column
+
+    def array(self, name: str) -> np.ndarray:
+        """数值列的 NumPy 视图（不复制）：f64 列为浮点数，published_at 为 UTC 微秒时间戳"""
+        column = self._column(name)
+        if not isinstance(column, _F64Column | _TimeColumn):
+            raise TypeError(f"{name} is not a numeric column")
+        return column.array
+
+    def value(self, name: str, i: int):
+        """第 i 条的一个字段，只解码这一个值；缺少的列返回字段默认值"""
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        if name not in self._raw:
+            return self._default(name)
+        return self._column(name)[i]
+
+    def values(self, name: str) -> list:
+        """整列的值"""
+        if name not in self._raw:
+            return [self._default(name)] * self.count
+        return self._column(name).to_list()
+
+    def item(self, i: int) -> NewsItem:
+        return NewsItem(*(self.value(name, i) for name in _FIELDS))
+
+    def items(self) -> list[NewsItem]:
+        return list(starmap(NewsItem, zip(*map(self.values, _FIELDS), strict=True)))
+
+    @staticmethod
+    def _default(name: str):
+        default = _FIELDS[name]
+        if default is MISSING:
+            raise CodecError(f"required field {name!r} missing from data")
+        return default
+
+
+def _parse_header(buf: memoryview) -> tuple[list[tuple[str, str]], int]:
+    if len(buf) < _PREAMBLE.size:
+        raise CodecError("not a NewsItem batch stream")
+    magic, version, size = _PREAMBLE.unpack_from(buf)
+    if magic != MAGIC:
+        raise CodecError("not a NewsItem batch stream")
+    if version != FORMAT_VERSION:
+        raise CodecError(f"unsupported format version {version} (expected {FORMAT_VERSION})")
+    end = _PREAMBLE.size + size
+    try:
+        schema = [
+            (str(name), str(kind)) for name, kind in json.loads(bytes(buf[_PREAMBLE.size : end]))
+        ]
+    except (ValueError, TypeError) as e:
+        raise CodecError("corrupt schema") from e
+    return schema, end + _pad(end)
+
+
+def iter_batches(data: bytes | bytearray | memoryview) -> Iterator[BatchView]:
+    """在完整的缓冲区（bytes、mmap 等）上逐帧返回视图，不复制数据"""
+    buf = memoryview(data).cast("B")
+    schema, pos = _parse_header(buf)
+    while pos < len(buf):
+        if pos + _FRAME.size > len(buf):
+            raise CodecError("truncated frame header")
+        length, count = _FRAME.unpack_from(buf, pos)
+        start = pos + _FRAME.size
+        if start + length > len(buf):
+            raise CodecError("truncated frame")
+        yield BatchView(buf[start : start + length], count, schema)
+        pos = start + length
+
+
+def decode(data: bytes | bytearray | memoryview) -> list[NewsItem]:
+    return [item for batch in iter_batches(data) for item in batch.items()]
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise CodecError("unexpected end of stream")
+    return data
+
+
+def read_items(stream: BinaryIO) -> Iterator[NewsItem]:
+    """从 stream 逐帧读取条目（内存中每次只有一帧）"""
+    preamble = _read_exact(stream, _PREAMBLE.size)
+    size = _PREAMBLE.unpack(preamble)[2] if preamble[:4] == MAGIC else 0
+    header = preamble + _read_exact(stream, size)
+    header += _read_exact(stream, _pad(len(header)))
+    schema, _ = _parse_header(memoryview(header))
+    while frame := stream.read(_FRAME.size):
+        if len(frame) != _FRAME.size:
+            raise CodecError("truncated frame header")
+        length, count = _FRAME.unpack(frame)
+        yield from BatchView(memoryview(_read_exact(stream, length)), count, schema).items()
@@ -13,6 +13,7 @@ import yaml
 from bs4 import BeautifulSoup
 from dateutil import parser as date_parser
 
+from keywords import load_keyword_matcher
 from models import NewsItem
 
 logger = logging.getLogger(__name__)
@@ -31,11 +32,35 @@ class BaseCollector:
         return hashlib.sha256(base.encode("utf-8")).hexdigest()
 
 
+def discover_hub(feed, feed_url: str) -> tuple[str, str] | None:
+    """从 feed 的 <link rel="hub"> 中发现 WebSub hub，返回 (hub, topic)"""
+    links = feed.get("feed", {}).get("links", [])
+    hub = next((link.get("href") for link in links if link.get("rel") == "hub"), None)
+    if not hub:
+        return None
+    topic = next((link.get("href") for link in links if link.get("rel") == "self"), None)
+    return hub, topic or feed_url
+
+
 class RSSCollector(BaseCollector):
     source_type = "rss"
 
-    def __init__(self, sources_path: str) -> None:
+    # RSS 来源权威度映射
+    source_authority = {
+        "arXiv cs.AI": 0.7,
+        "arXiv cs.LG": 0.7,
+        "MIT Tech Review AI": 0.65,
+        "VentureBeat AI": 0.6,
+        "Hacker News": 0.55,
+        "机器之心": 0.65,  # 国内AI领域权威媒体
+    }
+
+    def __init__(self, sources_path: str, skip_urls: set[str] | None = None) -> None:
         self.sources_path = sources_path
+        # 已通过 WebSub 推送订阅的 feed，不再轮询
+        self.skip_urls = skip_urls or set()
+        # 采集过程中发现的 WebSub hub: 来源名 -> (hub, topic, feed url)
+        self.discovered_hubs: dict[str, tuple[str, str, str]] = {}
 
     def collect(self) -> list[NewsItem]:
         try:
@@ -45,77 +70,21 @@ class RSSCollector(BaseCollector):
             logger.error(f"Failed to load RSS sources: {e}")
             return []
 
-        # RSS 来源权威度映射
-        source_authority = {
-            "arXiv cs.AI": 0.7,
-            "arXiv cs.LG": 0.7,
-            "MIT Tech Review AI": 0.65,
-            "VentureBeat AI": 0.6,
-            "Hacker News": 0.55,
-            "机器之心": 0.65,  # 国内AI领域权威媒体
-        }
-
-        # AI关键词列表（用于Hacker News过滤）
-        ai_keywords = [
-            "ai",
-            "artificial intelligence",
-            "machine learning",
-            "deep learning",
-            "llm",
-            "gpt",
-            "neural network",
-            "transformer",
-            "diffusion",
-            "agent",
-            "openai",
-            "anthropic",
-            "chatgpt",
-            "claude",
-            "gemini",
-            "pytorch",
-            "tensorflow",
-            "hugging face",
-            "langchain",
-            "computer vision",
-            "nlp",
-            "natural language",
-            "reinforcement learning",
-        ]
-
         items: list[NewsItem] = []
         for src in sources:
+            if src["url"] in self.skip_urls:
+                logger.info(f"Skip polling {src['name']}: delivered via WebSub")
+                continue
             try:
                 feed = feedparser.parse(src["url"])
+                hub = discover_hub(feed, src["url"])
+                if hub:
+                    self.discovered_hubs[src["name"]] = (*hub, src["url"])
                 for entry in feed.entries[:50]:
                     try:
-                        published_at = self._parse_datetime(
-                            entry.get("published") or entry.get("updated")
-                        )
-                        content = entry.get("summary", "") or entry.get("description", "")
-                        title = entry.get("title", "").strip()
-
-                        # 对Hacker News进行关键词过滤
-                        if src["name"] == "Hacker News":
-                            combined_text = f"{title} {content}".lower()
-                            if not any(keyword in combined_text for keyword in ai_keywords):
-                                continue  # 跳过不包含AI关键词的新闻
-
-                        # 根据来源权威度设置 raw_score
-                        raw_score = source_authority.get(src["name"], 0.5)
-
-                        item = NewsItem(
-                            title=title,
-                            url=entry.get("link", "").strip(),
-                            source=src["name"],
-                            source_type=self.source_type,
-                            content=self._clean_text(content),
-                            published_at=published_at,
-                            author=entry.get("author"),
-                            tags=[t["term"] for t in entry.get("tags", []) if "term" in t],
-                            raw_score=raw_score,
-                        )
-                        item.fingerprint = self._fingerprint(item)
-                        items.append(item)
+                        item = self.entry_to_item(entry, src["name"])
+                        if item:
+                            items.append(item)
                     except Exception as e:
                         logger.warning(f"Failed to parse RSS entry from {src['name']}: {e}")
                         continue
@@ -124,6 +93,35 @@ class RSSCollector(BaseCollector):
                 continue
         return items
 
+    def entry_to_item(self, entry: dict, source_name: str) -> NewsItem | None:
+        """将 feedparser 条目转换为 NewsItem，被过滤时返回 None"""
+        published_at = self._parse_datetime(entry.get("published") or entry.get("updated"))
+        content = entry.get("summary", "") or entry.get("description", "")
+        title = entry.get("title", "").strip()
+
+        # 对Hacker News进行关键词过滤
+        if source_name == "Hacker News":
+            hits = load_keyword_matcher().scan(f"{title} {content}")
+            if "hacker_news" not in hits:
+                return None  # 跳过不包含AI关键词的新闻（关键词见 keywords.yaml）
+
+        # 根据来源权威度设置 raw_score
+        raw_score = self.source_authority.get(source_name, 0.5)
+
+        item = NewsItem(
+            title=title,
+            url=entry.get("link", "").strip(),
+            source=source_name,
+            source_type=self.source_type,
+            content=self._clean_text(content),
+            published_at=published_at,
+            author=entry.get("author"),
+            tags=tuple(t["term"] for t in entry.get("tags", []) if "term" in t),
+            raw_score=raw_score,
+        )
+        item.fingerprint = self._fingerprint(item)
+        return item
+
     def _parse_datetime(self, raw: str | None) -> datetime:
         if not raw:
             return datetime.now(timezone.utc)
@@ -139,6 +137,9 @@ class RSSCollector(BaseCollector):
 
 class GitHubCollector(BaseCollector):
     source_type = "github"
+    # 请求地址（压测时可指向本地模拟服务）
+    web_base = "https://github.com"
+    api_base = "https://api.github.com"
 
     def __init__(self, sources_path: str, github_token: str | None) -> None:
         self.sources_path = sources_path
@@ -162,7 +163,7 @@ class GitHubCollector(BaseCollector):
     def _collect_trending(self, cfg: dict) -> list[NewsItem]:
         try:
             since = cfg.get("trending", {}).get("since", "daily")
-            url = f"https://github.com/trending?since={since}"
+            url = f"{self.web_base}/trending?since={since}"
             resp = httpx.get(url, timeout=20)
             resp.raise_for_status()
             soup = BeautifulSoup(resp.text, "html.parser")
@@ -219,7 +220,7 @@ class GitHubCollector(BaseCollector):
         created_after = (datetime.now(timezone.utc) - timedelta(days=created_days)).date()
         query = f"topic:ai created:>{created_after} stars:>={stars_min}"
 
-        url = "https://api.github.com/search/repositories"
+        url = f"{self.api_base}/search/repositories"
         headers = {"Authorization": f"Bearer {self.github_token}"}
         resp = httpx.get(url, params={"q": query, "sort": "stars"}, headers=headers, timeout=20)
         resp.raise_for_status()
@@ -252,7 +253,7 @@ class GitHubCollector(BaseCollector):
 
         items: list[NewsItem] = []
         for repo in watch_repos:
-            url = f"https://api.github.com/repos/{repo}/releases"
+            url = f"{self.api_base}/repos/{repo}/releases"
             resp = httpx.get(url, headers=headers, timeout=20)
             if resp.status_code != 200:
                 continue
@@ -274,6 +275,7 @@ class GitHubCollector(BaseCollector):
 
 class NewsAPICollector(BaseCollector):
     source_type = "newsapi"
+    api_base = "https://newsapi.org"
 
     def __init__(self, newsapi_key: str | None, sources_path: str) -> None:
         self.newsapi_key = newsapi_key
@@ -288,7 +290,7 @@ class NewsAPICollector(BaseCollector):
         page_size = int(cfg.get("page_size", 20))
         language = cfg.get("language", "en")
 
-        url = "https://newsapi.org/v2/everything"
+        url = f"{self.api_base}/v2/everything"
         params = {"q": query, "pageSize": page_size, "language": language, "sortBy": "publishedAt"}
         headers = {"X-Api-Key": self.newsapi_key}
         resp = httpx.get(url, params=params, headers=headers, timeout=20)
@@ -484,6 +486,7 @@ class WebScraperCollector(BaseCollector):
 
 class RedditCollector(BaseCollector):
     source_type = "reddit"
+    web_base = "https://www.reddit.com"
 
     def __init__(self, sources_path: str) -> None:
         self.sources_path = sources_path
@@ -505,7 +508,7 @@ class RedditCollector(BaseCollector):
 
         items: list[NewsItem] = []
         for sub in subs:
-            url = f"https://www.reddit.com/r/{sub}/hot.json?limit={limit}"
+            url = f"{self.web_base}/r/{sub}/hot.json?limit={limit}"
             try:
                 resp = httpx.get(url, headers={"User-Agent": "ai-digest-bot/1.0"}, timeout=20)
                 if resp.status_code == 403:
@@ -550,6 +553,7 @@ class RedditCollector(BaseCollector):
 
 class TwitterCollector(BaseCollector):
     source_type = "twitter"
+    api_base = "https://api.twitter.com"
 
     def __init__(self, bearer_token: str | None, sources_path: str) -> None:
         self.bearer_token = bearer_token
@@ -563,7 +567,7 @@ class TwitterCollector(BaseCollector):
         query = cfg.get("query", "AI OR LLM OR machine learning lang:en")
         max_results = int(cfg.get("max_results", 20))
 
-        url = "https://api.twitter.com/2/tweets/search/recent"
+        url = f"{self.api_base}/2/tweets/search/recent"
         params = {
             "query": query,
             "max_results": max_results,
@@ -0,0 +1,157 @@
+"""
+Prompt 正文压缩（抽取式，本地完成）
+
+Reddit 帖子、GitHub 发布说明等正文往往很长，夹杂 markdown、代码块、链接和重复的套话。
+发给 LLM 之前先压缩到各阶段的 token 预算：
+1. 去掉代码块、HTML 标签、图片、链接地址和 markdown 标记，保留链接文字
+2. 按句切分（中英文标点、换行），去掉重复的句子
+3. 放得下时按原顺序全部保留；放不下时保留首句，其余按信息量从高到低挑选，输出时恢复原顺序
+
+信息量：句中特征（英文词、中文 2-gram）在全文中的词频之和，按句长归一化；
+与标题重合的特征、数字（版本号、指标）额外加分，过短的句子减分。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import html
+import math
+import re
+import threading
+from collections import OrderedDict
+
+from dedup import content_features
+from tokens import estimate_tokens, truncate_to_tokens
+
+_CODE_BLOCK = re.compile(r"```.*?(?:```|\Z)|~~~.*?(?:~~~|\Z)", re.DOTALL)
+_INLINE_CODE = re.compile(r"`([^`\n]*)`")
+_HTML_TAG = re.compile(r"<[^<>\n]+>")
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_MENTION = re.compile(r"(?<![\w@])@[\w-]+")
+# 行首的标题、引用、列表、表格分隔行、分隔线
+_LINE_PREFIX = re.compile(r"^[ \t]*(?:#{1,6}|>+|[-*+]|\d{1,3}[.)])[ \t]+", re.MULTILINE)
+_RULE_LINE = re.compile(r"^[ \t]*(?:[-*_=]{3,}|\|?[ \t:|-]*-{3,}[ \t:|-]*)[ \t]*$", re.MULTILINE)
+_EMPHASIS = re.compile(r"\*\*|__|~~|(?<!\w)[*_](?=\S)|(?<=\S)[*_](?!\w)")
+_SPACES = re.compile(r"[ \t\u00a0]+")
+# 中文句末标点（。！？；）之后，或英文句末标点后跟空白处断句
+_SENTENCE_END = re.compile(r"(?<=[。！？；])|(?<=[.!?;])\s+")
+_NON_WORD = re.compile(r"[\W_]+")
+_DIGIT = re.compile(r"\d")
+# 行内代码超过该长度视为代码片段，整段去掉
+_INLINE_CODE_CHARS = 40
+# 不足该 token 数的句子（小标题、套话）信息量减半，也不作为导语
+_MIN_SENTENCE_TOKENS = 6
+_TITLE_BONUS = 1.0
+_DIGIT_BONUS = 0.3
+_SHORT_PENALTY = 0.5
+# 压缩结果缓存的条数（键为正文哈希，不持有正文）
+_CACHE_ITEMS = 4096
+_cache: OrderedDict[tuple[bytes, int, str], str] = OrderedDict()
+_cache_lock = threading.Lock()
+# 常见英文虚词不计入信息量
+STOP_WORDS = frozenset(
+    "a an and are as at be been but by can for from has have i if in into is it its "
+    "just me my not of on or our so that the their then there these this to was we "
+    "were what when which will with you your".split()
+)
+
+
+def strip_markup(text: str) -> str:
+    """去掉代码块、HTML、链接地址和 markdown 标记，保留可读文字（换行保留，用于断句）"""
+    text = _CODE_BLOCK.sub("\n", text)
+    text = _INLINE_CODE.sub(
+        lambda m: m.group(1) if len(m.group(1)) <= _INLINE_CODE_CHARS else " ", text
+    )
+    text = _HTML_TAG.sub(" ", text)
+    text = html.unescape(text)
+    text = _IMAGE.sub(" ", text)
+    text = _LINK.sub(r"\1", text)
+    text = _URL.sub(" ", text)
+    text = _MENTION.sub(" ", text)
+    text = _RULE_LINE.sub("", text)
+    text = _LINE_PREFIX.sub("", text)
+    text = _EMPHASIS.sub("", text)
+    text = text.replace("|", " ")
+    return _SPACES.sub(" ", text)
+
+
+def split_sentences(text: str) -> list[str]:
+    """按行和句末标点切分，去掉空句和重复的句子（忽略大小写、空白和标点）"""
+    sentences: list[str] = []
+    seen: set[str] = set()
+    for line in text.splitlines():
+        for sentence in _SENTENCE_END.split(line):
+            sentence = sentence.strip()
+            key = _NON_WORD.sub("", sentence.lower())
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            sentences.append(sentence)
+    return sentences
+
+
+def _informativeness(sentence: str, frequencies: dict[str, int], title_features: set[str]) -> float:
+    features = [f for f in content_features(sentence) if f not in STOP_WORDS]
+    if not features:
+        return 0.0
+    score = sum(math.log1p(frequencies.get(f, 0)) for f in features) / math.sqrt(len(features))
+    overlap = sum(1 for f in features if f in title_features)
+    score += _TITLE_BONUS * overlap / math.sqrt(len(features))
+    if _DIGIT.search(sentence):
+        score += _DIGIT_BONUS
+    if estimate_tokens(sentence) < _MIN_SENTENCE_TOKENS:
+        score *= _SHORT_PENALTY
+    return score
+
+
+def compress(text: str, max_tokens: int, title: str = "") -> str:
+    """
+    把正文压缩到 max_tokens（估算值）以内
+    title: 新闻标题，与标题相关的句子优先保留
+    同一条目在打包批次、补发时会重复压缩，结果按 (正文哈希, max_tokens, 标题) 缓存；
+    缓存不持有正文本身，正文在 BlobStore 关闭、条目释放后即可回收
+    """
+    if max_tokens <= 0 or not text:
+        return ""
+    key = (hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest(), max_tokens, title)
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return result
+    result = _compress(text, max_tokens, title)
+    with _cache_lock:
+        _cache[key] = result
+        if len(_cache) > _CACHE_ITEMS:
+            _cache.popitem(last=False)
+    return result
+
+
+def _compress(text: str, max_tokens: int, title: str) -> str:
+    sentences = split_sentences(strip_markup(text))
+    if not sentences:
+        return ""
+    costs = [estimate_tokens(s) + 1 for s in sentences]
+    if sum(costs) <= max_tokens:
+        return " ".join(sentences)
+
+    frequencies = content_features(" ".join(sentences))
+    title_features = set(content_features(title)) - STOP_WORDS
+    # 首句（导语，跳过 "What's Changed" 这类过短的小标题）总是保留；过长时截断
+    lead = next((i for i, c in enumerate(costs) if c > _MIN_SENTENCE_TOKENS), 0)
+    if costs[lead] > max_tokens:
+        return truncate_to_tokens(sentences[lead], max_tokens)
+    ranked = sorted(
+        (i for i in range(len(sentences)) if i != lead),
+        key=lambda i: _informativeness(sentences[i], frequencies, title_features),
+        reverse=True,
+    )
+    chosen = [lead]
+    used = costs[lead]
+    for i in ranked:
+        if used + costs[i] <= max_tokens:
+            chosen.append(i)
+            used += costs[i]
+    return " ".join(sentences[i] for i in sorted(chosen))
@@ -10,6 +10,29 @@ class Settings(BaseSettings):
     llm_strategy: str = "fallback"  # primary | fallback | round_robin
     llm_primary_provider: str = "qwen"
     llm_secondary_provider: str = "zhipu"
+    llm_max_concurrency: int = 4  # 同时在途的 LLM 请求数
+    llm_requests_per_minute: int = 0  # 每个供应商的请求速率上限，0 表示不限制
+    llm_batch_max_items: int = 30  # 每个批量请求最多包含的新闻条数（同时受 token 预算限制）
+    llm_batch_retries: int = 1  # 批量响应中缺失/无法解析的条目补发轮数
+    llm_batch_summaries: bool = True  # 多条新闻的摘要合并为一次请求（JSON 输出）
+    # 只有排名前 N 条用 LLM 摘要，其余条目（读者多为略读）本地抽取，0 表示全部用 LLM
+    llm_summary_items: int = 0
+    llm_cache_enabled: bool = True  # LLM 响应磁盘缓存
+    llm_cache_path: str = "data/llm_cache.sqlite3"
+    llm_cache_ttl_hours: float = 168  # 7 天
+    llm_cache_max_entries: int = 20000
+    # 单次运行的 LLM 预算（0 表示不限制），按比例分给各阶段；用完后降级：
+    # 分类改用关键词、灰色地带条目丢弃、摘要改为本地抽取式摘要
+    llm_budget_tokens: int = 300000
+    llm_budget_calls: int = 150
+    llm_budget_seconds: float = 900
+    llm_budget_shares: dict[str, float] = {
+        "relevance": 0.1,
+        "relevance_classify": 0.3,  # 相关性判断 + 分类的合并调用
+        "classify": 0.1,
+        "summary": 0.4,
+        "overview": 0.1,
+    }
 
     # Qwen (DashScope)
     qwen_api_key: str | None = None
@@ -70,6 +93,66 @@ class Settings(BaseSettings):
     reddit_client_id: str | None = None
     reddit_client_secret: str | None = None
 
+    # 内容级去重（SimHash，跨天）
+    content_dedup_index_path: str = "data/simhash_index.json"
+    content_dedup_window_days: int = 7
+    content_dedup_max_distance: int = 6  # 64 位指纹的汉明距离阈值
+
+    # 评分：raw_score × (基础权重 + 时效性权重 × 时效性因子 + 内容完整度权重 × 内容完整度因子)
+    score_base_weight: float = 0.5
+    score_recency_weight: float = 0.3
+    score_content_weight: float = 0.2
+    score_recency_hours: float = 72  # 时效性因子在该时长内从 1.0 线性衰减
+    score_recency_floor: float = 0.3  # 时效性因子下限
+
+    # 多样性选择：日报条数与各维度配额（比例按条数计算，至少 2 条）
+    digest_max_items: int = 10  # 每期入选条数（周报等可调大）
+    diversity_source_type_share: float = 0.4  # 每个来源类型最多占的比例
+    diversity_max_per_source: int = 3  # 每个具体来源最多条数
+    diversity_category_share: float = 0.35  # 每个内容类别最多占的比例
+    # 报道聚类：同一事件的多篇报道只保留评分最高的一条交给 LLM，其余作为出处显示
+    story_clustering_enabled: bool = True
+    story_window_hours: float = 48  # 发布时间相差超过该时长的报道不合并
+    story_title_similarity: float = 0.5  # 仅凭标题合并所需的标题相似度（字符 n-gram Jaccard）
+    story_min_shared_entities: int = 2  # 凭共享实体（产品名、型号等）合并所需的实体数
+    # LLM 阶段前按评分预排序，只保留 digest_max_items × 该倍数的候选（0 表示不筛选）
+    shortlist_factor: float = 5
+
+    # 升温话题：标题词按天写入 count-min sketch，与最近几周比较，写入概览 prompt 并给相关条目加分
+    trends_enabled: bool = True
+    trends_path: str = "data/trend_sketches.npz"
+    trends_window_days: int = 28  # 与最近多少天比较（只保留这些天的 sketch）
+    trends_top_k: int = 5
+    trends_min_count: int = 3  # 今天至少出现在这么多条目中
+    trends_min_surge: float = 3.0  # 今天的条数至少是按历史频率推算值的多少倍
+    trends_score_boost: float = 0.2  # 标题含升温话题的条目评分乘以 (1 + 该值)，0 表示不加分
+
+    # 本地相关性/分类模型（由历史 LLM 判定增量训练，有把握的条目不再发给 LLM）
+    local_classifier_enabled: bool = True
+    local_classifier_path: str = "data/local_classifier.json"
+    local_classifier_label_log: str = "data/llm_labels.jsonl"
+    local_classifier_threshold: float = 0.95  # 预测概率达到该值才在本地决定
+    local_classifier_min_labels: int = 300  # 训练标注数达到该值之前全部交给 LLM
+    local_classifier_audit_rate: float = 0.05  # 有把握的条目中仍交给 LLM 抽查的比例
+
+    # 正文磁盘存储：采集后较长的正文移入本次运行的压缩文件，内存中只留预览，运行结束时删除
+    content_store_enabled: bool = True
+    content_store_dir: str = "data/blobs"
+
+    # 条目级 LLM 结果存储：相关性、类别、摘要按 (指纹, 正文哈希, prompt 版本) 保存，
+    # 连续多天采集到的同一条目不再发给 LLM
+    label_store_enabled: bool = True
+    label_store_path: str = "data/label_store.sqlite3"
+    label_store_ttl_days: float = 30  # 超过该天数未更新的结果不再使用
+
+    # WebSub 推送订阅（可选，仅定时模式下启动接收端）
+    websub_enabled: bool = False
+    websub_callback_url: str = ""  # 公网可访问的回调地址，如 https://digest.example.com/websub
+    websub_host: str = "0.0.0.0"
+    websub_port: int = 8765
+    websub_secret: str = ""
+    websub_lease_seconds: int = 432000  # 5 天
+
 
 def load_settings() -> Settings:
     return Settings()
@@ -0,0 +1,258 @@
+"""
+近似重复检测
+
+MinHash + LSH 分桶：每条文本生成固定长度的 MinHash 签名，签名按 band 切分后
+进入哈希桶，只有与当前文本至少共享一个桶的条目才会作为候选，再由调用方做精确校验。
+整体复杂度随条目数近似线性增长，替代两两比较的 O(n²) 方案。
+
+SimHash 指纹索引：对正文生成 64 位指纹并持久化，按分段精确查找实现汉明距离查询，
+用于识别跨天重复发布、改写标题的转载内容。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import os
+import re
+import struct
+import unicodedata
+from collections import defaultdict
+from collections.abc import Hashable, Iterable
+from datetime import date, timedelta
+from operator import eq
+
+# 中日韩统一表意文字（含扩展 A）
+_CJK_RUN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]+")
+# 去除空白与标点，只保留字母数字和中文
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """NFKC 归一化 + 小写，去掉空白和标点（全角/半角、大小写差异不再影响相似度）"""
+    return _NON_WORD.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+def char_shingles(text: str, latin_n: int = 3, cjk_n: int = 2) -> set[str]:
+    """
+    中英混合文本的字符 n-gram
+    中文片段用 2-gram（单字信息量大），其余片段用 3-gram；文本过短时退化为整段
+    """
+    normalized = normalize_text(text)
+    shingles: set[str] = set()
+    pos = 0
+    for match in _CJK_RUN.finditer(normalized):
+        _add_ngrams(shingles, normalized[pos : match.start()], latin_n)
+        _add_ngrams(shingles, match.group(), cjk_n)
+        pos = match.end()
+    _add_ngrams(shingles, normalized[pos:], latin_n)
+    return shingles
+
+
+def _add_ngrams(shingles: set[str], segment: str, n: int) -> None:
+    if not segment:
+        return
+    if len(segment) <= n:
+        shingles.add(segment)
+        return
+    shingles.update(segment[i : i + n] for i in range(len(segment) - n + 1))
+
+
+class MinHashLSH:
+    """
+    MinHash 签名 + LSH 分桶索引
+
+    - num_perm = bands × rows；Jaccard 为 s 的两段文本成为候选的概率为 1-(1-s^rows)^bands
+    - 默认 20×3：s=0.5 时约 92%，s=0.3 时约 42%，无关文本（s≈0.03）几乎不会碰撞
+    - 同一 n-gram 的哈希向量会被缓存复用，签名计算只剩逐位取最小值
+    - max_bucket 限制单个桶的大小，避免模板化标题（如 "GitHub Trending: xxx"）退化为全量比较
+    """
+
+    def __init__(self, bands: int = 20, rows: int = 3, max_bucket: int = 64) -> None:
+        self.bands = bands
+        self.rows = rows
+        self.num_perm = bands * rows
+        self.max_bucket = max_bucket
+        self._struct = struct.Struct(f"<{self.num_perm}I")
+        self._vectors: dict[str, tuple[int, ...]] = {}
+        self._buckets: list[dict[tuple[int, ...], list[Hashable]]] = [
+            defaultdict(list) for _ in range(bands)
+        ]
+        self._signatures: dict[Hashable, tuple[int, ...]] = {}
+
+    def signature(self, shingles: Iterable[str]) -> tuple[int, ...]:
+        vectors = [self._vector(s) for s in shingles]
+        if not vectors:
+            return (0,) * self.num_perm
+        return tuple(map(min, zip(*vectors, strict=True)))
+
+    def _vector(self, shingle: str) -> tuple[int, ...]:
+        vector = self._vectors.get(shingle)
+        if vector is None:
+            # 缓存只用于加速，超过上限直接清空，内存占用保持有界
+            if len(self._vectors) >= 500_000:
+                self._vectors.clear()
+            digest = hashlib.shake_128(shingle.encode("utf-8")).digest(self._struct.size)
+            vector = self._vectors[shingle] = self._struct.unpack(digest)
+        return vector
+
+    def _band_keys(self, signature: tuple[int, ...]) -> list[tuple[int, ...]]:
+        r = self.rows
+        return [signature[i * r : (i + 1) * r] for i in range(self.bands)]
+
+    def insert(self, key: Hashable, signature: tuple[int, ...]) -> None:
+        self._signatures[key] = signature
+        for bucket, band in zip(self._buckets, self._band_keys(signature), strict=True):
+            members = bucket[band]
+            if len(members) < self.max_bucket and key not in members:
+                members.append(key)
+
+    def query(
+        self, signature: tuple[int, ...], min_jaccard: float = 0.0, limit: int | None = None
+    ) -> list[Hashable]:
+        """
+        返回候选键，按估计的 Jaccard 相似度从高到低排序
+        先按共享 band 数粗排取前 limit 个，再用签名估计值过滤明显不相似的候选
+        """
+        hits: dict[Hashable, int] = {}
+        for bucket, band in zip(self._buckets, self._band_keys(signature), strict=True):
+            for key in bucket.get(band, ()):
+                hits[key] = hits.get(key, 0) + 1
+        if limit is not None and len(hits) > limit:
+            keys = heapq.nlargest(limit, hits, key=hits.__getitem__)
+        else:
+            keys = list(hits)
+
+        scored = [(self.jaccard(signature, self._signatures[key]), key) for key in keys]
+        scored = [pair for pair in scored if pair[0] >= min_jaccard]
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [key for _, key in scored]
+
+    def jaccard(self, a: tuple[int, ...], b: tuple[int, ...]) -> float:
+        """由签名估计 Jaccard 相似度"""
+        return sum(map(eq, a, b)) / self.num_perm
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+# ---------- 内容级 SimHash ----------
+
+_LATIN_WORD = re.compile(r"[a-z0-9]+")
+
+
+def content_features(text: str) -> dict[str, int]:
+    """正文特征：英文/数字按词，中文按字 2-gram，值为出现次数"""
+    normalized = unicodedata.normalize("NFKC", text).lower()
+    features: dict[str, int] = {}
+    for word in _LATIN_WORD.findall(normalized):
+        features[word] = features.get(word, 0) + 1
+    for run in _CJK_RUN.findall(normalized):
+        if len(run) == 1:
+            features[run] = features.get(run, 0) + 1
+            continue
+        for i in range(len(run) - 1):
+            gram = run[i : i + 2]
+            features[gram] = features.get(gram, 0) + 1
+    return features
+
+
+# 64 个比特位计数器打包进一个大整数，每个计数器占 32 位
+_LANE = 32
+_LANE_MASK = (1 << _LANE) - 1
+# 字节值 → 8 个计数器上各加 0/1
+_SPREAD = [sum(((v >> b) & 1) << (b * _LANE) for b in range(8)) for v in range(256)]
+
+
+def simhash(features: dict[str, int]) -> int:
+    """
+    64 位 SimHash 指纹
+    每个比特位累加"该位为 1 的特征权重"，超过总权重一半则置 1；
+    计数器打包在同一个大整数里，每个特征只需 8 次查表移位，不必逐位循环
+    """
+    counters = 0
+    total = 0
+    for feature, weight in features.items():
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        spread = 0
+        for pos, byte in enumerate(digest):
+            spread |= _SPREAD[byte] << (pos * 8 * _LANE)
+        counters += spread * weight
+        total += weight
+
+    fingerprint = 0
+    for bit in range(64):
+        if ((counters >> (bit * _LANE)) & _LANE_MASK) * 2 > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class SimHashIndex:
+    """
+    SimHash 指纹索引，支持按汉明距离查询
+
+    指纹切成 max_distance+1 段：汉明距离 ≤ max_distance 的两个指纹至少有一段完全相同（抽屉原理），
+    因此只需在各段的哈希表里精确查找候选，查询耗时与索引规模基本无关
+    """
+
+    bits = 64
+
+    def __init__(self, max_distance: int = 6) -> None:
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        bounds = [round(i * self.bits / bands) for i in range(bands + 1)]
+        self._bands = [
+            (lo, (1 << (hi - lo)) - 1) for lo, hi in zip(bounds, bounds[1:], strict=False)
+        ]
+        self._tables: list[dict[int, list[int]]] = [{} for _ in self._bands]
+        self.entries: list[tuple[int, str, str]] = []  # (指纹, 键, 日期)
+
+    def add(self, fingerprint: int, key: str, day: str) -> None:
+        idx = len(self.entries)
+        self.entries.append((fingerprint, key, day))
+        for table, (shift, mask) in zip(self._tables, self._bands, strict=True):
+            table.setdefault((fingerprint >> shift) & mask, []).append(idx)
+
+    def find(self, fingerprint: int, before: str | None = None) -> tuple[int, str, str] | None:
+        """返回汉明距离最近且不超过 max_distance 的条目；before: 只查找该日期之前的条目"""
+        best: tuple[int, str, str] | None = None
+        best_distance = self.max_distance + 1
+        for table, (shift, mask) in zip(self._tables, self._bands, strict=True):
+            for idx in table.get((fingerprint >> shift) & mask, ()):
+                entry = self.entries[idx]
+                if before is not None and entry[2] >= before:
+                    continue
+                distance = (entry[0] ^ fingerprint).bit_count()
+                if distance < best_distance:
+                    best, best_distance = entry, distance
+        return best
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def load(
+        cls, path: str, today: str, window_days: int = 7, max_distance: int = 6
+    ) -> SimHashIndex:
+        """
+        加载最近 window_days 天（含当天）的指纹
+        当天的记录也加载，同一天重复运行时保存不会覆盖之前运行写入的指纹；
+        去重时只把之前日期的记录视为历史重复（deduplicate_content）
+        """
+        index = cls(max_distance)
+        if not os.path.exists(path):
+            return index
+        oldest = (date.fromisoformat(today) - timedelta(days=window_days)).isoformat()
+        with open(path, encoding="utf-8") as f:
+            for fingerprint, key, day in json.load(f):
+                if oldest <= day <= today:
+                    index.add(fingerprint, key, day)
+        return index
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, path)
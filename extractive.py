@@ -0,0 +1,109 @@
+"""
+本地抽取式摘要（TextRank，只用 CPU）
+
+LLM 摘要失败、预算用完，或排名靠后的条目不值得单独调用 LLM 时，从正文中抽取最有代表性的几句：
+1. 正文去掉 markup 后按句切分（compression.strip_markup / split_sentences，中英文标点都能断句）
+2. 句子之间的相似度为共享特征数 / (log|Si| + log|Sj|)（英文按词、中文按字 2-gram，去掉虚词）
+3. 在相似度图上做带偏置的 PageRank：与标题重合多、位置靠前（导语）的句子权重更高
+4. 按得分从高到低选句，直到句数或 token 上限，输出时恢复原顺序
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from compression import STOP_WORDS, split_sentences, strip_markup
+from dedup import content_features
+from tokens import estimate_tokens, truncate_to_tokens
+
+_DAMPING = 0.85
+_ITERATIONS = 50
+_TOLERANCE = 1e-6
+# 只对前若干句建图（长帖的后半部分多为评论、附录），图的大小有上限
+_MAX_SENTENCES = 80
+# 不足该 token 数的句子（小标题、"What's Changed" 之类）不参与排序，全是短句时例外
+_MIN_SENTENCE_TOKENS = 6
+# 偏置向量：与标题的重合比例、导语位置的加权
+_TITLE_BIAS = 2.0
+_LEAD_BIAS = 1.0
+
+
+def _sentence_features(sentence: str) -> set[str]:
+    return {f for f in content_features(sentence) if f not in STOP_WORDS}
+
+
+def rank_sentences(sentences: list[str], title: str = "") -> list[float]:
+    """各句得分（和为 1）：带偏置的 TextRank 中心性与偏置（标题重合、导语位置）的平均"""
+    n = len(sentences)
+    if n == 0:
+        return []
+    features = [_sentence_features(s) for s in sentences]
+    title_features = _sentence_features(title)
+
+    weights = np.zeros((n, n))
+    for i in range(n):
+        if not features[i]:
+            continue
+        for j in range(i + 1, n):
+            common = len(features[i] & features[j])
+            if common:
+                # +1 避免单特征句子的分母为 0
+                denominator = math.log(len(features[i]) + 1) + math.log(len(features[j]) + 1)
+                weights[i, j] = weights[j, i] = common / denominator
+
+    bias = np.ones(n)
+    if title_features:
+        bias += _TITLE_BIAS * np.array(
+            [len(f & title_features) / len(title_features) for f in features]
+        )
+    bias += _LEAD_BIAS / np.arange(1, n + 1)
+    bias /= bias.sum()
+
+    out_weight = weights.sum(axis=1)
+    # 行归一化为转移矩阵；孤立的句子把全部得分按偏置向量分出去
+    transition = np.divide(
+        weights, out_weight[:, None], out=np.zeros_like(weights), where=out_weight[:, None] > 0
+    )
+    dangling = out_weight == 0
+    scores = bias.copy()
+    for _ in range(_ITERATIONS):
+        updated = (1 - _DAMPING) * bias + _DAMPING * (
+            scores @ transition + scores[dangling].sum() * bias
+        )
+        converged = np.abs(updated - scores).sum() < _TOLERANCE
+        scores = updated
+        if converged:
+            break
+    # 短文本的图很稀疏（导语常与其余句子没有共享特征），中心性与偏置各占一半
+    return ((scores + bias) / 2).tolist()
+
+
+def summarize(text: str, title: str = "", max_tokens: int = 80, max_sentences: int = 3) -> str:
+    """
+    从正文中抽取不超过 max_sentences 句、max_tokens（估算值）的摘要；没有可用句子时返回空串
+    title: 新闻标题，与标题相关的句子优先
+    """
+    if max_tokens <= 0 or max_sentences <= 0 or not text:
+        return ""
+    sentences = split_sentences(strip_markup(text))[:_MAX_SENTENCES]
+    candidates = [s for s in sentences if estimate_tokens(s) >= _MIN_SENTENCE_TOKENS]
+    sentences = candidates or sentences
+    if not sentences:
+        return ""
+
+    scores = rank_sentences(sentences, title)
+    ranked = sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True)
+    chosen: list[int] = []
+    used = 0
+    for i in ranked:
+        cost = estimate_tokens(sentences[i]) + 1
+        if used + cost <= max_tokens:
+            chosen.append(i)
+            used += cost
+            if len(chosen) >= max_sentences:
+                break
+    if not chosen:
+        return truncate_to_tokens(sentences[ranked[0]], max_tokens)
+    return " ".join(sentences[i] for i in sorted(chosen))
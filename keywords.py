@@ -0,0 +1,192 @@
+"""
+关键词匹配
+
+所有关键词表（黑/白名单、分类、Hacker News 过滤）编译进同一个匹配器，每段文本只做一次分词：
+- 英文/数字关键词按整词匹配：一次 bytes.translate 完成小写化并把非字母数字字节变成空格，
+  split 后与"关键词首词"集合求交集；多词短语再校验后续词元
+- 关键词以 * 结尾表示前缀匹配，如 release* 可命中 releases / released；
+  新词元只在第一次出现时与前缀关键词比对，结果记入缓存
+- 中文没有词边界，中文关键词按子串匹配；纯 ASCII 文本直接跳过
+
+纯 Python 逐字符推进的 Aho-Corasick 自动机、或把关键词编译成一个大正则，都比逐个关键词 `in`
+（C 实现）还慢，因此这里把状态转移落在词元层面，热路径全部是 C 实现的字节/集合运算。
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Iterable, Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+import yaml
+
+DEFAULT_KEYWORDS_PATH = str(Path(__file__).with_name("keywords.yaml"))
+
+_LATIN_TOKEN = re.compile(r"[a-z0-9]+")
+# 字节转换表：ASCII 字母数字保留（大写转小写），其余字节（含中文的 UTF-8 字节）变成空格
+_WORD_BYTES = bytes(
+    b + 32 if 65 <= b <= 90 else b if 97 <= b <= 122 or 48 <= b <= 57 else 32 for b in range(256)
+)
+_CJK_CHAR = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]")
+_CJK_RUN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]+")
+# 已见词元缓存上限，超过后清空
+_CACHE_LIMIT = 200_000
+
+
+class _Term(NamedTuple):
+    order: int  # 在配置中的顺序，用于稳定输出
+    keyword: str  # 配置中的写法
+    lists: tuple[str, ...]  # 所属关键词表
+    # 多词短语在空格拼接的词元串中的查找串（两侧带空格；前缀匹配时末尾不带），单词为 None
+    phrase: bytes | None
+
+
+class KeywordMatcher:
+    """
+    多关键词表匹配器
+
+    lists: 表名 -> 关键词列表；同一关键词可出现在多个表中
+    categories: 分类表名，按优先级排列（classify 依次判断）
+    """
+
+    def __init__(self, lists: Mapping[str, Iterable[str]], categories: Iterable[str] = ()) -> None:
+        self.categories = list(categories)
+        owners: dict[str, list[str]] = {}
+        for name, keywords in lists.items():
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                if keyword and name not in owners.setdefault(keyword, []):
+                    owners[keyword].append(name)
+
+        self._exact: dict[bytes, list[_Term]] = {}
+        self._prefix: list[tuple[bytes, _Term]] = []
+        self._cjk: dict[str, list[_Term]] = {}
+        for order, (keyword, names) in enumerate(owners.items()):
+            prefix = keyword.endswith("*")
+            body = keyword.rstrip("*")
+            if _CJK_CHAR.search(body):
+                if _CJK_RUN.fullmatch(body) is None or prefix:
+                    raise ValueError(f"Chinese keyword must be a single run: {keyword!r}")
+                self._cjk[keyword] = [_Term(order, keyword, tuple(names), None)]
+                continue
+            words = _LATIN_TOKEN.findall(body)
+            if not words:
+                raise ValueError(f"Keyword has no matchable characters: {keyword!r}")
+            first = words[0].encode("ascii")
+            if len(words) == 1:
+                term = _Term(order, keyword, tuple(names), None)
+                if prefix:
+                    self._prefix.append((first, term))
+                else:
+                    self._exact.setdefault(first, []).append(term)
+                continue
+            phrase = " " + " ".join(words) + ("" if prefix else " ")
+            term = _Term(order, keyword, tuple(names), phrase.encode("ascii"))
+            self._exact.setdefault(first, []).append(term)
+
+        self._cjk_pattern = self._compile_cjk()
+
+        # 词元 -> 以该词元开头的关键词；只记录有候选的词元
+        self._starts: dict[bytes, list[_Term]] = {}
+        self._start_tokens: set[bytes] = set()
+        # 已经查过候选的词元
+        self._seen: set[bytes] = set()
+        # 匹配器由各线程共用（load_keyword_matcher 缓存、并发批处理）：缓存的写入和清空加锁，
+        # 清空时换成新的容器，读取方持有的旧容器仍然完整
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> KeywordMatcher:
+        """由 keywords.yaml 的结构构建"""
+        relevance = config.get("relevance", {})
+        categories = config.get("categories", {})
+        lists: dict[str, Iterable[str]] = {
+            "blacklist": relevance.get("blacklist", []),
+            "whitelist": relevance.get("whitelist", []),
+            "hacker_news": config.get("hacker_news", []),
+        }
+        lists.update(categories)
+        return cls(lists, categories=categories)
+
+    def scan(self, text: str) -> dict[str, list[str]]:
+        """
+        扫描文本，返回 表名 -> 命中的关键词（按配置顺序）
+        没有命中的表不出现在结果中
+        """
+        tokens = text.encode("utf-8").translate(_WORD_BYTES).split()
+        distinct = set(tokens)
+        with self._lock:
+            if len(self._seen) >= _CACHE_LIMIT:
+                # 先清空再计算未见过的词元，本次文本的全部词元重新查候选
+                self._starts, self._start_tokens, self._seen = {}, set(), set()
+            unseen = distinct - self._seen
+            if unseen:
+                self._learn(unseen)
+            starts, start_tokens = self._starts, self._start_tokens
+
+        matched: list[_Term] = []
+        padded: bytes | None = None
+        for token in distinct & start_tokens:
+            for term in starts.get(token, ()):
+                if term.phrase is None:
+                    matched.append(term)
+                    continue
+                # 短语：在空格拼接的词元串里做一次子串查找
+                if padded is None:
+                    padded = b" " + b" ".join(tokens) + b" "
+                if term.phrase in padded:
+                    matched.append(term)
+        if self._cjk_pattern is not None and not text.isascii():
+            for keyword in set(self._cjk_pattern.findall(text)):
+                matched.extend(self._cjk[keyword])
+
+        hits: dict[str, list[str]] = {}
+        for term in sorted(set(matched)):
+            for name in term.lists:
+                hits.setdefault(name, []).append(term.keyword)
+        return hits
+
+    def classify(self, hits: Mapping[str, list[str]]) -> str | None:
+        """按优先级返回第一个命中的分类"""
+        return next((name for name in self.categories if name in hits), None)
+
+    def _compile_cjk(self) -> re.Pattern | None:
+        """
+        中文关键词编译成一个正则：每次只消耗一个字符，在后顾断言里前瞻匹配关键词，
+        从而得到每个起始位置上的命中（关键词之间可以重叠），
+        且正则以字符集开头，引擎会跳过首字不可能命中的位置
+        """
+        if not self._cjk:
+            return None
+        keywords = sorted(self._cjk, key=len, reverse=True)
+        # 同一起点只会报告最长的关键词，把它的前缀关键词一并记入
+        for keyword in keywords:
+            self._cjk[keyword] += [
+                self._cjk[other][0]
+                for other in keywords
+                if other != keyword and keyword.startswith(other)
+            ]
+        first = "".join(sorted({k[0] for k in keywords}))
+        alternation = "|".join(map(re.escape, keywords))
+        return re.compile(f"[{re.escape(first)}](?<=(?=({alternation})).)")
+
+    def _learn(self, tokens: set[bytes]) -> None:
+        """新词元查一次候选关键词（精确首词 + 前缀），结果记入缓存（调用方持有锁）"""
+        for token in tokens:
+            terms = list(self._exact.get(token, ()))
+            terms.extend(term for prefix, term in self._prefix if token.startswith(prefix))
+            if terms:
+                self._starts[token] = terms
+                self._start_tokens.add(token)
+            self._seen.add(token)
+
+
+@lru_cache(maxsize=8)
+def load_keyword_matcher(path: str = DEFAULT_KEYWORDS_PATH) -> KeywordMatcher:
+    """加载关键词配置并编译（同一路径只编译一次）"""
+    with open(path, encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    return KeywordMatcher.from_config(config)
@@ -0,0 +1,103 @@
+"""
+条目级 LLM 结果存储（sqlite）
+
+批量 prompt 每次混入的条目不同，prompt 级的响应缓存很少命中；但同一个 GitHub 热门项目、
+同一篇 arXiv 论文会连续多天被采集到。这里按条目保存 LLM 给出的相关性、类别和摘要：
+- 键为 (指纹, 正文哈希, 字段, prompt 版本)：正文变化或 prompt 修改后自动失效
+- 只保存 LLM 的结论，不保存关键词分类、本地摘要等降级结果
+- 超过 ttl_days 未更新的记录在保存时删除
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from models import NewsItem
+
+RELEVANCE = "relevance"
+CATEGORY = "category"
+SUMMARY = "summary"
+
+
+def prompt_version(*templates: str) -> str:
+    """由 prompt 模板文本得到的版本号（模板改动后旧结果不再使用）"""
+    return hashlib.sha256("\0".join(templates).encode("utf-8")).hexdigest()[:12]
+
+
+def content_hash(item: NewsItem) -> str:
+    return hashlib.sha256(item.content.encode("utf-8")).hexdigest()[:16]
+
+
+class LabelStore:
+    """线程安全；多个进程可共用同一个文件"""
+
+    def __init__(self, path: str, ttl_days: float = 30) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS labels ("
+                "fingerprint TEXT NOT NULL, content_hash TEXT NOT NULL, field TEXT NOT NULL, "
+                "version TEXT NOT NULL, value TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (fingerprint, content_hash, field, version))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS labels_updated ON labels (updated_at)")
+
+    def get(self, items: Iterable[NewsItem], field: str, version: str) -> list[Any]:
+        """按顺序返回各条目保存的结果，没有的为 None"""
+        cutoff = time.time() - self.ttl_seconds
+        values: list[Any] = []
+        with self._lock:
+            for item in items:
+                if not item.fingerprint:
+                    self.misses += 1
+                    values.append(None)
+                    continue
+                row = self._conn.execute(
+                    "SELECT value FROM labels WHERE fingerprint = ? AND content_hash = ? "
+                    "AND field = ? AND version = ? AND updated_at >= ?",
+                    (item.fingerprint, content_hash(item), field, version, cutoff),
+                ).fetchone()
+                value = None if row is None else json.loads(row[0])
+                if value is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                values.append(value)
+        return values
+
+    def put(self, pairs: Iterable[tuple[NewsItem, Any]], field: str, version: str) -> None:
+        """保存 (条目, 结果)；结果为 None 的跳过"""
+        now = time.time()
+        rows = [
+            (item.fingerprint, content_hash(item), field, version, json.dumps(value), now)
+            for item, value in pairs
+            if value is not None and item.fingerprint
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("DELETE FROM labels WHERE updated_at < ?", (now - self.ttl_seconds,))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,12 +1,36 @@
 from __future__ import annotations
 
+import hashlib
 import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import TypeVar
 
 import yaml
 from openai import OpenAI
 
+from budget import BudgetExceeded, RunBudget
 from config import Settings
+from tokens import TokenBudget, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+SYSTEM_PROMPT = "你是一位专业的 AI 新闻编辑。"
+TEMPERATURE = 0.3
+
+# llm_providers.yaml 中未设置 context_window / max_output_tokens 时的保守默认值
+DEFAULT_CONTEXT_WINDOW = 8192
+DEFAULT_MAX_OUTPUT_TOKENS = 2048
 
 
 @dataclass
@@ -15,6 +39,142 @@ class ProviderConfig:
     api_key: str
     model: str
     base_url: str
+    rpm: int = 0  # 每分钟请求数上限，0 表示不限制
+    context_window: int = DEFAULT_CONTEXT_WINDOW  # 输入 + 输出 token 上限
+    max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS
+
+
+class RateLimiter:
+    """请求速率限制：相邻两次请求的开始时间至少间隔 60/rpm 秒（线程安全）"""
+
+    def __init__(self, requests_per_minute: int) -> None:
+        self.interval = 60 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class ResponseCache:
+    """
+    LLM 响应磁盘缓存（sqlite）
+
+    以 (供应商, 模型, temperature, system prompt, prompt) 的哈希为键：
+    - 超过 ttl_seconds 的响应视为过期；条目数超过 max_entries 时淘汰最久未访问的
+    - 线程安全，多个进程（定时任务与手动 --run-once）可共用同一个文件
+    - 同一进程内相同的请求同时在途时只调用一次，其余请求等待并共享结果
+    只缓存成功的响应
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._pending: dict[str, Future[str]] = {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+            )
+
+    @staticmethod
+    def key(provider: str, model: str, temperature: float, system: str, prompt: str) -> str:
+        payload = json.dumps([provider, model, temperature, system, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, now, now)
+            )
+            self._evict(now)
+
+    def get_or_call(self, key: str, call: Callable[[], str]) -> str:
+        """命中缓存直接返回；否则调用 call 并写入缓存（相同 key 同时在途时只调用一次）"""
+        response = self._lookup(key)
+        with self._lock:
+            if response is not None:
+                self.hits += 1
+                return response
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                self.misses += 1
+                pending = self._pending[key] = Future()
+            else:
+                self.coalesced += 1
+        if not owner:
+            return pending.result()
+
+        try:
+            # 查询缓存与登记在途请求之间，其他请求可能刚写入
+            response = self._lookup(key)
+            if response is None:
+                response = call()
+                self.put(key, response)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set_result(response)
+            return response
+        finally:
+            with self._lock:
+                del self._pending[key]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _lookup(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return response
+
+    def _evict(self, now: float) -> None:
+        """删除过期条目；仍超过上限时删除最久未访问的（调用方持有锁和事务）"""
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
 
 
 class LLMRouter:
@@ -22,6 +182,21 @@ class LLMRouter:
         self.settings = settings
         self.providers = self._load_providers(providers_path)
         self._rr_cycle = itertools.cycle(self.providers)
+        self._rr_lock = threading.Lock()
+        self._limiters = {p.name: RateLimiter(p.rpm) for p in self.providers}
+        self.cache = (
+            ResponseCache(
+                settings.llm_cache_path,
+                ttl_seconds=settings.llm_cache_ttl_hours * 3600,
+                max_entries=settings.llm_cache_max_entries,
+            )
+            if settings.llm_cache_enabled
+            else None
+        )
+        self.budget = RunBudget.from_settings(settings)
+        # 批量响应缺失/无法解析的条目补发统计：{阶段: {"requests": 补发请求数, "items": 补发条目数}}
+        self._retries: dict[str, dict[str, int]] = {}
+        self._retries_lock = threading.Lock()
 
     def _load_providers(self, providers_path: str) -> list[ProviderConfig]:
         with open(providers_path, encoding="utf-8") as f:
@@ -51,6 +226,9 @@ class LLMRouter:
                 api_key=api_key,
                 model=model,
                 base_url=base_url,
+                rpm=cfg.get("rpm", self.settings.llm_requests_per_minute),
+                context_window=cfg.get("context_window", DEFAULT_CONTEXT_WINDOW),
+                max_output_tokens=cfg.get("max_output_tokens", DEFAULT_MAX_OUTPUT_TOKENS),
             )
 
         primary = resolve(self.settings.llm_primary_provider)
@@ -63,28 +241,87 @@ class LLMRouter:
     def _client(self, provider: ProviderConfig) -> OpenAI:
         return OpenAI(api_key=provider.api_key, base_url=provider.base_url)
 
-    def complete(self, prompt: str) -> str:
+    def complete(self, prompt: str, stage: str = "") -> str:
+        """
+        stage: 所属阶段（relevance / relevance_classify / classify / summary / overview），
+        计入该阶段的预算；预算用完时抛出 BudgetExceeded（不会再换用备用供应商）
+        """
         strategy = self.settings.llm_strategy
         if strategy == "round_robin":
-            provider = next(self._rr_cycle)
-            return self._call(provider, prompt)
+            with self._rr_lock:
+                provider = next(self._rr_cycle)
+            return self._call(provider, prompt, stage)
         if strategy == "primary":
-            return self._call(self.providers[0], prompt)
+            return self._call(self.providers[0], prompt, stage)
         if strategy == "fallback" and len(self.providers) >= 2:
             try:
-                return self._call(self.providers[0], prompt)
+                return self._call(self.providers[0], prompt, stage)
+            except BudgetExceeded:
+                raise
             except Exception:
-                return self._call(self.providers[1], prompt)
-        return self._call(self.providers[0], prompt)
+                return self._call(self.providers[1], prompt, stage)
+        return self._call(self.providers[0], prompt, stage)
+
+    def token_budget(self) -> TokenBudget:
+        """
+        单次请求的 token 预算
+        请求可能落到任一已配置的供应商（fallback / round_robin），取各供应商上限的最小值
+        """
+        return TokenBudget(
+            context_window=min(p.context_window for p in self.providers),
+            max_output_tokens=min(p.max_output_tokens for p in self.providers),
+        )
+
+    def record_retry(self, stage: str, items: int) -> None:
+        """记录一次补发请求（stage 如 relevance / classify）"""
+        with self._retries_lock:
+            counts = self._retries.setdefault(stage, {"requests": 0, "items": 0})
+            counts["requests"] += 1
+            counts["items"] += items
+
+    def retry_stats(self) -> dict[str, dict[str, int]]:
+        with self._retries_lock:
+            return {stage: dict(counts) for stage, counts in self._retries.items()}
+
+    def run_concurrent(self, fn: Callable[[T], R], tasks: Iterable[T]) -> list[R]:
+        """
+        并发执行多个 LLM 任务（如分批请求），同时在途的任务数不超过 llm_max_concurrency
+        结果按任务顺序返回；fn 需自行处理失败，避免一个任务的异常影响其他任务
+        """
+        tasks = list(tasks)
+        workers = max(1, min(self.settings.llm_max_concurrency, len(tasks)))
+        if workers == 1:
+            return [fn(task) for task in tasks]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm") as executor:
+            return list(executor.map(fn, tasks))
+
+    def _call(self, provider: ProviderConfig, prompt: str, stage: str) -> str:
+        if self.cache is None:
+            return self._metered(provider, prompt, stage)
+        key = ResponseCache.key(provider.name, provider.model, TEMPERATURE, SYSTEM_PROMPT, prompt)
+        return self.cache.get_or_call(key, lambda: self._metered(provider, prompt, stage))
+
+    def _metered(self, provider: ProviderConfig, prompt: str, stage: str) -> str:
+        """实际发出的请求（未命中缓存）计入阶段预算"""
+        if not stage:
+            return self._request(provider, prompt)
+        self.budget.reserve(stage, estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt))
+        response = ""
+        try:
+            response = self._request(provider, prompt)
+            return response
+        finally:
+            self.budget.record(stage, estimate_tokens(response))
 
-    def _call(self, provider: ProviderConfig, prompt: str) -> str:
+    def _request(self, provider: ProviderConfig, prompt: str) -> str:
+        self._limiters[provider.name].acquire()
         client = self._client(provider)
         resp = client.chat.completions.create(
             model=provider.model,
             messages=[
-                {"role": "system", "content": "你是一位专业的 AI 新闻编辑。"},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ],
-            temperature=0.3,
+            temperature=TEMPERATURE,
         )
         return resp.choices[0].message.content.strip()
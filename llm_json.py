@@ -0,0 +1,98 @@
+"""
+LLM 批量响应的容错解析
+
+批量请求要求模型返回 [{"index": 0, ...}, ...]，但响应可能：
+- 被 markdown 代码块包裹
+- 因输出长度上限被截断（最后一个对象不完整）
+- 某个对象里多了/少了一个字符，或对象之间夹杂说明文字
+
+整体 json.loads 失败时不丢弃整个响应：从每个 "{" 处尝试解码，
+逐个取出能完整解析的对象，损坏的部分跳过，由调用方把缺失的编号补发。
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+_decoder = json.JSONDecoder()
+
+
+def strip_code_fence(text: str) -> str:
+    """去掉响应外层的 markdown 代码块标记"""
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    if text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    return text.strip()
+
+
+def extract_objects(text: str) -> list[dict]:
+    """
+    取出响应中的所有 JSON 对象（按出现顺序）
+    能整体解析时返回数组中的对象（或对象本身）；否则逐个解码顶层对象，跳过无法解析的部分
+    """
+    text = strip_code_fence(text)
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        pass
+    else:
+        if isinstance(parsed, list):
+            return [obj for obj in parsed if isinstance(obj, dict)]
+        return [parsed] if isinstance(parsed, dict) else []
+
+    objects: list[dict] = []
+    pos = text.find("{")
+    while pos != -1:
+        try:
+            obj, end = _decoder.raw_decode(text, pos)
+        except ValueError:
+            # 从这里开始的对象不完整：跳到下一个 "{"（可能是下一个对象，也可能是其内层对象）
+            pos = text.find("{", pos + 1)
+            continue
+        if isinstance(obj, dict):
+            objects.append(obj)
+        pos = text.find("{", end)
+    return objects
+
+
+def extract_field(text: str, key: str) -> Any:
+    """取出响应中第一个能解析的 "key": value 的值（外层对象损坏时用），找不到返回 None"""
+    text = strip_code_fence(text)
+    marker = json.dumps(key)
+    pos = text.find(marker)
+    while pos != -1:
+        value_start = pos + len(marker)
+        while value_start < len(text) and text[value_start] in " \t\r\n":
+            value_start += 1
+        if value_start < len(text) and text[value_start] == ":":
+            value_start += 1
+            while value_start < len(text) and text[value_start] in " \t\r\n":
+                value_start += 1
+            try:
+                value, _ = _decoder.raw_decode(text, value_start)
+            except ValueError:
+                pass
+            else:
+                return value
+        pos = text.find(marker, pos + 1)
+    return None
+
+
+def indexed_results(objects: list[dict], size: int) -> dict[int, dict]:
+    """
+    按 index 字段整理结果：{编号: 对象}
+    编号须在 [0, size) 内（数字字符串也接受）；同一编号出现多次时以第一次为准
+    """
+    results: dict[int, dict] = {}
+    for obj in objects:
+        index = obj.get("index")
+        if isinstance(index, str) and index.strip().isdigit():
+            index = int(index)
+        if isinstance(index, int) and not isinstance(index, bool) and 0 <= index < size:
+            results.setdefault(index, obj)
+    return results
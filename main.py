@@ -9,6 +9,8 @@ from datetime import datetime
 
 from apscheduler.schedulers.blocking import BlockingScheduler
 
+from blobstore import BlobStore
+from classifier import LocalClassifier
 from collectors import (
     GitHubCollector,
     NewsAPICollector,
@@ -18,123 +20,219 @@ from collectors import (
     WebScraperCollector,
 )
 from config import load_settings
+from dedup import SimHashIndex
 from delivery import send_email
+from label_store import LabelStore
 from llm import LLMRouter
 from models import NewsItem
 from processing import (
-    classify_with_llm,
+    DiversityQuotas,
+    ScoringWeights,
+    boost_trending,
     deduplicate,
+    deduplicate_content,
     deduplicate_fuzzy,
-    filter_ai_relevance_llm,
+    filter_and_classify_llm,
     filter_relevance_keyword,
-    score,
+    merge_stories,
+    record_content_fingerprints,
+    score_batch,
     select_diverse_items,
+    shortlist_for_selection,
+    summarize_with_llm,
 )
 from report import build_report
-
-SUMMARY_PROMPT = """
-你是一位专业的 AI 领域新闻编辑。请对以下新闻进行摘要：
-
-标题：{title}
-来源：{source}
-原文：{content}
-
-要求：
-1. 用中文输出 2-3 句话的摘要
-2. 突出技术要点和行业影响
-3. 保持客观中立的语气
-4. 如有关键数据/指标，务必保留
-"""
-
-
-OVERVIEW_PROMPT = """
-你是一位专业的 AI 领域新闻编辑。以下是今天的新闻摘要列表，请写一段 80-120 字的中文总体概览：
-
-{summaries}
-"""
+from trends import TrendTracker
+from websub import (
+    PushBuffer,
+    SubscriptionStore,
+    WebSubCollector,
+    WebSubReceiver,
+    WebSubSubscriber,
+)
 
 
-def run_once() -> None:
+def run_once(receiver: WebSubReceiver | None = None) -> None:
     settings = load_settings()
 
     router = LLMRouter(settings, "llm_providers.yaml")
-    collectors = [
-        RSSCollector("sources.yaml"),
-        GitHubCollector("sources.yaml", settings.github_token),
-        NewsAPICollector(settings.newsapi_key, "sources.yaml"),
-        WebScraperCollector("sources.yaml"),
-        RedditCollector("sources.yaml"),
-        TwitterCollector(settings.twitter_bearer_token, "sources.yaml"),
-    ]
-
-    items: list[NewsItem] = []
-    # 并行采集，提高效率
-    with ThreadPoolExecutor(max_workers=6) as executor:
-        futures = {executor.submit(c.collect): c for c in collectors}
-        for future in as_completed(futures):
-            collector = futures[future]
-            try:
-                collected = future.result(timeout=60)
-                items.extend(collected)
-                logging.info(f"{collector.__class__.__name__} collected {len(collected)} items")
-            except Exception as e:
-                logging.error(f"{collector.__class__.__name__} failed: {e}")
-
-    # 去重处理
-    items = deduplicate(items)
-    items = deduplicate_fuzzy(items, threshold=0.75)
-    total_collected = len(items)  # 记录去重后的总数，用于统计
-    logging.info(f"Total items after dedup: {total_collected}")
-
-    # 统计各数据源贡献
-    source_stats = Counter(item.source_type for item in items)
-    logging.info(f"Source distribution: {dict(source_stats)}")
-
-    # ========== 三层过滤机制 ==========
-    # 第一层：关键词预过滤（黑名单+白名单）
-    whitelist_items, greyzone_items, blacklist_items = filter_relevance_keyword(items)
-    logging.info(
-        f"Filter Layer 1 - Keyword: whitelist={len(whitelist_items)}, greyzone={len(greyzone_items)}, blacklist={len(blacklist_items)}"
-    )
-
-    # 第二层：LLM精准判断（仅对灰色地带）
-    llm_approved_items = filter_ai_relevance_llm(greyzone_items, router)
-    logging.info(
-        f"Filter Layer 2 - LLM relevance: {len(llm_approved_items)} approved out of {len(greyzone_items)} greyzone items"
-    )
-
-    # 合并通过的新闻
-    items = whitelist_items + llm_approved_items
-    logging.info(f"Total items after relevance filtering: {len(items)}")
-
-    # 第三层：LLM智能分类
-    classify_with_llm(items, router)
-    logging.info("Filter Layer 3 - LLM classification completed")
-
-    # 评分
-    for item in items:
-        item.score = score(item)
-
-    items.sort(key=lambda x: x.score, reverse=True)
-    # 使用多样性选择器,确保来源均衡
-    items = select_diverse_items(items, max_count=10)
+    blobs: BlobStore | None = None
+    labels: LabelStore | None = None
+    try:
+        # 仅当推送接收端在运行时，才跳过已订阅 feed 的轮询
+        push_urls = {sub["feed_url"] for sub in receiver.store.active()} if receiver else set()
+        rss_collector = RSSCollector("sources.yaml", skip_urls=push_urls)
+        collectors = [
+            rss_collector,
+            WebSubCollector(receiver.buffer if receiver else PushBuffer()),
+            GitHubCollector("sources.yaml", settings.github_token),
+            NewsAPICollector(settings.newsapi_key, "sources.yaml"),
+            WebScraperCollector("sources.yaml"),
+            RedditCollector("sources.yaml"),
+            TwitterCollector(settings.twitter_bearer_token, "sources.yaml"),
+        ]
+
+        # 正文移入磁盘存储，大部分条目在关键词过滤阶段就被丢弃，不必把全部正文留在内存中
+        if settings.content_store_enabled:
+            blobs = BlobStore.create(settings.content_store_dir)
+        items: list[NewsItem] = []
+        # 并行采集，提高效率
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            futures = {executor.submit(c.collect): c for c in collectors}
+            for future in as_completed(futures):
+                collector = futures[future]
+                try:
+                    collected = future.result(timeout=60)
+                    if blobs is not None:
+                        for item in collected:
+                            item.offload(blobs)
+                    items.extend(collected)
+                    logging.info(f"{collector.__class__.__name__} collected {len(collected)} items")
+                except Exception as e:
+                    logging.error(f"{collector.__class__.__name__} failed: {e}")
+
+        if receiver and settings.websub_callback_url:
+            subscriber = WebSubSubscriber(
+                receiver.store,
+                settings.websub_callback_url,
+                settings.websub_secret,
+                settings.websub_lease_seconds,
+            )
+            requested = subscriber.subscribe_discovered(rss_collector.discovered_hubs)
+            logging.info(f"WebSub: {requested} subscription(s) requested")
+
+        # 去重处理
+        items = deduplicate(items)
+        items = deduplicate_fuzzy(items, threshold=0.75)
+        today = datetime.now().date().isoformat()
+        content_index = SimHashIndex.load(
+            settings.content_dedup_index_path,
+            today,
+            window_days=settings.content_dedup_window_days,
+            max_distance=settings.content_dedup_max_distance,
+        )
+        # 条目级结果存储：前几天已判断/分类/摘要过的同一条目直接复用
+        # （内容去重不丢弃存储中已有结果的重复条目，由 LLM 阶段直接复用）
+        labels = (
+            LabelStore(settings.label_store_path, ttl_days=settings.label_store_ttl_days)
+            if settings.label_store_enabled
+            else None
+        )
+        items = deduplicate_content(items, content_index, today, labels=labels)
+        total_collected = len(items)  # 记录去重后的总数，用于统计
+        logging.info(f"Total items after dedup: {total_collected}")
+
+        # 统计各数据源贡献
+        source_stats = Counter(item.source_type for item in items)
+        logging.info(f"Source distribution: {dict(source_stats)}")
+
+        # ========== 三层过滤机制 ==========
+        # 第一层：关键词预过滤（黑名单+白名单）
+        whitelist_items, greyzone_items, blacklist_items = filter_relevance_keyword(items)
+        logging.info(
+            f"Filter Layer 1 - Keyword: whitelist={len(whitelist_items)}, greyzone={len(greyzone_items)}, blacklist={len(blacklist_items)}"
+        )
 
-    # 统计最终选择的来源分布
-    final_stats = Counter(item.source_type for item in items)
-    logging.info(f"Final selection source distribution: {dict(final_stats)}")
+        # 评分（向量化批量计算，所有条目共用同一个参考时间）：评分不依赖 LLM 结果，
+        # 先按评分预排序，只有可能入选的条目进入 LLM 阶段，调用次数不随采集量增长
+        candidates = whitelist_items + greyzone_items
+        scores = score_batch(candidates, ScoringWeights.from_settings(settings))
+        for item, item_score in zip(candidates, scores.tolist(), strict=True):
+            item.score = item_score
+        # 升温话题：今天的标题词与最近几周的 sketch 比较，标题含升温话题的条目加分
+        trend_terms: list[str] = []
+        if settings.trends_enabled:
+            tracker = TrendTracker.load(
+                settings.trends_path, today, window_days=settings.trends_window_days
+            )
+            tracker.observe(candidates)
+            tracker.save(settings.trends_path)
+            trends = tracker.surging(
+                top_k=settings.trends_top_k,
+                min_count=settings.trends_min_count,
+                min_surge=settings.trends_min_surge,
+            )
+            trend_terms = [trend.term for trend in trends]
+            boosted = boost_trending(candidates, trends, settings.trends_score_boost)
+            summary = ", ".join(f"{t.term} ({t.count} vs {t.expected:g})" for t in trends)
+            logging.info(f"Trending terms: {summary or 'none'}; {boosted} items boosted")
+        # 报道聚类：同一事件的多篇报道只保留代表条目，LLM 调用量随事件数而不是采集条数增长
+        if settings.story_clustering_enabled:
+            whitelist_items, greyzone_items = merge_stories(
+                whitelist_items,
+                greyzone_items,
+                window_hours=settings.story_window_hours,
+                title_similarity=settings.story_title_similarity,
+                min_shared_entities=settings.story_min_shared_entities,
+            )
+        quotas = DiversityQuotas.from_settings(settings)
+        whitelist_items, greyzone_items = shortlist_for_selection(
+            whitelist_items,
+            greyzone_items,
+            max_count=settings.digest_max_items,
+            quotas=quotas,
+            factor=settings.shortlist_factor,
+        )
 
-    for item in items:
-        try:
-            item.summary = router.complete(
-                SUMMARY_PROMPT.format(title=item.title, source=item.source, content=item.content)
+        # 第二层 + 第三层：LLM 相关性判断（灰色地带）与分类合并为一次调用，白名单条目只需分类；
+        # 本地模型有把握的条目不再发给 LLM
+        local = (
+            LocalClassifier.load(
+                settings.local_classifier_path,
+                threshold=settings.local_classifier_threshold,
+                min_labels=settings.local_classifier_min_labels,
+                audit_rate=settings.local_classifier_audit_rate,
+                label_log_path=settings.local_classifier_label_log,
             )
-        except Exception as e:
-            logging.warning(f"Failed to generate summary for '{item.title}': {e}")
-            item.summary = "摘要生成失败"
+            if settings.local_classifier_enabled
+            else None
+        )
+        judged = whitelist_items + greyzone_items
+        items = filter_and_classify_llm(whitelist_items, greyzone_items, router, local, labels)
+        # 只记录经过 LLM 阶段的条目：被过滤或预排序淘汰的条目，之后的同一报道仍可入选
+        record_content_fingerprints(judged, content_index, today)
+        content_index.save(settings.content_dedup_index_path)
+        if local is not None:
+            local.save(settings.local_classifier_path)
+        logging.info(f"Total items after relevance filtering: {len(items)}")
+        logging.info("Filter Layer 2+3 - LLM relevance and classification completed")
+
+        items.sort(key=lambda x: x.score, reverse=True)
+        # 使用多样性选择器,确保来源均衡
+        items = select_diverse_items(
+            items,
+            max_count=settings.digest_max_items,
+            quotas=quotas,
+        )
 
-    summaries = "\n".join([f"- {i.title}: {i.summary}" for i in items[:10]])
-    overview = router.complete(OVERVIEW_PROMPT.format(summaries=summaries))
-    report_text, report_html = build_report(items, overview, total_collected)
+        # 统计最终选择的来源分布
+        final_stats = Counter(item.source_type for item in items)
+        logging.info(f"Final selection source distribution: {dict(final_stats)}")
+
+        # 摘要与总体概览：多条新闻合并为一次请求，批次与概览并发生成；
+        # 排名靠后的条目（可选）和 LLM 失败的条目用本地抽取式摘要
+        overview = summarize_with_llm(
+            items, router, labels, llm_items=settings.llm_summary_items, trends=trend_terms
+        )
+        if labels is not None:
+            logging.info(f"Label store: {labels.stats()}")
+        budget_usage = router.budget.usage()
+        logging.info(f"LLM budget usage: {budget_usage}")
+        report_text, report_html = build_report(items, overview, total_collected, budget_usage)
+        if blobs is not None:
+            logging.info(f"Content store: {blobs.stats()}")
+        if router.cache is not None:
+            logging.info(f"LLM cache: {router.cache.stats()}")
+        if retries := router.retry_stats():
+            logging.info(f"LLM batch retries: {retries}")
+    finally:
+        # 中途出错时也关闭正文存储（删除本次运行的存储文件）以及结果存储、LLM 响应缓存的 sqlite 连接
+        if blobs is not None:
+            blobs.close()
+        if labels is not None:
+            labels.close()
+        if router.cache is not None:
+            router.cache.close()
 
     recipients = [e.strip() for e in settings.email_recipients.split(",") if e.strip()]
     subject = f"AI 日报 - {datetime.now().strftime('%Y-%m-%d')}"
@@ -172,10 +270,21 @@ def main() -> None:
         return
 
     settings = load_settings()
+    receiver = None
+    if settings.websub_enabled:
+        receiver = WebSubReceiver(
+            SubscriptionStore(),
+            PushBuffer(),
+            host=settings.websub_host,
+            port=settings.websub_port,
+        )
+        receiver.start()
+
     scheduler = BlockingScheduler(timezone=settings.timezone)
     scheduler.add_job(
         run_once,
         "cron",
+        args=[receiver],
         hour=settings.schedule_hour,
         minute=settings.schedule_minute,
         id="daily_digest",
@@ -1,11 +1,87 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from datetime import datetime
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
 
+from blobstore import PREVIEW_CHARS, BlobStore, ContentRef
+from dedup import char_shingles, content_features, simhash
+from keywords import load_keyword_matcher
 
-@dataclass
-class NewsItem:
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class ItemFeatures:
+    """
+    NewsItem 的派生特征（去重、过滤、分类、评分共用）
+    每个特征第一次访问时计算并缓存，同一条目在各阶段之间不再重复计算
+    """
+
+    def __init__(self, title: str, content: str | ContentRef, published_at: datetime) -> None:
+        self.title = title
+        # 正文已移入 BlobStore 时保存句柄，需要时再加载，特征缓存不持有全文
+        self._content = content
+        self.published_at = published_at
+
+    def matches(self, item: NewsItem) -> bool:
+        """条目的标题/正文/时间被替换后，缓存的特征失效"""
+        return (
+            self.title is item.title
+            and self._content is item._content_handle()
+            and self.published_at is item.published_at
+        )
+
+    @property
+    def content(self) -> str:
+        content = self._content
+        return content if isinstance(content, str) else content.load()
+
+    @property
+    def text(self) -> str:
+        """标题+正文，小写；每次重新生成，不缓存（只缓存由它得到的 keyword_hits，不多留一份全文）"""
+        return f"{self.title} {self.content}".lower()
+
+    @cached_property
+    def title_lower(self) -> str:
+        return self.title.lower()
+
+    @cached_property
+    def title_shingles(self) -> set[str]:
+        """标题字符 n-gram（模糊去重）"""
+        return char_shingles(self.title)
+
+    @cached_property
+    def keyword_hits(self) -> dict[str, list[str]]:
+        """默认关键词配置下各关键词表的命中结果（keywords.yaml）"""
+        return load_keyword_matcher().scan(self.text)
+
+    @cached_property
+    def content_length(self) -> int:
+        content = self._content
+        return len(content) if isinstance(content, str) else content.length
+
+    @cached_property
+    def content_simhash(self) -> int:
+        """正文 SimHash 指纹（内容级去重）"""
+        return simhash(content_features(self.content))
+
+    @cached_property
+    def published_utc(self) -> datetime:
+        """发布时间，无时区信息时按 UTC 处理"""
+        if self.published_at.tzinfo is None:
+            return self.published_at.replace(tzinfo=timezone.utc)
+        return self.published_at.astimezone(timezone.utc)
+
+    @cached_property
+    def published_us(self) -> int:
+        """发布时间的 UTC 微秒时间戳（批量评分用整数运算，与 datetime 相减结果完全一致）"""
+        return (self.published_utc - _EPOCH) // _MICROSECOND
+
+
+@dataclass(slots=True)
+class _NewsItemFields:
     title: str
     url: str
     source: str
@@ -13,9 +89,85 @@ class NewsItem:
     content: str
     published_at: datetime
     author: str | None = None
-    tags: list[str] = field(default_factory=list)
+    tags: tuple[str, ...] = ()
     raw_score: float = 0.0
     fingerprint: str = ""
     category: str | None = None
     score: float = 0.0
     summary: str = ""
+    # 同一事件其他报道的 (来源, 链接)，由报道聚类（stories.py）写入
+    related: tuple[tuple[str, str], ...] = ()
+
+    def __post_init__(self) -> None:
+        # 低基数字段驻留，同一来源/类别/标签的条目共享同一个字符串对象
+        # 作者（Reddit/Twitter 用户名）基数高，驻留后在解释器中常驻且几乎不省内存，不驻留
+        self.source = sys.intern(self.source)
+        self.source_type = sys.intern(self.source_type)
+        if self.category is not None:
+            self.category = sys.intern(self.category)
+        self.tags = tuple(map(sys.intern, self.tags)) if self.tags else ()
+        self.related = tuple(map(tuple, self.related)) if self.related else ()
+
+
+# 数据字段 content 的 slot；NewsItem.content 是在它之上的属性（正文可能已移入 BlobStore）
+_content_slot = _NewsItemFields.content
+
+
+class NewsItem(_NewsItemFields):
+    """
+    新闻条目
+    使用 __slots__，没有实例 __dict__；来源、类别等低基数字符串驻留（同值共享一个对象），
+    没有标签时共用同一个空元组。每条比普通 dataclass 约省 300 字节（scripts/bench_models.py）
+
+    offload() 之后正文在 BlobStore 中，条目只保留句柄和开头的预览；读取 content 时加载全文，
+    只需要开头时用 content_prefix()
+    """
+
+    # 派生特征缓存、正文句柄（不是数据字段，不参与比较/序列化）
+    __slots__ = ("_features", "_body")
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self._features: ItemFeatures | None = None
+
+    @property
+    def content(self) -> str:
+        body = self._body
+        return _content_slot.__get__(self) if body is None else body.load()
+
+    @content.setter
+    def content(self, value: str) -> None:
+        _content_slot.__set__(self, value)
+        self._body: ContentRef | None = None
+
+    def content_prefix(self, chars: int) -> str:
+        """正文开头 chars 个字符；在预览范围内时不加载全文"""
+        body = self._body
+        if body is not None and chars <= len(body.preview):
+            return body.preview[:chars]
+        return self.content[:chars]
+
+    def offload(self, store: BlobStore, min_chars: int = 0) -> None:
+        """
+        把正文移入 store，条目只保留句柄和预览（slot 中只留预览）
+        不超过 min_chars 的正文（默认即预览长度以内）留在内存中
+        """
+        content = _content_slot.__get__(self)
+        if self._body is not None or len(content) <= max(min_chars, PREVIEW_CHARS):
+            return
+        self._body = store.put(content)
+        _content_slot.__set__(self, self._body.preview)
+
+    def _content_handle(self) -> str | ContentRef:
+        """正文句柄（已移入 BlobStore 时）或正文本身，用于特征缓存"""
+        body = self._body
+        return _content_slot.__get__(self) if body is None else body
+
+    @property
+    def features(self) -> ItemFeatures:
+        features = self._features
+        if features is None or not features.matches(self):
+            features = self._features = ItemFeatures(
+                self.title, self._content_handle(), self.published_at
+            )
+        return features
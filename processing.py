@@ -1,21 +1,189 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import heapq
 import logging
+import sys
 from collections import defaultdict
-from collections.abc import Iterable
-from datetime import datetime, timezone
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
 from difflib import SequenceMatcher
-from typing import TYPE_CHECKING
-
+from functools import partial
+from typing import TYPE_CHECKING, TypeVar
+
+import numpy as np
+
+from budget import BudgetExceeded
+from classifier import LocalClassifier, item_features
+from compression import compress
+from dedup import MinHashLSH, SimHashIndex
+from extractive import summarize as summarize_extractive
+from keywords import KeywordMatcher, load_keyword_matcher
+from label_store import CATEGORY, RELEVANCE, SUMMARY, LabelStore, prompt_version
+from llm_json import extract_field, extract_objects, indexed_results
 from models import NewsItem
+from stories import cluster_stories
+from tokens import estimate_tokens, pack_batches
+from trends import Trend, title_terms
 
 if TYPE_CHECKING:
+    from config import Settings
     from llm import LLMRouter
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# 批量 prompt 中每条新闻正文的 token 上限
+# 正文先去掉 markup、代码块和重复句子，超出上限时抽取信息量最高的句子（compression.compress）
+_RELEVANCE_CONTENT_TOKENS = 100
+_CLASSIFY_CONTENT_TOKENS = 120
+# 响应中每条新闻预计占用的 token 数，如 {"index": 12, "relevant": true, "category": "论文与研究"},
+_RELEVANCE_OUTPUT_TOKENS = 16
+_CLASSIFY_OUTPUT_TOKENS = 20
+_RELEVANCE_CLASSIFY_OUTPUT_TOKENS = 28
+# 批量摘要：每条正文的 token 上限、每条摘要和总体概览预计的输出 token 数
+_SUMMARY_CONTENT_TOKENS = 800
+_SUMMARY_OVERVIEW_CONTENT_TOKENS = 150
+# 单条摘要的正文上限（同时受模型上下文窗口限制）
+_SUMMARY_ITEM_CONTENT_TOKENS = 1500
+# 本地抽取式摘要（LLM 失败、预算用完、排名靠后的条目）的长度上限、本地概览列出的标题数
+_LOCAL_SUMMARY_TOKENS = 120
+_LOCAL_SUMMARY_SENTENCES = 3
+_LOCAL_OVERVIEW_TITLES = 5
+_SUMMARY_OUTPUT_TOKENS = 300
+_OVERVIEW_OUTPUT_TOKENS = 300
+# 条目编号前缀（"12. "）
+_INDEX_TOKENS = 2
+
+RELEVANCE_PROMPT = """判断以下新闻是否与人工智能/机器学习/深度学习/大语言模型相关。
+
+评判标准：
+- 相关：新闻主题是AI技术、AI应用、AI研究、AI产品、AI行业动态
+- 不相关：只是偶然提到AI，但主题是其他领域（如体育、娱乐、传统科技等）
+
+请只返回JSON数组，格式: [{{"index": 0, "relevant": true}}, {{"index": 1, "relevant": false}}, ...]
+
+新闻列表:
+{news_list}
+
+只返回JSON数组，不要其他内容。"""
+
+# LLM 可给出的类别（与下面两个提示词中的类别定义一致），其他取值视为未分类
+LLM_CATEGORIES = frozenset(
+    ("论文与研究", "产品与发布", "行业动态", "教程与观点", "开源项目", "应用案例")
+)
+
+CLASSIFY_PROMPT = """对以下AI新闻进行分类。
+
+类别定义：
+- 论文与研究：学术论文、研究成果、技术突破
+- 产品与发布：产品发布、版本更新、新功能上线
+- 行业动态：融资、并购、政策法规、市场分析
+- 教程与观点：技术教程、博客文章、观点分析、最佳实践
+- 开源项目：GitHub项目、开源工具、代码库
+- 应用案例：实际应用、案例研究、落地场景
+
+请只返回JSON数组，格式: [{{"index": 0, "category": "论文与研究"}}, {{"index": 1, "category": "产品与发布"}}, ...]
+
+新闻列表:
+{news_list}
+
+只返回JSON数组，不要其他内容。"""
+
+RELEVANCE_CLASSIFY_PROMPT = """判断以下新闻是否与人工智能/机器学习/深度学习/大语言模型相关，并对相关的新闻分类。
+
+评判标准：
+- 相关：新闻主题是AI技术、AI应用、AI研究、AI产品、AI行业动态
+- 不相关：只是偶然提到AI，但主题是其他领域（如体育、娱乐、传统科技等）
+- 标有 [已确认相关] 的新闻无需判断，relevant 直接填 true
+
+类别定义：
+- 论文与研究：学术论文、研究成果、技术突破
+- 产品与发布：产品发布、版本更新、新功能上线
+- 行业动态：融资、并购、政策法规、市场分析
+- 教程与观点：技术教程、博客文章、观点分析、最佳实践
+- 开源项目：GitHub项目、开源工具、代码库
+- 应用案例：实际应用、案例研究、落地场景
+
+请只返回JSON数组，格式: [{{"index": 0, "relevant": true, "category": "论文与研究"}}, {{"index": 1, "relevant": false, "category": null}}, ...]
+
+新闻列表:
+{news_list}
+
+只返回JSON数组，不要其他内容。"""
+
+
+SUMMARY_PROMPT = """
+你是一位专业的 AI 领域新闻编辑。请对以下新闻进行摘要：
+
+标题：{title}
+来源：{source}
+原文：{content}
+
+要求：
+1. 用中文输出 2-3 句话的摘要
+2. 突出技术要点和行业影响
+3. 保持客观中立的语气
+4. 如有关键数据/指标，务必保留
+"""
+
+OVERVIEW_PROMPT = """
+你是一位专业的 AI 领域新闻编辑。以下是今天的新闻摘要列表，请写一段 80-120 字的中文总体概览。{trends}
+
+{summaries}
+"""
+
+SUMMARY_BATCH_PROMPT = """你是一位专业的 AI 领域新闻编辑。请对以下每条新闻分别进行摘要。
+
+要求：
+1. 每条摘要用中文输出 2-3 句话
+2. 突出技术要点和行业影响
+3. 保持客观中立的语气
+4. 如有关键数据/指标，务必保留
+
+请只返回JSON数组，格式: [{{"index": 0, "summary": "..."}}, {{"index": 1, "summary": "..."}}, ...]
+
+新闻列表:
+{news_list}
+
+只返回JSON数组，不要其他内容。"""
+
+SUMMARY_OVERVIEW_BATCH_PROMPT = """你是一位专业的 AI 领域新闻编辑。以下是今天入选的全部新闻，请对每条新闻分别进行摘要，并写一段总体概览。
+
+要求：
+1. 每条摘要用中文输出 2-3 句话
+2. 突出技术要点和行业影响
+3. 保持客观中立的语气
+4. 如有关键数据/指标，务必保留
+5. 总体概览为一段 80-120 字的中文{trends}
+
+请只返回JSON对象，格式: {{"overview": "...", "summaries": [{{"index": 0, "summary": "..."}}, {{"index": 1, "summary": "..."}}, ...]}}
+
+新闻列表:
+{news_list}
+
+只返回JSON对象，不要其他内容。"""
+
+OVERVIEW_BATCH_PROMPT = """你是一位专业的 AI 领域新闻编辑。以下是今天入选的新闻，请写一段 80-120 字的中文总体概览。{trends}
+
+新闻列表:
+{news_list}
+
+只返回概览正文，不要其他内容。"""
+
+# 条目级结果存储（label_store）的 prompt 版本：相关性和类别由单独 prompt 或合并 prompt 得到，
+# 任一模板修改后旧结果都不再使用
+_RELEVANCE_VERSION = prompt_version(RELEVANCE_PROMPT, RELEVANCE_CLASSIFY_PROMPT)
+_CATEGORY_VERSION = prompt_version(CLASSIFY_PROMPT, RELEVANCE_CLASSIFY_PROMPT)
+_SUMMARY_VERSION = prompt_version(
+    SUMMARY_PROMPT, SUMMARY_BATCH_PROMPT, SUMMARY_OVERVIEW_BATCH_PROMPT
+)
+
 
 def deduplicate(items: Iterable[NewsItem]) -> list[NewsItem]:
     """精确去重：基于 fingerprint"""
@@ -35,175 +203,153 @@ def deduplicate_fuzzy(items: list[NewsItem], threshold: float = 0.75) -> list[Ne
     """
     模糊去重：基于标题相似度
     用于去除跨来源的重复新闻（标题相似但 URL 不同）
+
+    先用 MinHash/LSH 找出字符 n-gram 相近的候选，再用 SequenceMatcher 校验；
+    每条最多校验 max_candidates 个最相近的候选，复杂度随条目数近似线性增长
     """
+    max_candidates = 16
+    lsh = MinHashLSH()
     unique: list[NewsItem] = []
+    titles: list[str] = []
     for item in items:
-        is_dup = False
-        for existing in unique:
-            ratio = SequenceMatcher(None, item.title.lower(), existing.title.lower()).ratio()
-            if ratio >= threshold:
-                # 保留 raw_score 更高的那个
-                if item.raw_score > existing.raw_score:
-                    unique.remove(existing)
-                    unique.append(item)
-                is_dup = True
+        title = item.features.title_lower
+        signature = lsh.signature(item.features.title_shingles)
+        match = None
+        for slot in lsh.query(signature, min_jaccard=0.25, limit=max_candidates):
+            matcher = SequenceMatcher(None, title, titles[slot])
+            if (
+                matcher.real_quick_ratio() >= threshold
+                and matcher.quick_ratio() >= threshold
+                and matcher.ratio() >= threshold
+            ):
+                match = slot
                 break
-        if not is_dup:
+
+        if match is None:
+            lsh.insert(len(unique), signature)
             unique.append(item)
+            titles.append(title)
+        elif item.raw_score > unique[match].raw_score:
+            # 保留 raw_score 更高的那个（原位替换，同时把新标题加入同一槽位的索引）
+            unique[match] = item
+            titles[match] = title
+            lsh.insert(match, signature)
     return unique
 
 
-def filter_relevance_keyword(
+def deduplicate_content(
     items: list[NewsItem],
-) -> tuple[list[NewsItem], list[NewsItem], list[NewsItem]]:
+    index: SimHashIndex,
+    today: str,
+    min_length: int = 80,
+    labels: LabelStore | None = None,
+) -> list[NewsItem]:
     """
-    第一层：关键词预过滤（黑名单+白名单）
-    返回: (白名单通过, 灰色地带, 黑名单过滤)
+    内容级去重：基于正文 SimHash 指纹
+    用于去除改写标题的转载文章，以及前几天已处理过的同一报道
+
+    - 与历史（index 中 today 之前日期的指纹）重复：丢弃。
+      但 labels（结果存储）中已有判定的同一条目（同一标题和链接、同一正文）保留：
+      连续多天出现的 GitHub 热门项目、arXiv 论文由之后的 LLM 阶段直接复用保存的结果，不产生调用；
+      换了链接或改了正文的转载没有保存的结果，照常丢弃
+    - 与本次运行中已保留的条目重复：保留 raw_score 更高者（原位替换）
+    - 正文过短（< min_length）的条目指纹不可靠，不参与比较
+    不写入 index：只有经过 LLM 阶段的条目才由 record_content_fingerprints 记录
     """
-    # 黑名单：明显不相关的关键词（体育、娱乐、政治等）
-    BLACKLIST = [
-        # 体育
-        "superbowl",
-        "super bowl",
-        "nfl",
-        "nba",
-        "nhl",
-        "mlb",
-        "fifa",
-        "world cup",
-        "football",
-        "soccer",
-        "basketball",
-        "baseball",
-        "hockey",
-        "olympics",
-        "playoff",
-        "championship",
-        "tournament",
-        "athlete",
-        "coach",
-        "player stats",
-        # 娱乐
-        "celebrity",
-        "movie",
-        "film",
-        "actor",
-        "actress",
-        "oscar",
-        "grammy",
-        "music album",
-        "concert",
-        "box office",
-        "hollywood",
-        "netflix show",
-        # 政治（除非与AI政策相关）
-        "election results",
-        "president elect",
-        "senate vote",
-        "congress bill",
-        "political campaign",
-        "democrat",
-        "republican",
-        # 其他
-        "weather",
-        "traffic",
-        "crime",
-        "accident",
-        "obituary",
-        "real estate",
-        "stock market crash",
-        "cryptocurrency price",
+    for item in items:
+        if not item.fingerprint:
+            item.fingerprint = _fingerprint(item)
+    repeats = [
+        item
+        for item in items
+        if item.features.content_length >= min_length
+        and index.find(item.features.content_simhash, before=today) is not None
     ]
+    reusable: set[int] = set()
+    if labels is not None and repeats:
+        relevance = labels.get(repeats, RELEVANCE, _RELEVANCE_VERSION)
+        categories = labels.get(repeats, CATEGORY, _CATEGORY_VERSION)
+        reusable = {
+            id(item)
+            for item, verdict, category in zip(repeats, relevance, categories, strict=True)
+            if verdict is not None or category is not None
+        }
+    previous = {id(item) for item in repeats} - reusable
+
+    seen = SimHashIndex(index.max_distance)
+    unique: list[NewsItem] = []
+    slots: dict[str, int] = {}
+    for item in items:
+        if item.features.content_length < min_length:
+            unique.append(item)
+            continue
+        if id(item) in previous:
+            continue
+        fingerprint = item.features.content_simhash
+        match = seen.find(fingerprint)
+        if match is None:
+            seen.add(fingerprint, item.fingerprint, today)
+            slots[item.fingerprint] = len(unique)
+            unique.append(item)
+        else:
+            slot = slots[match[1]]
+            if item.raw_score > unique[slot].raw_score:
+                unique[slot] = item
+                seen.add(fingerprint, item.fingerprint, today)
+                slots[item.fingerprint] = slot
+    if previous or reusable:
+        logger.info(
+            f"Content dedup: dropped {len(previous)} items seen in previous days, "
+            f"kept {len(reusable)} repeats with stored labels"
+        )
+    return unique
 
-    # 白名单：明确与AI相关的关键词
-    WHITELIST = [
-        # 核心AI术语
-        "artificial intelligence",
-        "machine learning",
-        "deep learning",
-        "neural network",
-        "llm",
-        "large language model",
-        "gpt",
-        "transformer",
-        "diffusion model",
-        "generative ai",
-        "genai",
-        "foundation model",
-        "multimodal",
-        # 中文AI术语（扩充）
-        "人工智能",
-        "机器学习",
-        "深度学习",
-        "神经网络",
-        "大模型",
-        "生成式",
-        "大语言模型",
-        "智能体",
-        "多模态",
-        "具身智能",
-        "扩散模型",
-        "开源模型",
-        "算力",
-        "推理",
-        "训练",
-        "微调",
-        "预训练",
-        "提示词",
-        "提示工程",
-        "向量数据库",
-        "检索增强",
-        "知识图谱",
-        "强化学习",
-        "迁移学习",
-        "自然语言处理",
-        "计算机视觉",
-        "语音识别",
-        "图像生成",
-        "文本生成",
-        # 学术来源
-        "arxiv",
-        "neurips",
-        "icml",
-        "iclr",
-        "cvpr",
-        "acl",
-        "emnlp",
-        # 知名AI项目/公司
-        "openai",
-        "anthropic",
-        "deepmind",
-        "hugging face",
-        "langchain",
-        "pytorch",
-        "tensorflow",
-        "stable diffusion",
-        "midjourney",
-        # AI应用领域
-        "computer vision",
-        "natural language processing",
-        "nlp",
-        "speech recognition",
-        "reinforcement learning",
-        "autonomous",
-        "chatbot",
-        "ai agent",
-    ]
 
+def record_content_fingerprints(
+    items: Iterable[NewsItem], index: SimHashIndex, today: str, min_length: int = 80
+) -> int:
+    """
+    把经过 LLM 阶段（已判断相关性/分类或入选）的条目指纹以 today 写入 index，返回写入条数
+    被关键词过滤、预排序淘汰的条目不写入，之后对同一事件的报道仍可进入日报；
+    由调用方负责持久化
+    """
+    added = 0
+    for item in items:
+        if item.features.content_length < min_length:
+            continue
+        if not item.fingerprint:
+            item.fingerprint = _fingerprint(item)
+        fingerprint = item.features.content_simhash
+        match = index.find(fingerprint)
+        if match is not None and match[1] == item.fingerprint:
+            continue  # 同一天重复运行时已记录过
+        index.add(fingerprint, item.fingerprint, today)
+        added += 1
+    return added
+
+
+def filter_relevance_keyword(
+    items: list[NewsItem], matcher: KeywordMatcher | None = None
+) -> tuple[list[NewsItem], list[NewsItem], list[NewsItem]]:
+    """
+    第一层：关键词预过滤（黑名单+白名单，见 keywords.yaml）
+    返回: (白名单通过, 灰色地带, 黑名单过滤)
+    """
     whitelist_pass: list[NewsItem] = []
     greyzone: list[NewsItem] = []
     blacklist_filtered: list[NewsItem] = []
 
     for item in items:
-        text = f"{item.title} {item.content}".lower()
+        # 默认配置直接使用条目缓存的命中结果
+        hits = item.features.keyword_hits if matcher is None else matcher.scan(item.features.text)
 
         # 检查黑名单
-        if any(keyword in text for keyword in BLACKLIST):
+        if "blacklist" in hits:
             blacklist_filtered.append(item)
             continue
 
         # 检查白名单
-        if any(keyword in text for keyword in WHITELIST):
+        if "whitelist" in hits:
             whitelist_pass.append(item)
         else:
             # 灰色地带：既不在黑名单也不在白名单
@@ -215,284 +361,1000 @@ def filter_relevance_keyword(
     return whitelist_pass, greyzone, blacklist_filtered
 
 
-def filter_ai_relevance_llm(items: list[NewsItem], router: LLMRouter) -> list[NewsItem]:
+def _news_entry(item: NewsItem, content_tokens: int) -> str:
+    """批量 prompt 中的一条新闻（不含编号）"""
+    return f"标题: {item.title}\n   内容: {compress(item.content, content_tokens, item.title)}"
+
+
+def _fused_entry(task: tuple[NewsItem, bool]) -> str:
+    item, confirmed = task
+    entry = _news_entry(item, _CLASSIFY_CONTENT_TOKENS)
+    return f"[已确认相关] {entry}" if confirmed else entry
+
+
+def _pack_prompt_batches(
+    router: LLMRouter,
+    entries: list[T],
+    render: Callable[[T], str],
+    prompt: str,
+    output_tokens_per_item: int,
+    reserved_output_tokens: int = 0,
+    **fields: str,
+) -> list[tuple[int, list[T]]]:
+    """
+    按当前供应商的 token 预算把条目装进批次，返回 (批次编号, 条目) 列表
+    每批不超过 llm_batch_max_items 条；短条目（如 GitHub 项目简介）一批能装更多
+    reserved_output_tokens: 响应中与条目无关的输出（如总体概览）
+    fields: prompt 中除新闻列表外的其他字段（如升温话题）
+    """
+    budget = router.token_budget()
+    budget = replace(budget, max_output_tokens=budget.max_output_tokens - reserved_output_tokens)
+    batches = pack_batches(
+        entries,
+        lambda entry: estimate_tokens(render(entry)) + _INDEX_TOKENS,
+        budget,
+        overhead_tokens=estimate_tokens(prompt.format(news_list="", **fields)),
+        output_tokens_per_item=output_tokens_per_item,
+        max_items=router.settings.llm_batch_max_items,
+    )
+    return list(enumerate(batches, start=1))
+
+
+def _numbered_list(entries: list[T], render: Callable[[T], str]) -> str:
+    return "\n".join(f"{idx}. {render(entry)}" for idx, entry in enumerate(entries))
+
+
+def _complete_indexed(
+    router: LLMRouter,
+    stage: str,
+    batch_no: int,
+    entries: list[T],
+    build_prompt: Callable[[list[T]], str],
+) -> dict[int, dict]:
+    """
+    发送一批条目并按编号容错解析结果，返回 {条目在 entries 中的下标: 结果对象}
+    - 响应截断或部分损坏时保留能解析的对象（llm_json.extract_objects）
+    - 没有得到结果的条目组成更小的批次补发，最多 llm_batch_retries 轮，每次补发计入
+      router.record_retry；整批都没解析出来时拆成两半补发（补发批次总比原批次小，
+      prompt 不同，不会命中响应缓存里的同一个坏响应）
+    stage 同时是预算阶段（router.complete 的 stage）
+    首次请求失败（异常，包括 BudgetExceeded）时抛出，由调用方整批回退；补发失败的条目视为缺失
+    """
+    answered: dict[int, dict] = {}
+    groups = [list(range(len(entries)))]
+    for attempt in range(router.settings.llm_batch_retries + 1):
+        retry_groups: list[list[int]] = []
+        for group in groups:
+            if attempt:
+                router.record_retry(stage, len(group))
+            try:
+                response = router.complete(build_prompt([entries[i] for i in group]), stage)
+            except Exception as e:
+                if not attempt:
+                    raise
+                logger.warning(f"LLM {stage} retry failed for batch {batch_no}: {e}")
+                continue
+            results = indexed_results(extract_objects(response), len(group))
+            for idx, result in results.items():
+                answered[group[idx]] = result
+            missing = [i for idx, i in enumerate(group) if idx not in results]
+            if len(missing) == len(group):
+                half = len(group) // 2
+                retry_groups.extend(
+                    g for g in (group[:half], group[half:]) if 0 < len(g) < len(group)
+                )
+            elif missing:
+                retry_groups.append(missing)
+        if not retry_groups or attempt == router.settings.llm_batch_retries:
+            break
+        logger.info(
+            f"LLM {stage}: batch {batch_no}, re-sending {sum(map(len, retry_groups))} items "
+            f"missing from the response"
+        )
+        groups = retry_groups
+    return answered
+
+
+def filter_ai_relevance_llm(
+    items: list[NewsItem], router: LLMRouter, labels: LabelStore | None = None
+) -> list[NewsItem]:
     """
     第二层：LLM精准判断（仅用于灰色地带）
-    批量处理以减少API调用
+    批量处理以减少API调用，各批次并发发送（并发数见 llm_max_concurrency）
+    labels: 条目级结果存储（可选）。已有结论的条目不再发给 LLM，LLM 的新结论写回存储
     """
     if not items:
         return []
 
-    # 批量处理，每批10条
-    batch_size = 10
-    relevant_items: list[NewsItem] = []
+    kept: set[int] = set()
+    pending = items
+    if labels is not None:
+        stored = labels.get(items, RELEVANCE, _RELEVANCE_VERSION)
+        kept.update(id(item) for item, verdict in zip(items, stored, strict=True) if verdict)
+        pending = [item for item, verdict in zip(items, stored, strict=True) if verdict is None]
+        if len(pending) < len(items):
+            logger.info(f"Label store: {len(items) - len(pending)} relevance verdicts reused")
+
+    batches = _pack_prompt_batches(
+        router,
+        pending,
+        partial(_news_entry, content_tokens=_RELEVANCE_CONTENT_TOKENS),
+        RELEVANCE_PROMPT,
+        _RELEVANCE_OUTPUT_TOKENS,
+    )
+    results = router.run_concurrent(partial(_judge_relevance_batch, router), batches)
+    for batch_kept, verdicts in results:
+        kept.update(id(item) for item in batch_kept)
+        if labels is not None:
+            labels.put(verdicts, RELEVANCE, _RELEVANCE_VERSION)
+    return [item for item in items if id(item) in kept]
 
-    for i in range(0, len(items), batch_size):
-        batch = items[i : i + batch_size]
 
-        # 构建批量判断的prompt
-        news_list = "\n".join(
-            [
-                f"{idx}. 标题: {item.title}\n   内容: {item.content[:200]}"
-                for idx, item in enumerate(batch)
-            ]
+def _judge_relevance_batch(
+    router: LLMRouter, numbered_batch: tuple[int, list[NewsItem]]
+) -> tuple[list[NewsItem], list[tuple[NewsItem, bool]]]:
+    """
+    判断一批条目的相关性，返回 (相关的条目, LLM 给出的判定)
+    失败时保留整批，缺失结果的条目保留（这些条目没有判定）
+    """
+    batch_no, batch = numbered_batch
+    render = partial(_news_entry, content_tokens=_RELEVANCE_CONTENT_TOKENS)
+
+    try:
+        results = _complete_indexed(
+            router,
+            "relevance",
+            batch_no,
+            batch,
+            lambda entries: RELEVANCE_PROMPT.format(news_list=_numbered_list(entries, render)),
         )
+    except BudgetExceeded as e:
+        # 预算用完：灰色地带条目直接丢弃
+        logger.warning(f"{e}: dropping {len(batch)} greyzone items of batch {batch_no}")
+        return [], []
+    except Exception as e:
+        logger.warning(f"LLM relevance filter failed for batch {batch_no}: {e}")
+        # 失败时保守处理：保留所有
+        return list(batch), []
+
+    # 没有结果的条目保守保留
+    relevant_items = [
+        item for idx, item in enumerate(batch) if idx not in results or results[idx].get("relevant")
+    ]
+    verdicts = [
+        (batch[idx], result["relevant"])
+        for idx, result in results.items()
+        if isinstance(result.get("relevant"), bool)
+    ]
+    logger.info(
+        f"LLM relevance filter: batch {batch_no}, {len(relevant_items)} kept out of {len(batch)} "
+        f"({len(batch) - len(results)} without result)"
+    )
+    return relevant_items, verdicts
 
-        prompt = f"""判断以下新闻是否与人工智能/机器学习/深度学习/大语言模型相关。
 
-评判标准：
-- 相关：新闻主题是AI技术、AI应用、AI研究、AI产品、AI行业动态
-- 不相关：只是偶然提到AI，但主题是其他领域（如体育、娱乐、传统科技等）
+def classify_with_llm(
+    items: list[NewsItem], router: LLMRouter, labels: LabelStore | None = None
+) -> None:
+    """
+    第三层：LLM智能分类
+    批量处理并直接修改items的category属性，各批次并发发送（并发数见 llm_max_concurrency）
+    labels: 条目级结果存储（可选）。已有类别的条目不再发给 LLM，LLM 的新分类写回存储
+    """
+    if not items:
+        return
 
-请只返回JSON数组，格式: [{{"index": 0, "relevant": true}}, {{"index": 1, "relevant": false}}, ...]
+    pending = items
+    if labels is not None:
+        stored = labels.get(items, CATEGORY, _CATEGORY_VERSION)
+        pending = []
+        for item, category in zip(items, stored, strict=True):
+            if category is None:
+                pending.append(item)
+            else:
+                item.category = sys.intern(category)
+        if len(pending) < len(items):
+            logger.info(f"Label store: {len(items) - len(pending)} categories reused")
+    _classify_pending(pending, router, labels)
+
+
+def _classify_pending(
+    items: list[NewsItem], router: LLMRouter, labels: LabelStore | None = None
+) -> None:
+    """LLM 分类（不查存储），LLM 给出的类别写回存储"""
+    batches = _pack_prompt_batches(
+        router,
+        items,
+        partial(_news_entry, content_tokens=_CLASSIFY_CONTENT_TOKENS),
+        CLASSIFY_PROMPT,
+        _CLASSIFY_OUTPUT_TOKENS,
+    )
+    results = router.run_concurrent(partial(_classify_batch, router), batches)
+    if labels is not None:
+        for categorized in results:
+            labels.put(categorized, CATEGORY, _CATEGORY_VERSION)
 
-新闻列表:
-{news_list}
 
-只返回JSON数组，不要其他内容。"""
+def _classify_batch(
+    router: LLMRouter, numbered_batch: tuple[int, list[NewsItem]]
+) -> list[tuple[NewsItem, str]]:
+    """
+    为一批条目分类；失败或缺失结果的条目回退到关键词分类
+    返回 LLM 给出的 (条目, 类别)，不含回退的条目
+    """
+    batch_no, batch = numbered_batch
+    render = partial(_news_entry, content_tokens=_CLASSIFY_CONTENT_TOKENS)
+
+    try:
+        results = _complete_indexed(
+            router,
+            "classify",
+            batch_no,
+            batch,
+            lambda entries: CLASSIFY_PROMPT.format(news_list=_numbered_list(entries, render)),
+        )
+    except Exception as e:
+        logger.warning(f"LLM classification failed for batch {batch_no}: {e}")
+        results = {}
+
+    categorized: list[tuple[NewsItem, str]] = []
+    for idx, item in enumerate(batch):
+        category = _llm_category(results[idx]) if idx in results else None
+        if category is not None:
+            item.category = category
+            categorized.append((item, category))
+        elif not item.category:
+            item.category = classify(item)
 
-        try:
-            response = router.complete(prompt)
-            # 尝试解析JSON响应
-            # 清理可能的markdown代码块标记
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.startswith("```"):
-                response = response[3:]
-            if response.endswith("```"):
-                response = response[:-3]
-            response = response.strip()
-
-            results = json.loads(response)
-
-            for result in results:
-                idx = result.get("index", -1)
-                is_relevant = result.get("relevant", False)
-                if 0 <= idx < len(batch) and is_relevant:
-                    relevant_items.append(batch[idx])
-
-            logger.info(
-                f"LLM relevance filter: batch {i // batch_size + 1}, {len([r for r in results if r.get('relevant')])} relevant out of {len(batch)}"
+    logger.info(
+        f"LLM classification: batch {batch_no} completed, {len(results)} of {len(batch)} classified"
+    )
+    return categorized
+
+
+def _llm_category(result: dict) -> str | None:
+    """LLM 结果中的类别；不在 LLM_CATEGORIES 中（缺失、为空或编造的类别）时返回 None"""
+    category = result.get("category")
+    if not isinstance(category, str) or category.strip() not in LLM_CATEGORIES:
+        return None
+    # LLM 返回的类别是新解析出的字符串，驻留后同类别条目共享一个对象
+    return sys.intern(category.strip())
+
+
+def filter_and_classify_llm(
+    relevant: list[NewsItem],
+    candidates: list[NewsItem],
+    router: LLMRouter,
+    local: LocalClassifier | None = None,
+    labels: LabelStore | None = None,
+) -> list[NewsItem]:
+    """
+    第二层 + 第三层合并：一次 LLM 调用同时判断相关性并分类
+    - relevant: 已确认相关的条目（白名单），只需分类
+    - candidates: 灰色地带条目，需判断相关性，相关的同时分类
+    - local: 本地模型（可选）。有把握的条目在本地决定，只有没把握的条目发给 LLM；
+      LLM 的判定再用于增量训练本地模型
+    - labels: 条目级结果存储（可选）。最先查询，已有结论的条目不再交给本地模型和 LLM；
+      LLM 的新判定写回存储
+    返回相关条目并写入 category；合并调用没能给出分类的条目
+    （批次失败、漏掉编号、类别无效）再走单独的分类流程
+    """
+    decided: list[NewsItem] = []
+    if labels is not None:
+        relevant, candidates, decided = _apply_stored_labels(relevant, candidates, labels)
+    if local is not None:
+        relevant, candidates, decided_locally = _decide_locally(relevant, candidates, local)
+        decided += decided_locally
+
+    tasks = [(item, True) for item in relevant] + [(item, False) for item in candidates]
+    if not tasks:
+        return decided
+
+    # 白名单与灰色地带条目混排，减少调用次数
+    batches = _pack_prompt_batches(
+        router, tasks, _fused_entry, RELEVANCE_CLASSIFY_PROMPT, _RELEVANCE_CLASSIFY_OUTPUT_TOKENS
+    )
+    results = router.run_concurrent(partial(_judge_and_classify_batch, router), batches)
+
+    rejected: set[int] = set()
+    uncategorized: list[NewsItem] = []
+    for batch_rejected, batch_uncategorized, verdicts in results:
+        rejected.update(batch_rejected)
+        uncategorized.extend(batch_uncategorized)
+        if local is not None:
+            for item, is_relevant, category in verdicts:
+                local.learn(item, is_relevant, category)
+        if labels is not None:
+            labels.put(
+                [(item, is_relevant) for item, is_relevant, _ in verdicts],
+                RELEVANCE,
+                _RELEVANCE_VERSION,
+            )
+            labels.put(
+                [(item, category) for item, _, category in verdicts], CATEGORY, _CATEGORY_VERSION
             )
 
-        except Exception as e:
-            logger.warning(f"LLM relevance filter failed for batch {i // batch_size + 1}: {e}")
-            # 失败时保守处理：保留所有
-            relevant_items.extend(batch)
+    kept = decided + relevant + [item for item in candidates if id(item) not in rejected]
+    logger.info(
+        f"LLM relevance+classification: {len(candidates) - len(rejected)} approved out of {len(candidates)} greyzone items"
+    )
+    if uncategorized:
+        logger.info(
+            f"LLM relevance+classification: {len(uncategorized)} items need separate classification"
+        )
+        # 这些条目已查过存储，直接交给 LLM
+        _classify_pending(uncategorized, router, labels)
+    return kept
+
+
+def _apply_stored_labels(
+    relevant: list[NewsItem], candidates: list[NewsItem], labels: LabelStore
+) -> tuple[list[NewsItem], list[NewsItem], list[NewsItem]]:
+    """
+    查询条目级结果存储（同一个热门项目、同一篇论文常连续多天被采集到）：
+    - 灰色地带条目存有不相关结论的直接丢弃，存有相关结论的转为只需分类
+    - 相关条目存有类别的直接写入 category
+    返回: (需分类的相关条目, 需判断相关性的条目, 已完成的条目)
+    """
+    need_category = list(relevant)
+    need_relevance: list[NewsItem] = []
+    dropped = 0
+    stored = labels.get(candidates, RELEVANCE, _RELEVANCE_VERSION)
+    for item, verdict in zip(candidates, stored, strict=True):
+        if verdict is None:
+            need_relevance.append(item)
+        elif verdict:
+            need_category.append(item)
+        else:
+            dropped += 1
+
+    decided: list[NewsItem] = []
+    pending: list[NewsItem] = []
+    stored = labels.get(need_category, CATEGORY, _CATEGORY_VERSION)
+    for item, category in zip(need_category, stored, strict=True):
+        if category is None:
+            pending.append(item)
+        else:
+            item.category = sys.intern(category)
+            decided.append(item)
 
-    return relevant_items
+    logger.info(
+        f"Label store: {len(decided)} decided, {dropped} dropped as irrelevant, "
+        f"{len(pending) + len(need_relevance)} not stored"
+    )
+    return pending, need_relevance, decided
 
 
-def classify_with_llm(items: list[NewsItem], router: LLMRouter) -> None:
+def _decide_locally(
+    relevant: list[NewsItem], candidates: list[NewsItem], local: LocalClassifier
+) -> tuple[list[NewsItem], list[NewsItem], list[NewsItem]]:
     """
-    第三层：LLM智能分类
-    批量处理并直接修改items的category属性
+    本地模型先判断：
+    - 灰色地带条目本地判为不相关的直接丢弃，判为相关的转为只需分类
+    - 相关条目本地能确定分类的直接写入 category，不再发给 LLM
+    返回: (需 LLM 分类的相关条目, 需 LLM 判断相关性的条目, 本地完成的条目)
+    抽查的条目无论本地是否有把握都交给 LLM
     """
-    if not items:
-        return
+    need_category: list[NewsItem] = []
+    need_relevance: list[NewsItem] = []
+    decided: list[NewsItem] = []
+    dropped = 0
+    for item, confirmed in [(i, True) for i in relevant] + [(i, False) for i in candidates]:
+        if local.audit(item):
+            (need_category if confirmed else need_relevance).append(item)
+            continue
+        features = item_features(item)
+        if not confirmed:
+            verdict = local.judge_relevance(features)
+            if verdict is None:
+                need_relevance.append(item)
+                continue
+            if not verdict:
+                dropped += 1
+                continue
+        category = local.classify(features)
+        if category is None:
+            need_category.append(item)
+        else:
+            item.category = category
+            decided.append(item)
 
-    # 批量处理，每批8条
-    batch_size = 8
+    logger.info(
+        f"Local classifier: {len(decided)} decided, {dropped} dropped as irrelevant, "
+        f"{len(need_category) + len(need_relevance)} sent to LLM"
+    )
+    return need_category, need_relevance, decided
 
-    for i in range(0, len(items), batch_size):
-        batch = items[i : i + batch_size]
 
-        # 构建批量分类的prompt
-        news_list = "\n".join(
-            [
-                f"{idx}. 标题: {item.title}\n   内容: {item.content[:300]}"
-                for idx, item in enumerate(batch)
-            ]
+def _judge_and_classify_batch(
+    router: LLMRouter, numbered_batch: tuple[int, list[tuple[NewsItem, bool]]]
+) -> tuple[set[int], list[NewsItem], list[tuple[NewsItem, bool | None, str | None]]]:
+    """
+    一批条目的相关性判断 + 分类
+    返回: (判定不相关的条目 id, 相关但未得到分类的条目, LLM 给出的判定)；
+    失败时整批保留且整批待分类。判定为 (条目, 相关性, 类别)，白名单条目的相关性为 None
+    """
+    batch_no, batch = numbered_batch
+
+    try:
+        answered = _complete_indexed(
+            router,
+            "relevance_classify",
+            batch_no,
+            batch,
+            lambda entries: RELEVANCE_CLASSIFY_PROMPT.format(
+                news_list=_numbered_list(entries, _fused_entry)
+            ),
         )
+    except BudgetExceeded as e:
+        # 预算用完：灰色地带条目丢弃，白名单条目交给分类流程（其预算也用完时回退到关键词分类）
+        logger.warning(f"{e}: dropping greyzone items of batch {batch_no}")
+        rejected = {id(item) for item, confirmed in batch if not confirmed}
+        return rejected, [item for item, confirmed in batch if confirmed], []
+    except Exception as e:
+        logger.warning(f"LLM relevance+classification failed for batch {batch_no}: {e}")
+        # 失败时保守处理：保留所有，分类交给单独的分类流程
+        return set(), [item for item, _ in batch], []
+
+    rejected: set[int] = set()
+    uncategorized: list[NewsItem] = []
+    labels: list[tuple[NewsItem, bool | None, str | None]] = []
+    for idx, (item, confirmed) in enumerate(batch):
+        result = answered.get(idx)
+        if result is None:
+            # 漏掉的条目：相关性未知时保守保留
+            uncategorized.append(item)
+            continue
+        verdict = result.get("relevant")
+        verdict = None if confirmed or not isinstance(verdict, bool) else verdict
+        if not confirmed and not result.get("relevant", False):
+            rejected.add(id(item))
+            labels.append((item, verdict, None))
+            continue
+        category = _llm_category(result)
+        if category is not None:
+            item.category = category
+            labels.append((item, verdict, category))
+        else:
+            uncategorized.append(item)
+            labels.append((item, verdict, None))
 
-        prompt = f"""对以下AI新闻进行分类。
+    logger.info(
+        f"LLM relevance+classification: batch {batch_no}, {len(batch) - len(rejected)} relevant out of {len(batch)}"
+    )
+    return rejected, uncategorized, labels
 
-类别定义：
-- 论文与研究：学术论文、研究成果、技术突破
-- 产品与发布：产品发布、版本更新、新功能上线
-- 行业动态：融资、并购、政策法规、市场分析
-- 教程与观点：技术教程、博客文章、观点分析、最佳实践
-- 开源项目：GitHub项目、开源工具、代码库
-- 应用案例：实际应用、案例研究、落地场景
 
-请只返回JSON数组，格式: [{{"index": 0, "category": "论文与研究"}}, {{"index": 1, "category": "产品与发布"}}, ...]
+def classify(item: NewsItem, matcher: KeywordMatcher | None = None) -> str:
+    """关键词分类器，分类及其关键词按优先级配置在 keywords.yaml"""
+    if matcher is None:
+        matcher = load_keyword_matcher()
+        hits = item.features.keyword_hits
+    else:
+        hits = matcher.scan(item.features.text)
+    return matcher.classify(hits) or "其他"
+
+
+@dataclass(frozen=True)
+class ScoringWeights:
+    """评分参数（默认值即原评分公式）"""
+
+    base: float = 0.5  # 基础权重
+    recency: float = 0.3  # 时效性权重
+    content: float = 0.2  # 内容完整度权重
+    recency_hours: float = 72  # 时效性因子在该时长内从 1.0 线性衰减
+    recency_floor: float = 0.3  # 时效性因子下限
+    min_content_length: int = 100  # 正文超过该长度视为有实际内容
+    short_content_factor: float = 0.7  # 只有标题/正文过短时的内容完整度因子
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> ScoringWeights:
+        return cls(
+            base=settings.score_base_weight,
+            recency=settings.score_recency_weight,
+            content=settings.score_content_weight,
+            recency_hours=settings.score_recency_hours,
+            recency_floor=settings.score_recency_floor,
+        )
 
-新闻列表:
-{news_list}
 
-只返回JSON数组，不要其他内容。"""
+DEFAULT_SCORING_WEIGHTS = ScoringWeights()
 
-        try:
-            response = router.complete(prompt)
-            # 清理可能的markdown代码块标记
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.startswith("```"):
-                response = response[3:]
-            if response.endswith("```"):
-                response = response[:-3]
-            response = response.strip()
-
-            results = json.loads(response)
-
-            for result in results:
-                idx = result.get("index", -1)
-                category = result.get("category", "其他")
-                if 0 <= idx < len(batch):
-                    batch[idx].category = category
-
-            logger.info(f"LLM classification: batch {i // batch_size + 1} completed")
 
-        except Exception as e:
-            logger.warning(f"LLM classification failed for batch {i // batch_size + 1}: {e}")
-            # 失败时回退到关键词分类
-            for item in batch:
-                if not item.category:
-                    item.category = classify(item)
-
-
-def classify(item: NewsItem) -> str:
-    """增强版分类器,使用更丰富的关键词"""
-    text = f"{item.title} {item.content}".lower()
-
-    # 论文与研究 - 添加更多学术关键词
-    if any(
-        k in text
-        for k in [
-            "paper",
-            "arxiv",
-            "论文",
-            "research",
-            "study",
-            "icml",
-            "neurips",
-            "iclr",
-            "cvpr",
-            "emnlp",
-            "acl",
-        ]
-    ):
-        return "论文与研究"
-
-    # 产品与发布
-    if any(
-        k in text
-        for k in ["release", "发布", "launch", "announce", "v1.", "v2.", "v3.", "版本", "新版"]
-    ):
-        return "产品与发布"
-
-    # 行业动态
-    if any(
-        k in text
-        for k in [
-            "funding",
-            "融资",
-            "acquisition",
-            "并购",
-            "policy",
-            "regulation",
-            "投资",
-            "收购",
-            "估值",
-        ]
-    ):
-        return "行业动态"
-
-    # 教程与观点
-    if any(
-        k in text
-        for k in ["tutorial", "guide", "教程", "how to", "入门", "实战", "blog", "观点", "分析"]
-    ):
-        return "教程与观点"
-
-    # 开源项目
-    if any(
-        k in text for k in ["github", "repo", "open-source", "开源", "star", "fork", "trending"]
-    ):
-        return "开源项目"
-
-    return "其他"
-
-
-def score(item: NewsItem) -> float:
+def score(
+    item: NewsItem,
+    weights: ScoringWeights = DEFAULT_SCORING_WEIGHTS,
+    now: datetime | None = None,
+) -> float:
     """
     多维度评分算法:
     - raw_score: 基础质量分（来源权威度或社交热度）
     - recency_factor: 时效性因子
     - content_factor: 内容完整度因子
+    批量评分请用 score_batch（结果与逐条调用完全一致）
     """
-    now = datetime.now(timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    features = item.features
 
-    # 处理无时区信息的时间
-    if item.published_at.tzinfo is None:
-        published = item.published_at.replace(tzinfo=timezone.utc)
-    else:
-        published = item.published_at
-
-    age_hours = max((now - published).total_seconds() / 3600, 1)
+    age_hours = max((now - features.published_utc).total_seconds() / 3600, 1)
 
     # 时效性因子: 72小时内平滑衰减 (1.0 -> 0.3)
-    recency_factor = max(0.3, 1.0 - (age_hours / 72))
+    recency_factor = max(weights.recency_floor, 1.0 - (age_hours / weights.recency_hours))
 
     # 内容完整度因子: 有实际内容 > 只有标题
-    content_factor = 1.0 if len(item.content) > 100 else 0.7
+    content_factor = (
+        1.0
+        if features.content_length > weights.min_content_length
+        else weights.short_content_factor
+    )
 
     # 多维度综合评分
     final_score = item.raw_score * (
-        0.5  # 基础权重
-        + 0.3 * recency_factor  # 时效性权重（降低了影响）
-        + 0.2 * content_factor  # 内容完整度权重
+        weights.base  # 基础权重
+        + weights.recency * recency_factor  # 时效性权重（降低了影响）
+        + weights.content * content_factor  # 内容完整度权重
     )
 
     return round(final_score, 3)
 
 
-def select_diverse_items(items: list[NewsItem], max_count: int = 10) -> list[NewsItem]:
+# score_batch 一次遍历取出的列
+_SCORE_COLUMNS = np.dtype([("raw", np.float64), ("published", np.int64), ("length", np.int64)])
+
+
+def score_batch(
+    items: list[NewsItem],
+    weights: ScoringWeights = DEFAULT_SCORING_WEIGHTS,
+    now: datetime | None = None,
+) -> np.ndarray:
+    """
+    批量评分：一次遍历取出 raw_score、发布时间（微秒整数）、正文长度组成一个结构化数组，
+    之后只有算术部分向量化，所有条目共用同一个参考时间。
+    每一步的浮点运算顺序与 score() 相同，结果逐位一致
+    """
+    now = now or datetime.now(timezone.utc)
+    columns = np.fromiter(
+        (
+            (item.raw_score, features.published_us, features.content_length)
+            for item in items
+            for features in (item.features,)
+        ),
+        dtype=_SCORE_COLUMNS,
+        count=len(items),
+    )
+    raw, published, lengths = columns["raw"], columns["published"], columns["length"]
+    now_us = (now - _EPOCH) // _MICROSECOND
+
+    # 与 timedelta.total_seconds() 相同：整数微秒差 / 10^6（微秒差远小于 2^53，转换为浮点无误差）
+    age_hours = np.maximum((now_us - published) / 1e6 / 3600, 1)
+    recency_factor = np.maximum(weights.recency_floor, 1.0 - age_hours / weights.recency_hours)
+    content_factor = np.where(
+        lengths > weights.min_content_length, 1.0, weights.short_content_factor
+    )
+    final_score = raw * (
+        weights.base + weights.recency * recency_factor + weights.content * content_factor
+    )
+    return _round3(final_score)
+
+
+def _round3(values: np.ndarray) -> np.ndarray:
+    """
+    与 Python round(x, 3) 一致的向量化舍入
+    rint(x * 1000) / 1000 只有在 x * 1000 接近 .5 时才可能因乘法误差与 round 不同，这些值逐个用 round 计算
     """
-    三维度多样性选择器:
+    scaled = values * 1000.0
+    rounded = np.rint(scaled) / 1000.0
+    ambiguous = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ambiguous:
+        rounded[i] = round(float(values[i]), 3)
+    return rounded
+
+
+def boost_trending(items: list[NewsItem], trends: list[Trend], boost: float) -> int:
+    """
+    标题含升温词（trends.TrendTracker.surging）的条目评分乘以 (1 + boost)，返回加分的条数
+    条目需已写入 score；词组按标题切出的词匹配（trends.title_terms），不做子串匹配
+    """
+    if not trends or boost <= 0:
+        return 0
+    terms = {trend.term for trend in trends}
+    boosted = 0
+    for item in items:
+        if terms & title_terms(item.title):
+            item.score = round(item.score * (1 + boost), 3)
+            boosted += 1
+    return boosted
+
+
+@dataclass(frozen=True)
+class DiversityQuotas:
+    """多样性选择的配额（默认值即原选择策略）"""
+
+    source_type_share: float = 0.4  # 每个来源类型最多占的比例
+    max_per_source: int = 3  # 每个具体来源最多条数
+    category_share: float = 0.35  # 每个内容类别最多占的比例
+    min_per_group: int = 2  # 按比例算出的配额不低于该值
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> DiversityQuotas:
+        return cls(
+            source_type_share=settings.diversity_source_type_share,
+            max_per_source=settings.diversity_max_per_source,
+            category_share=settings.diversity_category_share,
+        )
+
+
+DEFAULT_DIVERSITY_QUOTAS = DiversityQuotas()
+_HEAP_POP_LIMIT = 1000
+
+
+def _by_score_desc(items: list[NewsItem]) -> Iterator[NewsItem]:
+    """
+    按评分从高到低依次产出条目，同分时保持原顺序（与稳定排序一致）
+    已按评分降序排好的列表直接遍历；否则建堆（O(n)）后按需弹出，只为实际取到的条目付出 O(log n)。
+    配额很紧时可能需要遍历大部分条目，弹出超过 _HEAP_POP_LIMIT 次后把剩余部分一次排序
+    """
+    if all(a.score >= b.score for a, b in zip(items, items[1:], strict=False)):
+        yield from items
+        return
+    heap = [(-item.score, i) for i, item in enumerate(items)]
+    heapq.heapify(heap)
+    for _ in range(min(_HEAP_POP_LIMIT, len(heap))):
+        _, i = heapq.heappop(heap)
+        yield items[i]
+    heap.sort()
+    for _, i in heap:
+        yield items[i]
+
+
+def select_diverse_items(
+    items: list[NewsItem],
+    max_count: int = 10,
+    quotas: DiversityQuotas = DEFAULT_DIVERSITY_QUOTAS,
+) -> list[NewsItem]:
+    """
+    三维度多样性选择器（括号内为 DiversityQuotas 默认值）:
     - 确保每个来源类型最多占 40% 配额
     - 确保每个具体来源最多占 3 条（防止单一来源霸榜）
     - 确保每个内容类别最多占 35% 配额
     避免单一来源或单一类别主导结果
-    """
-    # 按评分排序
-    sorted_items = sorted(items, key=lambda x: x.score, reverse=True)
 
+    按评分从高到低贪心选择，条目按需从堆中取出而不是整体排序；
+    配额不足时按评分顺序用被跳过的条目补足（每个条目只会进入已选或跳过之一，无需逐个查找是否已选）
+    """
     # 每个来源类型、具体来源和类别的最大配额
-    max_per_source_type = max(2, int(max_count * 0.4))
-    max_per_source = 3  # 每个具体来源最多3条
-    max_per_category = max(2, int(max_count * 0.35))
+    max_per_source_type = max(quotas.min_per_group, int(max_count * quotas.source_type_share))
+    max_per_source = quotas.max_per_source
+    max_per_category = max(quotas.min_per_group, int(max_count * quotas.category_share))
 
     source_type_counts: dict[str, int] = defaultdict(int)
     source_counts: dict[str, int] = defaultdict(int)
     category_counts: dict[str, int] = defaultdict(int)
     selected: list[NewsItem] = []
+    skipped: list[NewsItem] = []
 
-    for item in sorted_items:
+    for item in _by_score_desc(items):
         if len(selected) >= max_count:
             break
 
+        category = item.category or "其他"
         source_type_ok = source_type_counts[item.source_type] < max_per_source_type
         source_ok = source_counts[item.source] < max_per_source
-        category_ok = category_counts[item.category or "其他"] < max_per_category
+        category_ok = category_counts[category] < max_per_category
 
         if source_type_ok and source_ok and category_ok:
             selected.append(item)
             source_type_counts[item.source_type] += 1
             source_counts[item.source] += 1
-            category_counts[item.category or "其他"] += 1
+            category_counts[category] += 1
+        else:
+            skipped.append(item)
 
-    # 如果因限制太严导致不够，放宽限制再补充
+    # 如果因限制太严导致不够，放宽限制再补充（此时所有条目都已遍历，被跳过的条目已按评分排好）
     if len(selected) < max_count:
-        for item in sorted_items:
-            if item not in selected and len(selected) < max_count:
-                selected.append(item)
+        selected.extend(skipped[: max_count - len(selected)])
 
     return selected
 
 
+def merge_stories(
+    relevant: list[NewsItem],
+    candidates: list[NewsItem],
+    window_hours: float = 48,
+    title_similarity: float = 0.5,
+    min_shared_entities: int = 2,
+) -> tuple[list[NewsItem], list[NewsItem]]:
+    """
+    报道聚类（stories.cluster_stories）：同一事件的多篇报道只保留代表条目（评分最高者），
+    其余报道的 (来源, 链接) 写入代表条目的 related。之后的 LLM 判断、分类、摘要只处理代表条目
+    story 中有白名单条目时，代表条目视为已确认相关；条目需已写入 score
+    返回 (需分类的代表条目, 需判断相关性的代表条目)，按代表条目原来的顺序
+    """
+    confirmed = {id(item) for item in relevant}
+    stories = cluster_stories(
+        relevant + candidates,
+        window_hours=window_hours,
+        title_similarity=title_similarity,
+        min_shared_entities=min_shared_entities,
+    )
+    merged_relevant: list[NewsItem] = []
+    merged_candidates: list[NewsItem] = []
+    for story in stories:
+        representative = story.representative
+        representative.related = tuple(
+            (item.source, item.url) for item in story.members if item is not representative
+        )
+        if any(id(item) in confirmed for item in story.members):
+            merged_relevant.append(representative)
+        else:
+            merged_candidates.append(representative)
+
+    merged = len(relevant) + len(candidates) - len(stories)
+    if merged:
+        logger.info(
+            f"Story clustering: {len(relevant) + len(candidates)} items grouped into "
+            f"{len(stories)} stories ({merged} duplicate reports merged)"
+        )
+    return merged_relevant, merged_candidates
+
+
+def shortlist_for_selection(
+    relevant: list[NewsItem],
+    candidates: list[NewsItem],
+    max_count: int,
+    quotas: DiversityQuotas = DEFAULT_DIVERSITY_QUOTAS,
+    factor: float = 5,
+) -> tuple[list[NewsItem], list[NewsItem]]:
+    """
+    LLM 之前的预排序：只把最终可能入选的条目交给 LLM 相关性判断和分类
+    评分只依赖 raw_score、发布时间和正文长度，不依赖 LLM 结果，条目需已写入 score
+
+    按评分从高到低保留 max_count × factor 条，来源类型和具体来源的配额同样放宽 factor 倍
+    （避免候选被单一来源占满，多样性选择时没有可替换的条目）；类别要等 LLM 分类后才知道，不在此限制。
+    余量用于抵消灰色地带条目被 LLM 判为不相关。factor <= 0 时不做筛选
+    返回筛选后的 (relevant, candidates)，各自保持原顺序
+    """
+    limit = int(max_count * factor)
+    if factor <= 0 or len(relevant) + len(candidates) <= limit:
+        return relevant, candidates
+
+    max_per_source_type = factor * max(
+        quotas.min_per_group, int(max_count * quotas.source_type_share)
+    )
+    max_per_source = factor * quotas.max_per_source
+    source_type_counts: dict[str, int] = defaultdict(int)
+    source_counts: dict[str, int] = defaultdict(int)
+    kept: set[int] = set()
+    for item in _by_score_desc(relevant + candidates):
+        if len(kept) >= limit:
+            break
+        if (
+            source_type_counts[item.source_type] < max_per_source_type
+            and source_counts[item.source] < max_per_source
+        ):
+            kept.add(id(item))
+            source_type_counts[item.source_type] += 1
+            source_counts[item.source] += 1
+
+    logger.info(
+        f"Pre-ranking shortlist: {len(kept)} of {len(relevant) + len(candidates)} items sent to LLM stages"
+    )
+    return (
+        [item for item in relevant if id(item) in kept],
+        [item for item in candidates if id(item) in kept],
+    )
+
+
+def summarize_with_llm(
+    items: list[NewsItem],
+    router: LLMRouter,
+    labels: LabelStore | None = None,
+    llm_items: int = 0,
+    trends: list[str] | None = None,
+) -> str:
+    """
+    为入选条目生成摘要（写入 item.summary），返回总体概览
+
+    批量模式（llm_batch_summaries）下多条新闻合并为一次请求，按 JSON 返回各条摘要：
+    全部条目装得进一批时概览在同一次请求中生成，否则与各摘要批次并发生成；
+    解析失败或漏掉的条目再逐条摘要，概览缺失时按原方式根据摘要生成
+    labels: 条目级结果存储（可选）。已有摘要的条目直接复用，只有其余条目发给 LLM；
+    LLM 生成的摘要写回存储（本地抽取的摘要不写回）
+    llm_items: 只有排名前 llm_items 条用 LLM 摘要，其余条目本地抽取（0 表示全部用 LLM）；
+    概览仍根据全部条目生成
+    trends: 今天升温的话题词（trends.TrendTracker.surging），写入概览的 prompt
+    """
+    overview: str | None = None
+    hint = _trend_hint(trends or [])
+    stored = (
+        labels.get(items, SUMMARY, _SUMMARY_VERSION) if labels is not None else [None] * len(items)
+    )
+    missing: list[NewsItem] = []
+    local = 0
+    for rank, (item, summary) in enumerate(zip(items, stored, strict=True)):
+        if summary is not None:
+            item.summary = summary
+        elif 0 < llm_items <= rank:
+            item.summary = _local_summary(item)
+            local += 1
+        else:
+            missing.append(item)
+    if len(missing) < len(items):
+        logger.info(
+            f"Summaries: {len(items) - len(missing) - local} reused from the label store, "
+            f"{local} extracted locally"
+        )
+
+    pending = missing
+    if missing and router.settings.llm_batch_summaries:
+        render = partial(_summary_entry, content_tokens=_SUMMARY_CONTENT_TOKENS)
+        batches = _pack_prompt_batches(
+            router,
+            missing,
+            render,
+            SUMMARY_OVERVIEW_BATCH_PROMPT,
+            _SUMMARY_OUTPUT_TOKENS,
+            reserved_output_tokens=_OVERVIEW_OUTPUT_TOKENS,
+            trends=hint,
+        )
+        if len(batches) == 1 and len(missing) == len(items):
+            calls = [partial(_summarize_batch, router, batches[0], with_overview=True, trends=hint)]
+        else:
+            calls = [partial(_summarize_batch, router, batch) for batch in batches]
+            calls.append(partial(_overview_from_items, router, items, hint))
+        results = router.run_concurrent(lambda call: call(), calls)
+        overview = next((result for result in results if result), None)
+        pending = [item for item in missing if not item.summary]
+        logger.info(
+            f"LLM summarization: {len(calls)} concurrent request(s), {len(pending)} items need separate summaries"
+        )
+
+    generated = [item for item in missing if item.summary]
+    done = router.run_concurrent(partial(_summarize_item, router), pending)
+    generated += [item for item, ok in zip(pending, done, strict=True) if ok]
+    if labels is not None:
+        labels.put(
+            [(item, item.summary) for item in generated if item.summary], SUMMARY, _SUMMARY_VERSION
+        )
+    if overview is None:
+        summaries = "\n".join([f"- {i.title}: {i.summary}" for i in items[:10]])
+        try:
+            overview = router.complete(
+                OVERVIEW_PROMPT.format(summaries=summaries, trends=hint), "overview"
+            )
+        except BudgetExceeded as e:
+            logger.warning(f"{e}: using a title-based overview")
+            overview = _local_overview(items, trends or [])
+        except Exception as e:
+            logger.warning(f"Failed to generate overview: {e}; using a title-based overview")
+            overview = _local_overview(items, trends or [])
+    return overview
+
+
+def _trend_hint(trends: list[str]) -> str:
+    """概览 prompt 中的升温话题说明；没有升温话题时为空"""
+    if not trends:
+        return ""
+    return (
+        f"\n与过去几周相比，今天明显升温的话题：{'、'.join(trends)}。"
+        "如与入选新闻相关，请在概览中点出这一趋势。"
+    )
+
+
+def _summary_entry(item: NewsItem, content_tokens: int) -> str:
+    """批量摘要 prompt 中的一条新闻（不含编号）"""
+    content = compress(item.content, content_tokens, item.title)
+    return f"标题: {item.title}\n   来源: {item.source}\n   内容: {content}"
+
+
+def _summarize_batch(
+    router: LLMRouter,
+    numbered_batch: tuple[int, list[NewsItem]],
+    with_overview: bool = False,
+    trends: str = "",
+) -> str | None:
+    """
+    一批条目的摘要，解析成功的写入 item.summary
+    with_overview 时同一次请求还生成总体概览并返回；失败时返回 None，由调用方逐条补齐
+    trends: 概览 prompt 中的升温话题说明（_trend_hint）
+    """
+    batch_no, batch = numbered_batch
+    news_list = "\n".join(
+        f"{idx}. {_summary_entry(item, _SUMMARY_CONTENT_TOKENS)}" for idx, item in enumerate(batch)
+    )
+    template = SUMMARY_OVERVIEW_BATCH_PROMPT if with_overview else SUMMARY_BATCH_PROMPT
+    prompt = template.format(news_list=news_list, trends=trends)
+
+    try:
+        response = router.complete(prompt, "summary")
+    except Exception as e:
+        logger.warning(f"LLM batch summarization failed for batch {batch_no}: {e}")
+        return None
+
+    # 响应截断或部分损坏时仍取出能解析的摘要（和概览）
+    objects = extract_objects(response)
+    overview = None
+    if with_overview:
+        if len(objects) == 1 and "summaries" in objects[0]:
+            overview = objects[0].get("overview")
+            summaries = objects[0]["summaries"]
+            objects = (
+                [o for o in summaries if isinstance(o, dict)] if isinstance(summaries, list) else []
+            )
+        else:
+            overview = extract_field(response, "overview")
+
+    for idx, result in indexed_results(objects, len(batch)).items():
+        summary = result.get("summary")
+        if isinstance(summary, str) and summary.strip():
+            batch[idx].summary = summary.strip()
+
+    logger.info(
+        f"LLM batch summarization: batch {batch_no}, {sum(1 for i in batch if i.summary)} of {len(batch)} summarized"
+    )
+    if isinstance(overview, str) and overview.strip():
+        return overview.strip()
+    return None
+
+
+def _overview_from_items(router: LLMRouter, items: list[NewsItem], trends: str = "") -> str | None:
+    """根据标题和正文开头生成总体概览（与摘要批次并发，不等待摘要结果）"""
+    news_list = "\n".join(
+        f"{idx}. {_summary_entry(item, _SUMMARY_OVERVIEW_CONTENT_TOKENS)}"
+        for idx, item in enumerate(items)
+    )
+    try:
+        overview = router.complete(
+            OVERVIEW_BATCH_PROMPT.format(news_list=news_list, trends=trends), "overview"
+        ).strip()
+    except Exception as e:
+        logger.warning(f"LLM overview generation failed: {e}")
+        return None
+    return overview or None
+
+
+def _summarize_item(router: LLMRouter, item: NewsItem) -> bool:
+    """单条摘要（非批量模式，或批量结果中缺失的条目），返回摘要是否由 LLM 生成"""
+    # 原文压缩到 token 预算以内，同时不超出模型上下文窗口
+    budget = router.token_budget().input_tokens - estimate_tokens(SUMMARY_PROMPT)
+    budget = min(_SUMMARY_ITEM_CONTENT_TOKENS, budget - estimate_tokens(item.title + item.source))
+    content = compress(item.content, budget, item.title)
+    try:
+        summary = router.complete(
+            SUMMARY_PROMPT.format(title=item.title, source=item.source, content=content), "summary"
+        )
+    except BudgetExceeded:
+        # 预算用完：本地抽取式摘要
+        item.summary = _local_summary(item)
+        return False
+    except Exception as e:
+        logger.warning(f"Failed to generate summary for '{item.title}': {e}")
+        item.summary = _local_summary(item)
+        return False
+    if not summary.strip():
+        # 空响应按失败处理，不写入日报和结果存储
+        logger.warning(f"Empty summary for '{item.title}', using a local summary")
+        item.summary = _local_summary(item)
+        return False
+    item.summary = summary
+    return True
+
+
+def _local_summary(item: NewsItem) -> str:
+    """本地抽取式摘要（extractive.summarize）；正文没有可用句子时用标题，摘要不会为空"""
+    summary = summarize_extractive(
+        item.content, item.title, _LOCAL_SUMMARY_TOKENS, _LOCAL_SUMMARY_SENTENCES
+    )
+    return summary or item.title
+
+
+def _local_overview(items: list[NewsItem], trends: list[str]) -> str:
+    """预算用完时的概览：列出前几条标题和升温话题"""
+    titles = "；".join(item.title for item in items[:_LOCAL_OVERVIEW_TITLES])
+    overview = f"今日共 {len(items)} 条 AI 新闻，重点包括：{titles}。"
+    return f"{overview}升温话题：{'、'.join(trends)}。" if trends else overview
+
+
 def _fingerprint(item: NewsItem) -> str:
     base = f"{item.title}::{item.url}"
     return hashlib.sha256(base.encode("utf-8")).hexdigest()
@@ -59,7 +59,8 @@ TOP 5 重要新闻:
 {% for item in top_items %}
 - {{ category_icons.get(item.category, '📰') }} [{{ item.category }}] {{ item.title }}
   来源: {{ item.source }} | 时间: {{ item.publish_time }}
-  {{ item.summary }}
+{% if item.related %}  同时报道: {{ item.related | map('first') | unique | join(', ') }}
+{% endif %}  {{ item.summary }}
   {{ item.url }}
 {% endfor %}
 
@@ -69,7 +70,8 @@ TOP 5 重要新闻:
 {% for item in items %}
 - {{ item.title }}
   来源: {{ item.source }} | 时间: {{ item.publish_time }}
-  {{ item.summary }}
+{% if item.related %}  同时报道: {{ item.related | map('first') | unique | join(', ') }}
+{% endif %}  {{ item.summary }}
   {{ item.url }}
 {% endfor %}
 {% endfor %}
@@ -77,6 +79,12 @@ TOP 5 重要新闻:
 统计:
 - 今日采集 {{ total }} 条
 - 筛选输出 {{ selected }} 条
+{% if budget_usage %}
+LLM 预算使用:
+{% for row in budget_usage %}
+- {{ row.stage }}: {{ row.calls }}{% if row.max_calls %}/{{ row.max_calls }}{% endif %} 次请求, {{ row.tokens }}{% if row.max_tokens %}/{{ row.max_tokens }}{% endif %} tokens, {{ row.seconds }}s{% if row.max_seconds %}/{{ row.max_seconds }}s{% endif %}{% if row.denied %}（预算用完，{{ row.denied }} 次请求已降级）{% endif %}
+{% endfor %}
+{% endif %}
 """
 )
 
@@ -125,6 +133,11 @@ HTML_TEMPLATE_FRESH = Template(
                         <a href="{{ item.url }}" style="color: #111827; text-decoration: none;">{{ item.title }}</a>
                     </h3>
                     <p style="margin: 0 0 16px; font-size: 15px; color: #4b5563; line-height: 1.6;">{{ item.summary }}</p>
+                    {% if item.related %}
+                    <p style="margin: 0 0 12px; font-size: 12px; color: #9ca3af;">同时报道:
+                        {% for source, url in item.related %}<a href="{{ url }}" style="color: #6b7280;">{{ source }}</a>{% if not loop.last %} · {% endif %}{% endfor %}
+                    </p>
+                    {% endif %}
                     <div style="display: flex; flex-wrap: wrap; gap: 8px; align-items: center; font-size: 12px; color: #9ca3af;">
                         <span>{{ item.publish_time }}</span>
                         {% if item.tags %}
@@ -153,6 +166,11 @@ HTML_TEMPLATE_FRESH = Template(
                         <a href="{{ item.url }}" style="color: #1f2937; text-decoration: none;">{{ item.title }}</a>
                     </h3>
                     <p style="margin: 0 0 12px; font-size: 14px; color: #4b5563; line-height: 1.5;">{{ item.summary }}</p>
+                    {% if item.related %}
+                    <p style="margin: 0 0 12px; font-size: 12px; color: #9ca3af;">同时报道:
+                        {% for source, url in item.related %}<a href="{{ url }}" style="color: #6b7280;">{{ source }}</a>{% if not loop.last %} · {% endif %}{% endfor %}
+                    </p>
+                    {% endif %}
                     <div style="display: flex; flex-wrap: wrap; gap: 8px; align-items: center; font-size: 12px;">
                         <span style="background-color: {{ source_colors_light.get(item.source_type, source_colors_light['Other']) }}; color: {{ source_colors.get(item.source, source_colors['Other']) }}; padding: 2px 8px; border-radius: 4px; font-weight: 600;">{{ item.source }}</span>
                         <span style="color: #d1d5db;">•</span>
@@ -167,6 +185,19 @@ HTML_TEMPLATE_FRESH = Template(
         <!-- Footer -->
         <div style="text-align: center; padding: 20px; border-top: 1px solid #e5e7eb; margin-top: 20px;">
             <p style="margin: 0; color: #9ca3af; font-size: 12px;">Generated by AI Daily Digest • {{ selected }} items selected from {{ total }} collected</p>
+            {% if budget_usage %}
+            <table style="margin: 12px auto 0; border-collapse: collapse; font-size: 11px; color: #9ca3af;">
+                <tr><th style="padding: 2px 8px; text-align: left;">LLM stage</th><th style="padding: 2px 8px;">calls</th><th style="padding: 2px 8px;">tokens</th><th style="padding: 2px 8px;">time</th></tr>
+                {% for row in budget_usage %}
+                <tr{% if row.denied %} style="color: #d97706;"{% endif %}>
+                    <td style="padding: 2px 8px; text-align: left;">{{ row.stage }}{% if row.denied %} (degraded){% endif %}</td>
+                    <td style="padding: 2px 8px;">{{ row.calls }}{% if row.max_calls %}/{{ row.max_calls }}{% endif %}</td>
+                    <td style="padding: 2px 8px;">{{ row.tokens }}{% if row.max_tokens %}/{{ row.max_tokens }}{% endif %}</td>
+                    <td style="padding: 2px 8px;">{{ row.seconds }}s{% if row.max_seconds %}/{{ row.max_seconds }}s{% endif %}</td>
+                </tr>
+                {% endfor %}
+            </table>
+            {% endif %}
         </div>
     </div>
 </body>
@@ -178,7 +209,13 @@ HTML_TEMPLATE_FRESH = Template(
 REPORT_HTML_TEMPLATE = HTML_TEMPLATE_FRESH
 
 
-def build_report(items: list[NewsItem], overview: str, total_collected: int) -> tuple[str, str]:
+def build_report(
+    items: list[NewsItem],
+    overview: str,
+    total_collected: int,
+    budget_usage: list[dict] | None = None,
+) -> tuple[str, str]:
+    """budget_usage: 各阶段 LLM 预算用量（RunBudget.usage()），显示在日报末尾"""
     report_date = datetime.now().strftime("%Y-%m-%d")
     top_items = items[:5]
     rest_items = items[5:]
@@ -198,6 +235,7 @@ def build_report(items: list[NewsItem], overview: str, total_collected: int) ->
         "grouped": grouped,
         "total": total_collected,
         "selected": len(items),
+        "budget_usage": budget_usage or [],
         "category_icons": CATEGORY_ICONS,
         "source_colors": SOURCE_COLORS,
         "source_colors_light": SOURCE_COLORS_LIGHT,
@@ -0,0 +1,145 @@
+"""
+NewsItem 批量编码基准：codec（列式二进制）vs JSON 行 vs pickle
+
+用法:
+    python scripts/bench_codec.py                    # 100k 条
+    python scripts/bench_codec.py --items 20000 --content-chars 2000
+
+JSON 行与 WebSub 缓冲区的格式相同（websub._item_to_dict / _item_from_dict）。
+统计编码、解码耗时和编码后大小；另外给出 codec 只读取一列（按分数筛选）时不构造条目的耗时。
+"""
+
+import argparse
+import io
+import json
+import pickle
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# noqa: E402 - imports after path modification
+import codec  # noqa: E402
+from models import NewsItem  # noqa: E402
+from websub import _item_from_dict, _item_to_dict  # noqa: E402
+
+SOURCES = [
+    ("Hacker News", "rss"),
+    ("arXiv cs.AI", "rss"),
+    ("GitHub Trending", "github"),
+    ("r/MachineLearning", "reddit"),
+    ("机器之心", "scraper"),
+    ("TechCrunch", "newsapi"),
+]
+CATEGORIES = ["论文与研究", "产品与发布", "行业动态", "教程与观点", "开源项目", None]
+WORDS = (
+    "model training inference agent benchmark release dataset open source github paper "
+    "transformer latency memory token prompt 模型 训练 推理 发布 开源 数据"
+).split()
+
+
+def make_items(n: int, content_chars: int, seed: int = 42) -> list[NewsItem]:
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    items = []
+    for i in range(n):
+        source, source_type = rng.choice(SOURCES)
+        words = []
+        length = 0
+        while length < content_chars:
+            word = rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        items.append(
+            NewsItem(
+                title=f"{' '.join(rng.sample(WORDS, 6))} {i}",
+                url=f"https://example.com/news/{i}",
+                source=source,
+                source_type=source_type,
+                content=" ".join(words),
+                published_at=start + timedelta(minutes=i),
+                author=rng.choice([None, "alice", "bob"]),
+                tags=tuple(rng.sample(["llm", "agent", "cv", "rl"], rng.randint(0, 2))),
+                raw_score=rng.random() * 500,
+                fingerprint=f"{rng.getrandbits(64):016x}",
+                category=rng.choice(CATEGORIES),
+                score=rng.random(),
+                summary=" ".join(rng.sample(WORDS, 10)),
+            )
+        )
+    return items
+
+
+def encode_json(items: list[NewsItem]) -> bytes:
+    lines = (json.dumps(_item_to_dict(item), ensure_ascii=False) for item in items)
+    return "\n".join(lines).encode("utf-8")
+
+
+def decode_json(data: bytes) -> list[NewsItem]:
+    return [_item_from_dict(json.loads(line)) for line in data.decode("utf-8").splitlines()]
+
+
+def encode_codec(items: list[NewsItem]) -> bytes:
+    stream = io.BytesIO()
+    codec.write_items(stream, items)
+    return stream.getvalue()
+
+
+def decode_codec(data: bytes) -> list[NewsItem]:
+    return list(codec.read_items(io.BytesIO(data)))
+
+
+def timed(func, arg, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(arg)
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="NewsItem 批量编码基准")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--content-chars", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数，取最快一次")
+    args = parser.parse_args()
+
+    items = make_items(args.items, args.content_chars)
+    print(f"items={args.items} content_chars={args.content_chars}")
+    formats = [
+        ("json lines", encode_json, decode_json),
+        ("pickle", lambda xs: pickle.dumps(xs, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+        ("codec", encode_codec, decode_codec),
+    ]
+    for name, encode, decode in formats:
+        data, encode_time = timed(encode, items, args.repeat)
+        decoded, decode_time = timed(decode, data, args.repeat)
+        assert decoded == items, name
+        print(
+            f"{name:<11}: {len(data) / 2**20:7.1f} MiB, encode {encode_time:5.2f}s, "
+            f"decode {decode_time:5.2f}s"
+        )
+
+    data = encode_codec(items)
+
+    def top_scores(buffer: bytes) -> int:
+        # 只读 score 列（零拷贝视图），再解码入选条目的标题
+        selected = 0
+        for batch in codec.iter_batches(buffer):
+            for i in (batch.array("score") > 0.99).nonzero()[0]:
+                batch.value("title", int(i))
+                selected += 1
+        return selected
+
+    selected, scan_time = timed(top_scores, data, args.repeat)
+    print(f"codec scan : score > 0.99 -> {selected} titles in {scan_time:5.3f}s (no items built)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+采集器压测：将所有采集器指向本地模拟上游服务，测量吞吐量
+
+用法:
+    python scripts/bench_collectors.py --feeds 500 --latency-ms 20 --error-rate 0.02
+
+模拟服务运行在独立子进程中，峰值内存只统计采集进程本身。
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from pathlib import Path
+
+import yaml
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# noqa: E402 - imports after path modification
+from fake_upstream import FakeUpstream, FaultConfig, UpstreamConfig  # noqa: E402
+
+from collectors import (  # noqa: E402
+    GitHubCollector,
+    NewsAPICollector,
+    RedditCollector,
+    RSSCollector,
+    TwitterCollector,
+    WebScraperCollector,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _serve(config: dict, faults: dict, queue: mp.Queue, stop: mp.Event) -> None:
+    upstream = FakeUpstream(UpstreamConfig(**config), FaultConfig(**faults)).start()
+    queue.put(upstream.url)
+    stop.wait()
+    queue.put(upstream.stats)
+    upstream.stop()
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _write_sources(base: str, args: argparse.Namespace) -> str:
+    sources = {
+        "rss": [
+            {"name": f"Feed {i}", "url": f"{base}/{'rss' if i % 2 else 'atom'}/{i}.xml"}
+            for i in range(args.feeds)
+        ],
+        "newsapi": {"page_size": 20},
+        "github": {
+            "keywords": ["llm", "agent"],
+            "watch_repos": [f"org{i}/repo{i}" for i in range(args.watch_repos)],
+        },
+        "websites": [
+            {"name": f"Site {i}", "url": f"{base}/site/{i}/", "selector": "h4 a", "base_url": base}
+            for i in range(args.websites)
+        ],
+        "reddit": {"subreddits": [f"sub{i}" for i in range(args.subreddits)], "limit": 20},
+        "twitter": {"max_results": 20},
+    }
+    fd, path = tempfile.mkstemp(suffix=".yaml", prefix="bench_sources_")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        yaml.safe_dump(sources, f, allow_unicode=True)
+    return path
+
+
+def _build_collectors(base: str, sources_path: str) -> list:
+    github = GitHubCollector(sources_path, "bench-token")
+    github.web_base = base
+    github.api_base = base
+    newsapi = NewsAPICollector("bench-key", sources_path)
+    newsapi.api_base = base
+    reddit = RedditCollector(sources_path)
+    reddit.web_base = base
+    twitter = TwitterCollector("bench-token", sources_path)
+    twitter.api_base = base
+    return [
+        RSSCollector(sources_path),
+        github,
+        newsapi,
+        WebScraperCollector(sources_path),
+        reddit,
+        twitter,
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="采集器压测")
+    parser.add_argument("--feeds", type=int, default=100, help="RSS/Atom feed 数量")
+    parser.add_argument("--items-per-feed", type=int, default=30)
+    parser.add_argument("--subreddits", type=int, default=10)
+    parser.add_argument("--watch-repos", type=int, default=6)
+    parser.add_argument("--websites", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--slow-drip-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=6, help="与 main.run_once 相同的并行度")
+    args = parser.parse_args()
+
+    # RedditCollector 在 CI 环境中会直接跳过
+    os.environ.pop("CI", None)
+
+    config = asdict(UpstreamConfig(items_per_feed=args.items_per_feed))
+    faults = asdict(
+        FaultConfig(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            slow_drip_rate=args.slow_drip_rate,
+        )
+    )
+    queue: mp.Queue = mp.Queue()
+    stop = mp.Event()
+    server = mp.Process(target=_serve, args=(config, faults, queue, stop), daemon=True)
+    server.start()
+    base = queue.get(timeout=10)
+
+    sources_path = _write_sources(base, args)
+    collectors = _build_collectors(base, sources_path)
+
+    per_collector: dict[str, tuple[int, float]] = {}
+    total_items = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        started = {executor.submit(c.collect): (c, time.perf_counter()) for c in collectors}
+        for future in as_completed(started):
+            collector, t0 = started[future]
+            name = collector.__class__.__name__
+            try:
+                collected = future.result()
+            except Exception as e:
+                print(f"{name} failed: {e}")
+                collected = []
+            per_collector[name] = (len(collected), time.perf_counter() - t0)
+            total_items += len(collected)
+    wall = time.perf_counter() - start
+
+    stop.set()
+    upstream_stats = queue.get(timeout=10)
+    server.join(timeout=10)
+    os.remove(sources_path)
+
+    print("=== Collector Benchmark ===")
+    print(f"feeds={args.feeds} items/feed={args.items_per_feed} faults={faults}")
+    for name, (count, seconds) in sorted(per_collector.items()):
+        print(f"{name:<22} {count:>7} items  {seconds:>8.2f}s")
+    print(f"{'total':<22} {total_items:>7} items  {wall:>8.2f}s")
+    print(f"throughput: {total_items / wall:.1f} items/s")
+    peak = _peak_rss_mb()
+    print(f"peak RSS: {peak:.1f} MB" if peak is not None else "peak RSS: n/a")
+    print(f"upstream: {upstream_stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+正文磁盘存储的峰值内存基准：全部正文留在内存 vs 采集后移入 BlobStore
+
+用法:
+    python scripts/bench_content_store.py                        # 10k 条，每条约 4000 字符
+    python scripts/bench_content_store.py --items 50000 --content-chars 8000
+
+模拟一次运行的前半段：各采集器分批返回条目（每批 --batch 条），之后精确去重、关键词过滤，
+只保留白名单和灰色地带条目并读取开头 300 字符。用 tracemalloc 统计整个过程的峰值内存和
+过滤后仍被持有的内存。正文由词表随机生成，压缩率接近真实文本。
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# noqa: E402 - imports after path modification
+from blobstore import BlobStore  # noqa: E402
+from models import NewsItem  # noqa: E402
+from processing import deduplicate, filter_relevance_keyword  # noqa: E402
+
+AI_WORDS = (
+    "model training inference agent benchmark release dataset open source github paper "
+    "transformer latency memory token prompt user team update 模型 训练 推理 发布 开源 数据"
+).split()
+OTHER_WORDS = (
+    "football match season coach transfer goal league weather market team update user "
+    "比赛 球队 天气 市场 用户"
+).split()
+AI_TITLES = ["New LLM agent framework", "Weekly roundup", "开源模型发布"]
+OTHER_TITLES = ["Football transfer news", "Match report"]
+
+
+def make_batches(n: int, content_chars: int, batch: int, ai_share: float = 0.2, seed: int = 42):
+    """按采集批次逐批生成条目（生成器，模拟采集器陆续返回）"""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for first in range(0, n, batch):
+        items = []
+        for i in range(first, min(n, first + batch)):
+            # 约 80% 的条目与 AI 无关，在关键词过滤阶段被丢弃
+            ai = rng.random() < ai_share
+            vocabulary = AI_WORDS if ai else OTHER_WORDS
+            words = []
+            length = 0
+            while length < content_chars:
+                word = rng.choice(vocabulary)
+                words.append(word)
+                length += len(word) + 1
+            items.append(
+                NewsItem(
+                    title=f"{rng.choice(AI_TITLES if ai else OTHER_TITLES)} {i}",
+                    url=f"https://example.com/news/{i}",
+                    source="Bench",
+                    source_type="rss",
+                    content=" ".join(words),
+                    published_at=start + timedelta(minutes=i),
+                )
+            )
+        yield items
+
+
+def run(args: argparse.Namespace, store: BlobStore | None) -> tuple[int, int, float, int]:
+    """返回 (峰值字节数, 过滤后持有的字节数, 耗时秒, 保留条数)"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    items: list[NewsItem] = []
+    for batch in make_batches(args.items, args.content_chars, args.batch):
+        if store is not None:
+            for item in batch:
+                item.offload(store)
+        items.extend(batch)
+    items = deduplicate(items)
+    whitelist, greyzone, blacklist = filter_relevance_keyword(items)
+    items = whitelist + greyzone
+    del blacklist
+    previews = [item.content_prefix(300) for item in items]
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del previews
+    return peak - baseline, current - baseline, elapsed, len(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="正文磁盘存储峰值内存基准")
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--content-chars", type=int, default=4000)
+    parser.add_argument("--batch", type=int, default=500, help="每个采集批次的条数")
+    args = parser.parse_args()
+
+    print(f"items={args.items} content_chars={args.content_chars} batch={args.batch}")
+    peak, retained, elapsed, kept = run(args, None)
+    print(
+        f"in memory : peak {peak / 2**20:7.1f} MiB, retained {retained / 2**20:7.1f} MiB, "
+        f"{elapsed:5.2f}s, {kept} items kept"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        store = BlobStore.create(directory)
+        peak, retained, elapsed, kept = run(args, store)
+        stats = store.stats()
+        store.close()
+    print(
+        f"blob store: peak {peak / 2**20:7.1f} MiB, retained {retained / 2**20:7.1f} MiB, "
+        f"{elapsed:5.2f}s, {kept} items kept"
+    )
+    print(
+        f"on disk: {stats['stored_bytes'] / 2**20:.1f} MiB compressed from "
+        f"{stats['raw_bytes'] / 2**20:.1f} MiB ({stats['blobs']} blobs)"
+    )
+
+
+if __name__ == "__main__":
+    main()
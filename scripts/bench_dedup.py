@@ -0,0 +1,148 @@
+"""
+模糊去重基准测试：MinHash/LSH 实现 vs 原两两比较实现
+
+用法:
+    python scripts/bench_dedup.py                 # 1k / 10k / 100k
+    python scripts/bench_dedup.py --sizes 1000 5000 --legacy-max 5000
+
+合成标题为中英混合，约 20% 为改写过的近似重复（大小写、标点、替换词、加后缀）。
+原实现为 O(n²)，默认只在 ≤ 2000 条时运行，用于对比速度和去重结果一致率。
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# noqa: E402 - imports after path modification
+from models import NewsItem  # noqa: E402
+from processing import deduplicate_fuzzy  # noqa: E402
+
+ORGS = ["OpenAI", "Google DeepMind", "Meta", "Anthropic", "Mistral", "阿里通义", "智谱", "月之暗面"]
+VERBS = ["releases", "announces", "unveils", "open-sources", "发布", "推出", "开源"]
+THINGS = [
+    "reasoning model",
+    "coding agent",
+    "video generation model",
+    "multimodal LLM",
+    "speech model",
+    "大语言模型",
+    "多模态模型",
+    "智能体框架",
+    "推理芯片",
+]
+EXTRAS = ["with 1M context", "for enterprises", "beating GPT-4", "在多项基准上领先", "开源权重"]
+SUFFIXES = [" - VentureBeat", " | 机器之心", " (paper)", "!"]
+
+
+SYLLABLES = ["ka", "zen", "lo", "mi", "tra", "vex", "qu", "nor", "pi", "sol", "dra", "fin"]
+
+
+def _name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def _base_title(rng: random.Random, n: int) -> str:
+    words = " ".join(_name(rng).lower() for _ in range(rng.randint(2, 4)))
+    return (
+        f"{rng.choice(ORGS)} {rng.choice(VERBS)} {_name(rng)} {rng.choice(THINGS)}: "
+        f"{words} {rng.choice(EXTRAS)} #{n}"
+    )
+
+
+def _perturb(rng: random.Random, title: str) -> str:
+    choice = rng.randrange(4)
+    if choice == 0:
+        return title.upper() if rng.random() < 0.5 else title.lower()
+    if choice == 1:
+        return title + rng.choice(SUFFIXES)
+    if choice == 2:
+        words = title.split()
+        words[1] = rng.choice(VERBS)
+        return " ".join(words)
+    return title.replace(" ", "  ").replace("v", "V", 1)
+
+
+def make_items(n: int, dup_rate: float = 0.2, seed: int = 42) -> list[NewsItem]:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    titles: list[str] = []
+    for i in range(n):
+        if titles and rng.random() < dup_rate:
+            titles.append(_perturb(rng, rng.choice(titles)))
+        else:
+            titles.append(_base_title(rng, i))
+    return [
+        NewsItem(
+            title=t,
+            url=f"https://example.com/{i}",
+            source="bench",
+            source_type="rss",
+            content="",
+            published_at=now,
+            raw_score=rng.random(),
+        )
+        for i, t in enumerate(titles)
+    ]
+
+
+def legacy_deduplicate_fuzzy(items: list[NewsItem], threshold: float = 0.75) -> list[NewsItem]:
+    """原实现（两两比较），仅用于对比"""
+    unique: list[NewsItem] = []
+    for item in items:
+        is_dup = False
+        for existing in unique:
+            ratio = SequenceMatcher(None, item.title.lower(), existing.title.lower()).ratio()
+            if ratio >= threshold:
+                if item.raw_score > existing.raw_score:
+                    unique.remove(existing)
+                    unique.append(item)
+                is_dup = True
+                break
+        if not is_dup:
+            unique.append(item)
+    return unique
+
+
+def _timed(fn, items):
+    start = time.perf_counter()
+    result = fn(items)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="模糊去重基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--legacy-max", type=int, default=2000, help="原实现运行的最大规模")
+    args = parser.parse_args()
+
+    print(
+        f"{'n':>8} {'kept':>8} {'lsh(s)':>9} {'us/item':>8} "
+        f"{'legacy':>8} {'legacy(s)':>10} {'agree':>7}"
+    )
+    for n in args.sizes:
+        items = make_items(n)
+        result, seconds = _timed(deduplicate_fuzzy, items)
+        legacy_kept, legacy_col, agree_col = "-", "-", "-"
+        if n <= args.legacy_max:
+            legacy, legacy_seconds = _timed(legacy_deduplicate_fuzzy, items)
+            legacy_ids = {id(i) for i in legacy}
+            new_ids = {id(i) for i in result}
+            agree = len(legacy_ids & new_ids) / max(len(legacy_ids | new_ids), 1)
+            legacy_kept = str(len(legacy))
+            legacy_col, agree_col = f"{legacy_seconds:.2f}", f"{agree:.1%}"
+        print(
+            f"{n:>8} {len(result):>8} {seconds:>9.2f} {seconds / n * 1e6:>8.1f} "
+            f"{legacy_kept:>8} {legacy_col:>10} {agree_col:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
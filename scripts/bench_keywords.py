@@ -0,0 +1,129 @@
+"""
+关键词匹配基准测试：KeywordMatcher vs 原逐个关键词子串扫描
+
+用法:
+    python scripts/bench_keywords.py                  # 100k 条
+    python scripts/bench_keywords.py --items 20000 --content-chars 1200
+
+原实现按 any(keyword in text) 依次扫描黑名单、白名单和 5 个分类（关键词去掉 * 后做子串匹配），
+新实现每条文本只扫描一遍，同时得到所有表的命中结果。
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# noqa: E402 - imports after path modification
+from keywords import DEFAULT_KEYWORDS_PATH, KeywordMatcher  # noqa: E402
+
+ENGLISH_FILLER = (
+    "the a of and to in for on with new data system team said users Model Update results "
+    "start started company today announced week "
+    "performance cost open early customers engineers cloud platform million, (via) -"
+).split()
+CHINESE_FILLER = "我们 今天 宣布 公司 团队 用户 数据 系统 更新 表示 市场 ， 。".split()
+
+
+def make_texts(
+    n: int, content_chars: int, keywords: list[str], blacklist: list[str], seed: int = 42
+) -> list[str]:
+    """
+    约 30% 为中文条目；约 1% 的词取自白名单/分类关键词，约 5% 的条目含黑名单词
+    （接近真实分布：大部分条目是 AI 新闻，原实现需要把黑名单完整扫一遍）
+    """
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        filler = CHINESE_FILLER if rng.random() < 0.3 else ENGLISH_FILLER
+        words: list[str] = []
+        length = 0
+        while length < content_chars:
+            word = rng.choice(keywords) if rng.random() < 0.01 else rng.choice(filler)
+            words.append(word)
+            length += len(word) + 1
+        if rng.random() < 0.05:
+            words.insert(rng.randrange(len(words)), rng.choice(blacklist))
+        texts.append(" ".join(words))
+    return texts
+
+
+def legacy_scan(text: str, blacklist, whitelist, categories) -> tuple[str, str]:
+    text = text.lower()
+    if any(k in text for k in blacklist):
+        bucket = "blacklist"
+    elif any(k in text for k in whitelist):
+        bucket = "whitelist"
+    else:
+        bucket = "greyzone"
+    category = next(
+        (name for name, words in categories.items() if any(k in text for k in words)), "其他"
+    )
+    return bucket, category
+
+
+def matcher_scan(matcher: KeywordMatcher, text: str) -> tuple[str, str]:
+    hits = matcher.scan(text)
+    if "blacklist" in hits:
+        bucket = "blacklist"
+    elif "whitelist" in hits:
+        bucket = "whitelist"
+    else:
+        bucket = "greyzone"
+    return bucket, matcher.classify(hits) or "其他"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="关键词匹配基准测试")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--content-chars", type=int, default=600)
+    args = parser.parse_args()
+
+    with open(DEFAULT_KEYWORDS_PATH, encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    def plain(words: list[str]) -> list[str]:
+        return [w.rstrip("*").lower() for w in words]
+
+    blacklist = plain(config["relevance"]["blacklist"])
+    whitelist = plain(config["relevance"]["whitelist"])
+    categories = {name: plain(words) for name, words in config["categories"].items()}
+    vocabulary = whitelist + [w for words in categories.values() for w in words]
+
+    texts = make_texts(args.items, args.content_chars, vocabulary, blacklist)
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher.from_config(config)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = [legacy_scan(t, blacklist, whitelist, categories) for t in texts]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = [matcher_scan(matcher, t) for t in texts]
+    new_seconds = time.perf_counter() - start
+
+    bucket_diff = sum(a[0] != b[0] for a, b in zip(legacy, new, strict=True))
+    category_diff = sum(a[1] != b[1] for a, b in zip(legacy, new, strict=True))
+    n = len(texts)
+    print(
+        f"items={n} content_chars={args.content_chars} keywords={len(set(vocabulary + blacklist))}"
+    )
+    print(f"build matcher: {build * 1000:.1f} ms")
+    print(f"legacy substring scan: {legacy_seconds:8.2f}s  {legacy_seconds / n * 1e6:7.1f} us/item")
+    print(f"KeywordMatcher:        {new_seconds:8.2f}s  {new_seconds / n * 1e6:7.1f} us/item")
+    print(f"speedup: {legacy_seconds / new_seconds:.1f}x")
+    # 差异来自整词边界（如 nfl 不再命中 conflict），不是误差
+    print(f"decisions changed: relevance {bucket_diff / n:.1%}, category {category_diff / n:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+NewsItem 内存基准测试：slots + 字符串驻留 vs 原普通 dataclass
+
+用法:
+    python scripts/bench_models.py                    # 100k 条
+    python scripts/bench_models.py --items 20000 --content-chars 1000
+
+条目由 JSON 行解析得到（与 WebSub 缓冲区、API 响应一样，每条的来源/类别都是新解析出的字符串），
+用 tracemalloc 统计构建完成后仍被条目持有的内存，包括标题、正文等字符串本身。
+"""
+
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# noqa: E402 - imports after path modification
+from models import NewsItem  # noqa: E402
+
+SOURCES = [
+    ("Hacker News", "rss"),
+    ("arXiv cs.AI", "rss"),
+    ("GitHub Trending", "github"),
+    ("GitHub Releases", "github"),
+    ("r/MachineLearning", "reddit"),
+    ("机器之心", "scraper"),
+    ("TechCrunch", "newsapi"),
+]
+CATEGORIES = ["论文与研究", "产品与发布", "行业动态", "教程与观点", "开源项目", None]
+
+
+@dataclass
+class LegacyNewsItem:
+    """原 NewsItem 定义，仅用于对比"""
+
+    title: str
+    url: str
+    source: str
+    source_type: str
+    content: str
+    published_at: datetime
+    author: str | None = None
+    tags: list[str] = field(default_factory=list)
+    raw_score: float = 0.0
+    fingerprint: str = ""
+    category: str | None = None
+    score: float = 0.0
+    summary: str = ""
+
+    _features = None
+
+
+def make_lines(n: int, content_chars: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    lines = []
+    for i in range(n):
+        source, source_type = rng.choice(SOURCES)
+        record = {
+            "title": f"Item {i}: {rng.choice(['new model', 'agent framework', '开源模型'])}",
+            "url": f"https://example.com/news/{i}",
+            "source": source,
+            "source_type": source_type,
+            "content": "x" * content_chars,
+            "published_at": (start + timedelta(minutes=i)).isoformat(),
+            "tags": ["ai", "llm"] if rng.random() < 0.3 else [],
+            "raw_score": rng.random(),
+            "fingerprint": f"{i:064x}",
+            "category": rng.choice(CATEGORIES),
+        }
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return lines
+
+
+def measure(cls: type, lines: list[str]) -> tuple[list, int]:
+    """构建全部条目，返回 (条目, 仍被持有的字节数)"""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    items = []
+    for line in lines:
+        data = json.loads(line)
+        data["published_at"] = datetime.fromisoformat(data["published_at"])
+        items.append(cls(**data))
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return items, retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="NewsItem 内存基准测试")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--content-chars", type=int, default=200)
+    args = parser.parse_args()
+
+    lines = make_lines(args.items, args.content_chars)
+    legacy_items, legacy_bytes = measure(LegacyNewsItem, lines)
+    del legacy_items
+    items, new_bytes = measure(NewsItem, lines)
+
+    n = args.items
+    print(f"items={n} content_chars={args.content_chars}")
+    print(
+        f"legacy dataclass: {legacy_bytes / n:8.1f} bytes/item  ({legacy_bytes / 2**20:7.1f} MiB)"
+    )
+    print(f"slotted NewsItem: {new_bytes / n:8.1f} bytes/item  ({new_bytes / 2**20:7.1f} MiB)")
+    print(
+        f"saved: {(legacy_bytes - new_bytes) / n:.1f} bytes/item ({1 - new_bytes / legacy_bytes:.1%})"
+    )
+    print(f"instance size (sys.getsizeof): {sys.getsizeof(items[0])} bytes, no __dict__")
+
+
+if __name__ == "__main__":
+    main()
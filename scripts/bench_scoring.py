@@ -0,0 +1,86 @@
+"""
+评分基准测试：score_batch（NumPy 向量化）vs 逐条 score()
+
+用法:
+    python scripts/bench_scoring.py                   # 10k / 100k / 1M
+    python scripts/bench_scoring.py --sizes 100000
+
+两种实现使用同一个参考时间，并逐条校验结果完全一致；计时取 --repeat 次中最快的一次。
+批量评分的计时包含从条目中取出 raw_score、发布时间、正文长度组成数组的时间（一次遍历）；
+派生特征（features）在计时前预先计算，两种实现都直接读取缓存。
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# noqa: E402 - imports after path modification
+from models import NewsItem  # noqa: E402
+from processing import score, score_batch  # noqa: E402
+
+
+def make_items(n: int, now: datetime, seed: int = 42) -> list[NewsItem]:
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        item = NewsItem(
+            title=f"news {i}",
+            url=f"https://example.com/{i}",
+            source="bench",
+            source_type="rss",
+            content="A" * rng.choice([0, 80, 150, 600]),
+            published_at=now - timedelta(seconds=rng.randrange(0, 5 * 86400)),
+            raw_score=rng.choice([0.2, 0.4, 0.5, 0.6, 0.7, 0.8, rng.random()]),
+        )
+        # 预先计算派生特征（实际流程中去重/过滤阶段已经算过）
+        item.features.published_us  # noqa: B018
+        item.features.content_length  # noqa: B018
+        items.append(item)
+    return items
+
+
+def score_loop(items: list[NewsItem], now: datetime) -> list[float]:
+    return [score(item, now=now) for item in items]
+
+
+def best_of(repeat: int, run, *args, **kwargs):
+    """运行 repeat 次，返回最短耗时和结果"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="评分基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    print(f"{'items':>9}  {'score() loop':>12}  {'score_batch':>11}  {'speedup':>7}  match")
+    for n in args.sizes:
+        items = make_items(n, now)
+
+        loop_seconds, loop = best_of(args.repeat, score_loop, items, now)
+        batch_seconds, batch = best_of(args.repeat, score_batch, items, now=now)
+        batch = batch.tolist()
+
+        match = "yes" if batch == loop else "NO"
+        print(
+            f"{n:>9}  {loop_seconds:>11.3f}s  {batch_seconds:>10.3f}s  "
+            f"{loop_seconds / batch_seconds:>6.1f}x  {match}"
+        )
+
+
+if __name__ == "__main__":
+    main()
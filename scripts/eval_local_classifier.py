@@ -0,0 +1,84 @@
+"""
+本地相关性/分类模型离线评估
+
+按时间顺序回放 LLM 标注日志：每条标注先用当时的模型预测，再用它训练（prequential 评估），
+统计不同置信度阈值下本地可处理的比例，以及本地结论与 LLM 判定的一致率。
+
+用法:
+    python scripts/eval_local_classifier.py
+    python scripts/eval_local_classifier.py --labels data/llm_labels.jsonl --min-labels 300
+    python scripts/eval_local_classifier.py --write-model data/local_classifier.json  # 用全部日志重建模型
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# noqa: E402 - imports after path modification
+from classifier import LinearModel, LocalClassifier, read_labels, text_features  # noqa: E402
+from config import load_settings  # noqa: E402
+
+THRESHOLDS = [0.8, 0.9, 0.95, 0.98, 0.99]
+
+
+def report(name: str, predictions: list[tuple[float, bool]], total: int) -> None:
+    """predictions: 达到最少标注数之后每条标注的 (预测概率, 是否与 LLM 一致)"""
+    print(f"\n{name}: {total} labels, {len(predictions)} evaluated after warm-up")
+    if not predictions:
+        return
+    print(f"  {'threshold':>9}  {'handled locally':>15}  {'agreement with LLM':>18}")
+    for threshold in THRESHOLDS:
+        confident = [correct for probability, correct in predictions if probability >= threshold]
+        coverage = len(confident) / len(predictions)
+        agreement = sum(confident) / len(confident) if confident else float("nan")
+        print(f"  {threshold:>9.2f}  {coverage:>15.1%}  {agreement:>18.1%}")
+
+
+def main() -> None:
+    settings = load_settings()
+    parser = argparse.ArgumentParser(description="本地相关性/分类模型离线评估")
+    parser.add_argument("--labels", default=settings.local_classifier_label_log)
+    parser.add_argument("--min-labels", type=int, default=settings.local_classifier_min_labels)
+    parser.add_argument("--write-model", help="用全部标注重新训练并保存模型到该路径")
+    args = parser.parse_args()
+
+    relevance, category = LinearModel(), LinearModel()
+    relevance_predictions: list[tuple[float, bool]] = []
+    category_predictions: list[tuple[float, bool]] = []
+    relevance_total = category_total = 0
+    for record in read_labels(args.labels):
+        features = text_features(
+            record.get("title", ""), record.get("content", ""), record.get("source_type", "")
+        )
+        if record.get("relevant") is not None:
+            label = "relevant" if record["relevant"] else "irrelevant"
+            if relevance.examples >= args.min_labels:
+                predicted, probability = relevance.predict(features)
+                relevance_predictions.append((probability, predicted == label))
+            relevance.update(features, label)
+            relevance_total += 1
+        if record.get("category") is not None:
+            if category.examples >= args.min_labels:
+                predicted, probability = category.predict(features)
+                category_predictions.append((probability, predicted == record["category"]))
+            category.update(features, record["category"])
+            category_total += 1
+
+    print(f"label log: {args.labels}")
+    report("relevance (greyzone)", relevance_predictions, relevance_total)
+    report("category", category_predictions, category_total)
+    print(f"\ncurrent threshold: {settings.local_classifier_threshold}")
+
+    if args.write_model:
+        classifier = LocalClassifier()
+        classifier.relevance, classifier.category = relevance, category
+        classifier.save(args.write_model)
+        print(f"model written to {args.write_model}")
+
+
+if __name__ == "__main__":
+    main()
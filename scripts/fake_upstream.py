@@ -0,0 +1,315 @@
+"""
+本地模拟上游服务（用于采集器压测，不访问真实网络）
+
+提供与各采集器请求格式一致的合成数据：
+- /rss/<i>.xml、/atom/<i>.xml      RSS 2.0 / Atom feed
+- /trending                         GitHub Trending 风格页面
+- /search/repositories              GitHub 搜索 API
+- /repos/<owner>/<repo>/releases    GitHub Releases API
+- /v2/everything                    NewsAPI
+- /r/<sub>/hot.json                 Reddit
+- /2/tweets/search/recent           Twitter/X
+- /site/<i>/、/site/<i>/<j>.html    网页爬虫的列表页和详情页
+
+每个请求可按配置注入延迟、5xx 错误、429 限流和慢速分块响应。
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+TOPICS = [
+    "large language model",
+    "diffusion model",
+    "AI agent",
+    "reinforcement learning",
+    "computer vision",
+    "open-source LLM",
+    "GPU cluster",
+    "多模态大模型",
+    "具身智能",
+    "推理加速",
+]
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 0.0  # 固定延迟
+    jitter_ms: float = 0.0  # 随机抖动上限
+    error_rate: float = 0.0  # 返回 500 的概率
+    rate_limit_rate: float = 0.0  # 返回 429 的概率
+    slow_drip_rate: float = 0.0  # 慢速分块响应的概率
+    slow_drip_chunks: int = 8
+    slow_drip_delay_ms: float = 50.0
+
+
+@dataclass
+class UpstreamConfig:
+    items_per_feed: int = 30
+    trending_repos: int = 25
+    search_repos: int = 30
+    releases_per_repo: int = 3
+    newsapi_articles: int = 20
+    reddit_posts: int = 20
+    tweets: int = 20
+    site_links: int = 20
+    content_chars: int = 600
+    seed: int = 42
+
+
+def _title(rng: random.Random, n: int) -> str:
+    topic = rng.choice(TOPICS)
+    verb = rng.choice(["releases", "announces", "open-sources", "benchmarks", "发布", "推出"])
+    org = rng.choice(["OpenAI", "DeepMind", "Meta AI", "Mistral", "智谱", "月之暗面", "Qwen Team"])
+    return f"{org} {verb} {topic} #{n}"
+
+
+def _text(rng: random.Random, chars: int) -> str:
+    words = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(rng.choice(TOPICS + ["benchmark", "paper", "dataset", "inference", "训练"]))
+    return " ".join(words)[:chars]
+
+
+def _iso(hours_ago: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(hours=hours_ago)).isoformat()
+
+
+def _rfc822(hours_ago: float) -> str:
+    dt = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    return dt.strftime("%a, %d %b %Y %H:%M:%S +0000")
+
+
+class FakeUpstream:
+    """在后台线程运行的模拟上游服务"""
+
+    def __init__(
+        self,
+        config: UpstreamConfig | None = None,
+        faults: FaultConfig | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.config = config or UpstreamConfig()
+        self.faults = faults or FaultConfig()
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self.stats: dict[str, int] = {"requests": 0, "errors": 0, "rate_limited": 0, "drips": 0}
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> FakeUpstream:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def count(self, key: str) -> None:
+        with self._rng_lock:
+            self.stats[key] += 1
+
+    # ---------- 路由 ----------
+
+    def route(self, path: str, query: dict[str, str]) -> tuple[str, bytes]:
+        rng = random.Random(zlib.crc32(path.encode()) ^ self.config.seed)
+        cfg = self.config
+
+        if m := re.fullmatch(r"/(rss|atom)/(\d+)\.xml", path):
+            kind, feed_id = m.group(1), int(m.group(2))
+            return "application/xml", self._feed(rng, kind, feed_id)
+        if path == "/trending":
+            return "text/html", self._trending(rng)
+        if path == "/search/repositories":
+            repos = [
+                {
+                    "full_name": f"org{i}/repo{i}",
+                    "html_url": f"https://github.com/org{i}/repo{i}",
+                    "description": _text(rng, 120),
+                    "stargazers_count": rng.randint(1000, 50000),
+                    "created_at": _iso(rng.uniform(1, 300)),
+                }
+                for i in range(cfg.search_repos)
+            ]
+            return "application/json", json.dumps({"items": repos}).encode()
+        if m := re.fullmatch(r"/repos/([^/]+)/([^/]+)/releases", path):
+            releases = [
+                {
+                    "tag_name": f"v{rng.randint(0, 5)}.{i}.0",
+                    "html_url": f"https://github.com/{m.group(1)}/{m.group(2)}/releases/{i}",
+                    "name": _title(rng, i),
+                    "body": _text(rng, cfg.content_chars),
+                    "published_at": _iso(rng.uniform(1, 72)),
+                }
+                for i in range(cfg.releases_per_repo)
+            ]
+            return "application/json", json.dumps(releases).encode()
+        if path == "/v2/everything":
+            articles = [
+                {
+                    "title": _title(rng, i),
+                    "url": f"https://news.example.com/{i}",
+                    "source": {"name": rng.choice(["TechCrunch", "The Verge", "Wired"])},
+                    "description": _text(rng, cfg.content_chars),
+                    "publishedAt": _iso(rng.uniform(1, 48)),
+                    "author": "Reporter",
+                }
+                for i in range(int(query.get("pageSize", cfg.newsapi_articles)))
+            ]
+            return "application/json", json.dumps({"articles": articles}).encode()
+        if m := re.fullmatch(r"/r/([^/]+)/hot\.json", path):
+            children = [
+                {
+                    "data": {
+                        "title": _title(rng, i),
+                        "permalink": f"/r/{m.group(1)}/comments/{i}/",
+                        "selftext": _text(rng, cfg.content_chars),
+                        "score": rng.randint(0, 3000),
+                        "num_comments": rng.randint(0, 500),
+                        "created_utc": time.time() - rng.uniform(3600, 72 * 3600),
+                        "author": f"user{i}",
+                    }
+                }
+                for i in range(int(query.get("limit", cfg.reddit_posts)))
+            ]
+            return "application/json", json.dumps({"data": {"children": children}}).encode()
+        if path == "/2/tweets/search/recent":
+            tweets = [
+                {"id": str(i), "text": _title(rng, i), "created_at": _iso(rng.uniform(1, 24))}
+                for i in range(cfg.tweets)
+            ]
+            return "application/json", json.dumps({"data": tweets}).encode()
+        if m := re.fullmatch(r"/site/(\d+)/", path):
+            links = "".join(
+                f'<h4><a href="/site/{m.group(1)}/{j}.html">{_title(rng, j)}</a></h4>'
+                for j in range(cfg.site_links)
+            )
+            return "text/html", f"<html><body>{links}</body></html>".encode()
+        if re.fullmatch(r"/site/(\d+)/(\d+)\.html", path):
+            paragraphs = "".join(f"<p>{_text(rng, 120)}</p>" for _ in range(6))
+            body = f'<html><body><time datetime="{_iso(3)}"></time>{paragraphs}</body></html>'
+            return "text/html", body.encode()
+        raise KeyError(path)
+
+    def _feed(self, rng: random.Random, kind: str, feed_id: int) -> bytes:
+        cfg = self.config
+        if kind == "rss":
+            entries = "".join(
+                f"<item><title>{_title(rng, i)}</title>"
+                f"<link>https://feed{feed_id}.example.com/{i}</link>"
+                f"<pubDate>{_rfc822(rng.uniform(1, 72))}</pubDate>"
+                f"<description>&lt;p&gt;{_text(rng, cfg.content_chars)}&lt;/p&gt;</description>"
+                f"<category>AI</category></item>"
+                for i in range(cfg.items_per_feed)
+            )
+            return (
+                f'<?xml version="1.0"?><rss version="2.0"><channel>'
+                f"<title>Feed {feed_id}</title>{entries}</channel></rss>"
+            ).encode()
+        entries = "".join(
+            f"<entry><title>{_title(rng, i)}</title>"
+            f'<link href="https://feed{feed_id}.example.com/{i}"/>'
+            f"<updated>{_iso(rng.uniform(1, 72))}</updated>"
+            f"<summary>{_text(rng, cfg.content_chars)}</summary></entry>"
+            for i in range(cfg.items_per_feed)
+        )
+        return (
+            f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<title>Feed {feed_id}</title>{entries}</feed>"
+        ).encode()
+
+    def _trending(self, rng: random.Random) -> bytes:
+        rows = "".join(
+            f'<article class="Box-row"><h2><a href="/org{i}/ai-repo{i}">org{i} / ai-repo{i}</a></h2>'
+            f"<p>{_text(rng, 100)} llm agent</p>"
+            f'<span class="d-inline-block float-sm-right">{rng.randint(10, 2000)} stars today</span>'
+            f"</article>"
+            for i in range(self.config.trending_repos)
+        )
+        return f"<html><body>{rows}</body></html>".encode()
+
+
+def _make_handler(upstream: FakeUpstream) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            upstream.count("requests")
+            faults = upstream.faults
+            delay = faults.latency_ms + upstream.random() * faults.jitter_ms
+            if delay:
+                time.sleep(delay / 1000)
+
+            roll = upstream.random()
+            if roll < faults.error_rate:
+                upstream.count("errors")
+                self._send(500, "text/plain", b"upstream error")
+                return
+            if roll < faults.error_rate + faults.rate_limit_rate:
+                upstream.count("rate_limited")
+                self._send(429, "text/plain", b"rate limited", {"Retry-After": "1"})
+                return
+
+            parts = urlsplit(self.path)
+            query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+            try:
+                content_type, body = upstream.route(parts.path, query)
+            except KeyError:
+                self._send(404, "text/plain", b"not found")
+                return
+
+            if upstream.random() < faults.slow_drip_rate:
+                upstream.count("drips")
+                self._drip(content_type, body)
+                return
+            self._send(200, content_type, body)
+
+        def _send(
+            self, status: int, content_type: str, body: bytes, headers: dict | None = None
+        ) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _drip(self, content_type: str, body: bytes) -> None:
+            """分块慢速写出响应体，模拟慢连接"""
+            faults = upstream.faults
+            self.send_response(200)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            chunk = max(1, len(body) // faults.slow_drip_chunks)
+            for start in range(0, len(body), chunk):
+                self.wfile.write(body[start : start + chunk])
+                self.wfile.flush()
+                time.sleep(faults.slow_drip_delay_ms / 1000)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
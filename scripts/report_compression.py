@@ -0,0 +1,127 @@
+"""
+Prompt 正文压缩的 token 报告：压缩前（按 token 截断）vs 压缩后（compression.compress）
+
+用法:
+    python scripts/report_compression.py                               # 读取 LLM 标注日志中的正文
+    python scripts/report_compression.py --input data/websub_buffer.jsonl
+    python scripts/report_compression.py --synthetic 500               # 没有历史数据时用合成样本
+
+输入为 JSONL，每行至少包含 title、content。标注日志中的正文最多保存 1000 字符，
+单条摘要阶段的对比请用保存完整正文的文件（如 WebSub 缓冲区）。
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# noqa: E402 - imports after path modification
+from compression import compress  # noqa: E402
+from config import load_settings  # noqa: E402
+from llm import DEFAULT_CONTEXT_WINDOW, DEFAULT_MAX_OUTPUT_TOKENS  # noqa: E402
+from processing import (  # noqa: E402
+    _CLASSIFY_CONTENT_TOKENS,
+    _RELEVANCE_CONTENT_TOKENS,
+    _SUMMARY_CONTENT_TOKENS,
+    _SUMMARY_ITEM_CONTENT_TOKENS,
+)
+from tokens import TokenBudget, estimate_tokens, truncate_to_tokens  # noqa: E402
+
+_FULL_CONTENT = TokenBudget(DEFAULT_CONTEXT_WINDOW, DEFAULT_MAX_OUTPUT_TOKENS).input_tokens
+# (阶段, 压缩前的截断长度, 压缩后的预算)；单条摘要原来只受上下文窗口限制
+STAGES = [
+    ("relevance", _RELEVANCE_CONTENT_TOKENS, _RELEVANCE_CONTENT_TOKENS),
+    ("classify", _CLASSIFY_CONTENT_TOKENS, _CLASSIFY_CONTENT_TOKENS),
+    ("summary batch", _SUMMARY_CONTENT_TOKENS, _SUMMARY_CONTENT_TOKENS),
+    ("summary single", _FULL_CONTENT, _SUMMARY_ITEM_CONTENT_TOKENS),
+]
+
+
+def read_records(path: str) -> list[dict]:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and record.get("content"):
+                records.append(record)
+    return records
+
+
+def synthetic_records(n: int, seed: int = 42) -> list[dict]:
+    """Reddit 帖子 / GitHub 发布说明 / 新闻风格的合成正文"""
+    rng = random.Random(seed)
+    topics = ["LLM inference", "diffusion models", "RAG pipelines", "agent frameworks"]
+    records = []
+    for i in range(n):
+        topic = rng.choice(topics)
+        kind = i % 3
+        if kind == 0:
+            body = "\n".join(
+                ["## What's Changed"]
+                + [
+                    f"* Improve {topic} throughput by {rng.randint(5, 60)}% "
+                    f"by @user{j} in https://github.com/org/repo/pull/{rng.randint(1, 9999)}"
+                    for j in range(rng.randint(5, 40))
+                ]
+                + ["```bash", "pip install -U repo", "```", "**Full Changelog**: https://x/y"]
+            )
+        elif kind == 1:
+            body = (
+                f"I've been benchmarking {topic} on my homelab. "
+                + "Here is my setup and what I found. " * rng.randint(1, 3)
+                + "```python\n"
+                + "for step in range(100):\n    loss = train(step)\n" * rng.randint(2, 20)
+                + "```\n"
+                + f"Results: latency dropped from {rng.randint(200, 900)}ms to "
+                f"{rng.randint(20, 190)}ms. Edit: typo. Edit: typo. Thanks for reading!"
+            )
+        else:
+            body = " ".join(
+                f"研究人员发布了新的{topic}方法，在 {rng.randint(3, 20)} 个基准上取得领先。"
+                f"该方法将成本降低了 {rng.randint(10, 80)}%。"
+                for _ in range(rng.randint(2, 30))
+            )
+        records.append({"title": f"{topic} update {i}", "content": body})
+    return records
+
+
+def main() -> None:
+    settings = load_settings()
+    parser = argparse.ArgumentParser(description="Prompt 正文压缩 token 报告")
+    parser.add_argument("--input", default=settings.local_classifier_label_log)
+    parser.add_argument("--synthetic", type=int, help="使用 N 条合成样本")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        records = synthetic_records(args.synthetic)
+    elif Path(args.input).exists():
+        records = read_records(args.input)
+    else:
+        print(f"{args.input} not found, using 300 synthetic records")
+        records = synthetic_records(300)
+    if not records:
+        print("no records with content")
+        return
+
+    print(f"{len(records)} records")
+    print(f"{'stage':>15}  {'before':>9}  {'after':>9}  {'saved':>6}")
+    for name, before_tokens, after_tokens in STAGES:
+        before = after = 0
+        for record in records:
+            content, title = record["content"], record.get("title", "")
+            before += estimate_tokens(truncate_to_tokens(content, before_tokens))
+            after += estimate_tokens(compress(content, after_tokens, title))
+        saved = 1 - after / before if before else 0.0
+        print(f"{name:>15}  {before:>9}  {after:>9}  {saved:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+报道聚类：把不同来源对同一事件的报道合并为一个 story
+
+同一次发布会被 VentureBeat、HN、多个 subreddit、NewsAPI、机器之心分别报道，
+标题差异往往大到无法被 deduplicate_fuzzy 合并。这里按以下任一条件把条目连成 story
+（并查集，发布时间相差不超过 window_hours）：
+1. 链接相同：规范化后的 URL 相同，或一条的正文中链接了另一条的 URL（HN、Reddit 帖子常转发原文）
+2. 标题相似：标题字符 n-gram 的加权 Jaccard 相似度达到 title_similarity（MinHash/LSH 取候选）
+3. 共享实体：标题中至少 min_shared_entities 个相同的少见实体（产品名、型号、公司名），
+   且标题或正文有一定相似度（两家公司同一天各自发布不同消息时不会被合并）
+
+只统计出现条目数不超过 max_entity_items 的实体，"AI"、"OpenAI" 这类几乎每条都有的词不作为证据。
+每个 story 选评分最高的条目作为代表，其余条目的来源和链接作为出处记录在代表条目的 related 中；
+之后的 LLM 阶段只处理代表条目，调用量随 story 数而不是采集条数增长。
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from dedup import MinHashLSH, content_features
+from models import NewsItem
+
+_URL = re.compile(r"https?://[^\s<>\"')\]]+")
+# 跟踪参数不影响指向的内容
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|ref|ref_src|source|fbclid|gclid|mc_cid|mc_eid)$")
+# 实体：带数字或连字符的型号（GPT-4o、Llama-3.1、o3），首字母大写或全大写的词（Anthropic、NVIDIA）
+_ENTITY = re.compile(r"[A-Za-z][\w.+-]*\d[\w.+-]*|[A-Z][A-Za-z0-9]*(?:[.+-][A-Za-z0-9]+)*")
+# 首字母大写但不是实体的常见词（英文标题每个词都可能大写）
+_ENTITY_STOP_WORDS = frozenset(
+    "a an and are as at be by can for from has have how i in into is it its new now of on "
+    "or our show ask tell the this to update via vs what when why will with you your "
+    "announces launch launches release releases introducing model models open source "
+    "news report says just first after more today week".split()
+)
+_MIN_ENTITY_CHARS = 2
+# 正文相似度只看开头部分（导语），避免长正文的模板化内容拉高相似度
+_CONTENT_PREFIX_CHARS = 1000
+# 单个 story 的条目上限，防止相似条件链式传递把不同事件连成一片
+_MAX_STORY_ITEMS = 30
+
+
+@dataclass
+class Story:
+    """同一事件的一组报道，representative 为其中评分最高的条目"""
+
+    representative: NewsItem
+    members: list[NewsItem] = field(default_factory=list)
+
+    @property
+    def sources(self) -> list[str]:
+        """各成员的来源（按评分从高到低，去重）"""
+        return list(dict.fromkeys(item.source for item in self.members))
+
+
+def normalize_url(url: str) -> str:
+    """去掉协议、www、末尾斜杠、片段和跟踪参数，用于判断两个链接是否指向同一页面"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    path = parts.path.rstrip("/")
+    query = urlencode(
+        sorted(
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if not _TRACKING_PARAMS.match(k.lower())
+        )
+    )
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def linked_urls(item: NewsItem) -> set[str]:
+    """条目自身和正文中的链接（规范化）；只有域名没有路径的链接（首页）不算"""
+    urls = {normalize_url(item.url)} if item.url else set()
+    urls.update(normalize_url(url.rstrip(".,;:!?")) for url in _URL.findall(item.content))
+    return {url for url in urls if "/" in url}
+
+
+def title_entities(title: str) -> set[str]:
+    """
+    标题中的候选实体（小写），中文标题中夹带的英文产品名、型号同样能取出
+    连字符连接的名称同时拆成各部分（"GPT-5.1-Codex-Max" 与 "GPT-5.1 Codex Max" 能对上）；
+    纯整数（年份、数量）不算实体，版本号（5.1）保留
+    """
+    title = unicodedata.normalize("NFKC", title)
+    entities = set()
+    for match in _ENTITY.findall(title):
+        entity = match.strip(".+-").lower()
+        parts = entity.split("-") if "-" in entity else []
+        for candidate in (entity, *parts):
+            if (
+                len(candidate) >= _MIN_ENTITY_CHARS
+                and candidate not in _ENTITY_STOP_WORDS
+                and not candidate.isdigit()
+            ):
+                entities.add(candidate)
+    return entities
+
+
+def _cosine(a: dict[str, int], b: dict[str, int]) -> float:
+    if not a or not b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(count * b.get(feature, 0) for feature, count in a.items())
+    if not dot:
+        return 0.0
+    norm_a = math.sqrt(sum(c * c for c in a.values()))
+    norm_b = math.sqrt(sum(c * c for c in b.values()))
+    return dot / (norm_a * norm_b)
+
+
+class _DisjointSet:
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int, max_size: int) -> bool:
+        a, b = self.find(a), self.find(b)
+        if a == b or self.size[a] + self.size[b] > max_size:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return True
+
+
+def cluster_stories(
+    items: list[NewsItem],
+    window_hours: float = 48,
+    title_similarity: float = 0.5,
+    min_shared_entities: int = 2,
+    entity_similarity: float = 0.2,
+    max_entity_items: int = 8,
+) -> list[Story]:
+    """
+    把条目聚成 story，按代表条目在 items 中的顺序返回
+    代表条目为评分最高者（同分时取正文更长的，便于摘要）；items 需已写入 score
+    - title_similarity: 仅凭标题合并所需的标题相似度（n-gram 按 IDF 加权的 Jaccard）
+    - entity_similarity: 共享实体时，标题 Jaccard 或正文开头的余弦相似度须达到该值
+    - max_entity_items: 出现在超过该条数的条目中的实体视为常见词，不作为证据
+    """
+    n = len(items)
+    if n < 2:
+        return [Story(item, [item]) for item in items]
+
+    window_us = window_hours * 3600 * 1_000_000
+    published = [item.features.published_us for item in items]
+    shingles = [item.features.title_shingles for item in items]
+    entities = [title_entities(item.title) for item in items]
+    content: dict[int, dict[str, int]] = {}
+
+    def content_vector(i: int) -> dict[str, int]:
+        if i not in content:
+            content[i] = content_features(items[i].content_prefix(_CONTENT_PREFIX_CHARS))
+        return content[i]
+
+    # 标题 n-gram 按本批出现的条目数加权（IDF）："GitHub Trending: xxx" 这类模板化标题的
+    # 公共部分权重很低，相似度主要由各自不同的部分决定
+    shingle_counts: dict[str, int] = defaultdict(int)
+    for title_shingles in shingles:
+        for shingle in title_shingles:
+            shingle_counts[shingle] += 1
+    weight = {s: math.log1p(n / count) for s, count in shingle_counts.items()}
+
+    def title_jaccard(i: int, j: int) -> float:
+        union = sum(weight[s] for s in shingles[i] | shingles[j])
+        return sum(weight[s] for s in shingles[i] & shingles[j]) / union if union else 0.0
+
+    # 候选对：共享链接、共享少见实体、标题 LSH 碰撞
+    by_url: dict[str, list[int]] = defaultdict(list)
+    by_entity: dict[str, list[int]] = defaultdict(list)
+    for i, item in enumerate(items):
+        for url in linked_urls(item):
+            by_url[url].append(i)
+        for entity in entities[i]:
+            by_entity[entity].append(i)
+    rare = {e for e, members in by_entity.items() if len(members) <= max_entity_items}
+
+    linked: set[tuple[int, int]] = set()
+    for members in by_url.values():
+        # 被大量条目引用的链接（如同一个论坛首页、聚合页）不作为证据
+        if 1 < len(members) <= max_entity_items:
+            linked.update(_pairs(members))
+    shared: dict[tuple[int, int], int] = defaultdict(int)
+    for entity in rare:
+        for pair in _pairs(by_entity[entity]):
+            shared[pair] += 1
+
+    lsh = MinHashLSH()
+    similar: set[tuple[int, int]] = set()
+    for i in range(n):
+        signature = lsh.signature(shingles[i])
+        for j in lsh.query(signature, min_jaccard=title_similarity * 0.6, limit=16):
+            similar.add((j, i))
+        lsh.insert(i, signature)
+
+    def same_story(pair: tuple[int, int]) -> bool:
+        i, j = pair
+        if abs(published[i] - published[j]) > window_us:
+            return False
+        if pair in linked:
+            return True
+        title = title_jaccard(i, j)
+        if title >= title_similarity:
+            return True
+        if shared.get(pair, 0) >= min_shared_entities:
+            return (
+                title >= entity_similarity
+                or _cosine(content_vector(i), content_vector(j)) >= entity_similarity
+            )
+        return False
+
+    groups = _DisjointSet(n)
+    # 证据强的先合并（链接 > 标题 > 实体），条目数上限先被可靠的边占用
+    for pairs in (linked, similar, shared.keys()):
+        for pair in sorted(pairs):
+            if groups.find(pair[0]) != groups.find(pair[1]) and same_story(pair):
+                groups.union(pair[0], pair[1], _MAX_STORY_ITEMS)
+
+    clusters: dict[int, list[int]] = defaultdict(list)
+    for i in range(n):
+        clusters[groups.find(i)].append(i)
+    stories: list[tuple[int, Story]] = []
+    for indices in clusters.values():
+        ranked = sorted(
+            indices,
+            key=lambda i: (items[i].score, items[i].features.content_length, -i),
+            reverse=True,
+        )
+        members = [items[i] for i in ranked]
+        stories.append((ranked[0], Story(members[0], members)))
+    stories.sort(key=lambda pair: pair[0])
+    return [story for _, story in stories]
+
+
+def _pairs(indices: Iterable[int]) -> Iterable[tuple[int, int]]:
+    indices = sorted(set(indices))
+    for a in range(len(indices)):
+        for b in range(a + 1, len(indices)):
+            yield indices[a], indices[b]
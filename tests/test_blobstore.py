@@ -0,0 +1,123 @@
+"""测试正文磁盘存储"""
+
+import os
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+
+import pytest
+
+from blobstore import PREVIEW_CHARS, BlobStore
+from models import NewsItem
+from processing import filter_relevance_keyword
+
+LONG_BODY = "Large language model agents now plan multi-step tasks. " * 40
+
+
+def make_item(content=LONG_BODY, title="New LLM agent framework"):
+    return NewsItem(
+        title=title,
+        url="https://example.com/a",
+        source="Test",
+        source_type="rss",
+        content=content,
+        published_at=datetime.now(timezone.utc),
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BlobStore.create(str(tmp_path / "blobs"))
+    yield store
+    store.close()
+
+
+class TestBlobStore:
+    """按内容寻址的压缩存储"""
+
+    def test_round_trip_and_dedup(self, store):
+        first = store.put(LONG_BODY)
+        second = store.put(LONG_BODY)
+        other = store.put("中文正文" * 200)
+
+        assert first.key == second.key
+        assert store.get(first.key) == LONG_BODY
+        assert other.load() == "中文正文" * 200
+        assert first.length == len(LONG_BODY)
+        assert first.preview == LONG_BODY[:PREVIEW_CHARS]
+        stats = store.stats()
+        assert stats["blobs"] == 2
+        assert stats["stored_bytes"] < stats["raw_bytes"] / 3
+
+    def test_reads_after_later_writes(self, store):
+        refs = []
+        for n in range(50):
+            refs.append(store.put(f"body {n} " * 100))
+            # 写入与读取交替，映射需要随文件增长更新
+            assert refs[n // 2].load() == f"body {n // 2} " * 100
+        assert [ref.load() for ref in refs] == [f"body {n} " * 100 for n in range(50)]
+
+    def test_close_removes_file(self, tmp_path):
+        store = BlobStore.create(str(tmp_path))
+        store.put(LONG_BODY)
+        assert os.path.exists(store.path)
+        store.close()
+        assert not os.path.exists(store.path)
+
+    def test_stale_files_cleaned(self, tmp_path):
+        stale = tmp_path / "content-old.bin"
+        recent = tmp_path / "content-recent.bin"
+        stale.write_bytes(b"x")
+        recent.write_bytes(b"x")
+        old = time.time() - 3 * 86400
+        os.utime(stale, (old, old))
+
+        BlobStore.create(str(tmp_path)).close()
+        assert not stale.exists()
+        assert recent.exists()
+
+
+class TestOffloadedItems:
+    """正文移入存储后的 NewsItem"""
+
+    def test_content_loaded_lazily(self, store):
+        item = make_item()
+        item.offload(store)
+
+        assert item.content == LONG_BODY
+        assert item.features.content_length == len(LONG_BODY)
+        # 特征缓存不因每次加载得到新的字符串而失效
+        assert item.features is item.features
+        assert asdict(item)["content"] == LONG_BODY
+
+    def test_prefix_from_preview(self, store, monkeypatch):
+        item = make_item()
+        item.offload(store)
+        monkeypatch.setattr(store, "get", lambda key: pytest.fail("full text loaded"))
+
+        assert item.content_prefix(200) == LONG_BODY[:200]
+        assert item.features.content_length == len(LONG_BODY)
+
+    def test_short_content_stays_in_memory(self, store):
+        item = make_item(content="short body")
+        item.offload(store)
+        assert store.stats()["blobs"] == 0
+        assert item.content_prefix(5) == "short"
+
+    def test_assignment_replaces_stored_content(self, store):
+        item = make_item()
+        item.offload(store)
+        item.content = "replaced"
+        assert item.content == "replaced"
+        assert item.features.content_length == len("replaced")
+
+    def test_keyword_filter_unchanged(self, store):
+        bodies = [LONG_BODY, "Football transfer news and match results. " * 30]
+        plain = [make_item(body, title="Weekly roundup") for body in bodies]
+        offloaded = [make_item(body, title="Weekly roundup") for body in bodies]
+        for item in offloaded:
+            item.offload(store)
+
+        expected = [[i.content for i in group] for group in filter_relevance_keyword(plain)]
+        actual = [[i.content for i in group] for group in filter_relevance_keyword(offloaded)]
+        assert actual == expected
@@ -0,0 +1,101 @@
+"""测试单次运行的 LLM 预算"""
+
+import pytest
+
+from budget import BudgetExceeded, RunBudget
+from report import build_report
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRunBudget:
+    """按阶段分配的预算"""
+
+    def test_shares(self):
+        budget = RunBudget(max_tokens=1000, max_calls=10, max_seconds=100)
+        assert budget.limits("relevance_classify") == {"tokens": 300, "calls": 3, "seconds": 30.0}
+        assert budget.limits("overview") == {"tokens": 100, "calls": 1, "seconds": 10.0}
+
+    def test_unlimited(self):
+        budget = RunBudget()
+        for _ in range(1000):
+            budget.reserve("summary", 10_000)
+        assert not budget.exhausted("summary")
+
+    def test_calls_limit(self):
+        budget = RunBudget(max_calls=10)
+        for _ in range(3):
+            budget.reserve("relevance_classify", 10)
+        with pytest.raises(BudgetExceeded) as info:
+            budget.reserve("relevance_classify", 10)
+        assert info.value.resource == "calls"
+        assert budget.exhausted("relevance_classify")
+        # 其他阶段不受影响
+        budget.reserve("classify", 10)
+        assert not budget.exhausted("classify")
+
+    def test_tokens_include_output(self):
+        budget = RunBudget(max_tokens=1000)  # relevance_classify: 300
+        budget.reserve("relevance_classify", 200)
+        budget.record("relevance_classify", 50)
+        with pytest.raises(BudgetExceeded):
+            budget.reserve("relevance_classify", 60)
+        budget.reserve("relevance_classify", 50)
+
+    def test_stage_and_run_time(self):
+        clock = FakeClock()
+        budget = RunBudget(max_seconds=100, clock=clock)
+        budget.reserve("relevance_classify", 1)
+        clock.now = 30
+        budget.record("relevance_classify", 1)
+        budget.reserve("relevance_classify", 1)
+        clock.now = 36
+        with pytest.raises(BudgetExceeded):
+            budget.reserve("relevance_classify", 1)
+        # 整次运行超过总耗时后所有阶段都停止
+        budget.reserve("summary", 1)
+        clock.now = 101
+        with pytest.raises(BudgetExceeded):
+            budget.reserve("summary", 1)
+
+    def test_usage_rows(self):
+        clock = FakeClock()
+        budget = RunBudget(max_tokens=1000, max_calls=20, clock=clock)
+        budget.reserve("summary", 100)
+        clock.now = 2.5
+        budget.record("summary", 50)
+        budget.reserve("relevance_classify", 10)
+        budget.record("relevance_classify", 5)
+        rows = budget.usage()
+        assert [r["stage"] for r in rows] == ["relevance_classify", "summary"]
+        assert rows[1] == {
+            "stage": "summary",
+            "calls": 1,
+            "tokens": 150,
+            "seconds": 2.5,
+            "denied": 0,
+            "max_calls": 8,
+            "max_tokens": 400,
+            "max_seconds": 0.0,
+        }
+
+    def test_report_shows_usage(self):
+        budget = RunBudget(max_calls=10)
+        budget.reserve("relevance_classify", 10)
+        budget.record("relevance_classify", 5)
+        budget.reserve("overview", 1)  # overview 阶段只有 1 次请求的配额
+        budget.reserve("summary", 1)
+        budget.record("summary", 1)
+        with pytest.raises(BudgetExceeded):
+            budget.reserve("overview", 1)
+        text, html = build_report([], "概览", 0, budget.usage())
+        assert "LLM 预算使用" in text
+        assert "- relevance_classify: 1/3 次请求, 15 tokens" in text
+        assert "预算用完，1 次请求已降级" in text
+        assert "overview (degraded)" in html
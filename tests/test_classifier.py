@@ -0,0 +1,121 @@
+"""测试本地相关性/分类模型"""
+
+import random
+from datetime import datetime, timezone
+
+from classifier import LinearModel, LocalClassifier, item_features, read_labels, text_features
+from models import NewsItem
+
+AI_WORDS = "model llm transformer training inference gpu agent benchmark 大模型 训练 推理".split()
+OTHER_WORDS = "football election movie stock recipe weather 足球 电影 股市".split()
+FILLER = "the a of and to in for on with new said today we 我们 今天 表示".split()
+
+
+def create_item(title, content=""):
+    return NewsItem(
+        title=title,
+        url="https://example.com",
+        source="Test",
+        source_type="rss",
+        content=content,
+        published_at=datetime.now(timezone.utc),
+    )
+
+
+def synthetic_item(rng, relevant):
+    words = [rng.choice(FILLER) for _ in range(30)]
+    words += [rng.choice(AI_WORDS if relevant else OTHER_WORDS) for _ in range(6)]
+    rng.shuffle(words)
+    return create_item(" ".join(words[:8]), " ".join(words[8:]))
+
+
+def trained_classifier(n=400, **kwargs):
+    rng = random.Random(7)
+    local = LocalClassifier(min_labels=100, audit_rate=0, **kwargs)
+    for i in range(n):
+        relevant = i % 2 == 0
+        local.learn(synthetic_item(rng, relevant), relevant, "论文与研究" if relevant else None)
+    return local
+
+
+class TestFeatures:
+    """哈希特征测试"""
+
+    def test_stable_and_sorted(self):
+        features = text_features("OpenAI 发布新模型", "The new model", "rss")
+        assert features == text_features("OpenAI 发布新模型", "The new model", "rss")
+        assert features == sorted(set(features))
+
+    def test_title_and_content_distinct(self):
+        assert text_features("model", "") != text_features("", "model")
+
+
+class TestLinearModel:
+    """线性模型测试"""
+
+    def test_learns_separable_labels(self):
+        model = LinearModel()
+        for _ in range(30):
+            model.update(text_features("gpu training", ""), "ai")
+            model.update(text_features("football match", ""), "sports")
+        label, probability = model.predict(text_features("gpu training", ""))
+        assert label == "ai"
+        assert probability > 0.9
+
+    def test_single_label_not_confident(self):
+        model = LinearModel()
+        model.update(text_features("gpu", ""), "ai")
+        assert model.predict(text_features("gpu", "")) == (None, 0.0)
+
+    def test_roundtrip(self):
+        model = LinearModel()
+        model.update(text_features("gpu training", ""), "ai")
+        model.update(text_features("football match", ""), "sports")
+        restored = LinearModel.from_dict(model.to_dict())
+        features = text_features("gpu", "")
+        assert restored.examples == 2
+        assert abs(restored.predict(features)[1] - model.predict(features)[1]) < 1e-4
+
+
+class TestLocalClassifier:
+    """本地模型决策测试"""
+
+    def test_abstains_before_min_labels(self):
+        local = trained_classifier(n=50)
+        features = item_features(create_item("gpu training inference", "大模型 训练"))
+        assert local.judge_relevance(features) is None
+        assert local.classify(features) is None
+
+    def test_confident_after_training(self):
+        local = trained_classifier(threshold=0.8)
+        rng = random.Random(99)
+        for i in range(20):
+            relevant = i % 2 == 0
+            assert local.judge_relevance(item_features(synthetic_item(rng, relevant))) is relevant
+
+    def test_save_load_and_label_log(self, tmp_path):
+        log = str(tmp_path / "labels.jsonl")
+        local = trained_classifier(n=120, label_log_path=log)
+        path = str(tmp_path / "model.json")
+        local.save(path)
+
+        records = list(read_labels(log))
+        assert len(records) == 120
+        assert records[0]["relevant"] is True
+        assert records[0]["category"] == "论文与研究"
+        assert records[1]["category"] is None
+
+        restored = LocalClassifier.load(path, min_labels=100)
+        assert restored.relevance.examples == 120
+        assert restored.category.examples == 60
+
+        # 再次保存时不重复写入已记录的标注
+        local.save(path)
+        assert len(list(read_labels(log))) == 120
+
+    def test_audit_sampling(self):
+        local = LocalClassifier(audit_rate=0.2)
+        items = [create_item(f"news-{i}") for i in range(1000)]
+        audited = sum(local.audit(item) for item in items)
+        assert 150 < audited < 250
+        assert not any(LocalClassifier(audit_rate=0).audit(item) for item in items)
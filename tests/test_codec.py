@@ -0,0 +1,141 @@
+"""测试 NewsItem 批量二进制编码"""
+
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+import codec
+from blobstore import BlobStore
+from models import NewsItem
+
+
+def make_items():
+    return [
+        NewsItem(
+            title="OpenAI 发布新模型",
+            url="https://example.com/1",
+            source="机器之心",
+            source_type="scraper",
+            content="正文" * 200,
+            published_at=datetime(2026, 1, 2, 8, 30, tzinfo=timezone(timedelta(hours=8))),
+            author="alice",
+            tags=("llm", "agent"),
+            raw_score=12.5,
+            fingerprint="abc",
+            category="产品与发布",
+            score=0.75,
+            summary="摘要",
+            related=(("Hacker News", "https://news.ycombinator.com/item?id=1"),),
+        ),
+        NewsItem(
+            title="Plain ASCII title",
+            url="https://example.com/2",
+            source="Hacker News",
+            source_type="rss",
+            content="",
+            published_at=datetime(2026, 1, 2, 3, 4, 5, 6),  # 无时区
+        ),
+        NewsItem(
+            title="Third",
+            url="https://example.com/3",
+            source="机器之心",
+            source_type="scraper",
+            content="short",
+            published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            tags=("llm",),
+        ),
+    ]
+
+
+class TestRoundTrip:
+    """编码后解码得到相同的条目"""
+
+    def test_all_fields(self):
+        items = make_items()
+        decoded = codec.decode(codec.encode(items))
+
+        assert decoded == items
+        assert decoded[0].published_at.utcoffset() == timedelta(hours=8)
+        assert decoded[1].published_at.tzinfo is None
+        # 低基数字段驻留
+        assert decoded[0].source is decoded[2].source
+
+    def test_streaming_frames(self):
+        items = make_items() * 5
+        stream = io.BytesIO()
+
+        assert codec.write_items(stream, iter(items), batch_size=4) == 15
+        stream.seek(0)
+        assert list(codec.read_items(stream)) == items
+        assert [len(batch) for batch in codec.iter_batches(stream.getvalue())] == [4, 4, 4, 3]
+
+    def test_empty(self):
+        assert codec.decode(codec.encode([])) == []
+
+    def test_offloaded_content_written_in_full(self, tmp_path):
+        store = BlobStore.create(str(tmp_path))
+        items = make_items()
+        items[0].offload(store)
+        data = codec.encode(items)
+        store.close()
+
+        assert codec.decode(data)[0].content == "正文" * 200
+
+
+class TestBatchView:
+    """不构造条目直接读取列"""
+
+    def test_columns_without_copy(self):
+        data = bytearray(codec.encode(make_items()))
+        batch = next(codec.iter_batches(data))
+        scores = batch.array("score")
+
+        assert scores.tolist() == [0.75, 0.0, 0.0]
+        assert np.shares_memory(scores, np.frombuffer(data, dtype=np.uint8))
+        assert batch.value("title", 0) == "OpenAI 发布新模型"
+        assert batch.value("category", 1) is None
+        assert batch.value("tags", 2) == ("llm",)
+        assert batch.value("related", 0) == make_items()[0].related
+        assert batch.item(1) == make_items()[1]
+
+    def test_unknown_and_missing_columns(self):
+        # 写入方的 schema 中没有 summary、多了一个不认识的列（同长度改名）：按字段名匹配
+        data = codec.encode(make_items()).replace(b'"summary"', b'"notes__"', 1)
+
+        decoded = codec.decode(data)
+        assert decoded[0].summary == ""
+        assert decoded[0].related == make_items()[0].related
+
+
+class TestErrors:
+    """格式、版本和损坏检查"""
+
+    def test_bad_magic(self):
+        with pytest.raises(codec.CodecError):
+            codec.decode(b"{}" * 8)
+
+    def test_version_mismatch(self):
+        data = bytearray(codec.encode(make_items()))
+        data[4] = codec.FORMAT_VERSION + 1
+        with pytest.raises(codec.CodecError, match="version"):
+            codec.decode(data)
+
+    def test_truncated(self):
+        data = codec.encode(make_items())
+        with pytest.raises(codec.CodecError):
+            codec.decode(data[:-10])
+        with pytest.raises(codec.CodecError):
+            list(codec.read_items(io.BytesIO(data[:-10])))
+
+    def test_missing_required_field(self):
+        data = codec.encode(make_items()).replace(b'"title"', b'"titl_"', 1)
+        with pytest.raises(codec.CodecError, match="title"):
+            codec.decode(data)
+
+    def test_schema_is_json(self):
+        data = codec.encode([])
+        size = int.from_bytes(data[6:8], "little")
+        assert json.loads(data[8 : 8 + size]) == [list(column) for column in codec.SCHEMA]
@@ -0,0 +1,120 @@
+"""测试 prompt 正文压缩"""
+
+import sys
+from datetime import datetime, timezone
+
+from blobstore import BlobStore
+from compression import compress, split_sentences, strip_markup
+from models import NewsItem
+from tokens import estimate_tokens
+
+RELEASE_NOTES = """## What's Changed
+* Add **FlashAttention-3** kernels for Hopper GPUs by @dev in https://github.com/x/y/pull/12
+* Fix `torch.compile` crash with [CUDA graphs](https://example.com/docs/cuda-graphs)
+
+```python
+model = AutoModel.from_pretrained("x/y")
+model.generate(max_new_tokens=128)
+```
+
+<p>Thanks to all contributors!</p> Thanks to all contributors!
+"""
+
+
+class TestStripMarkup:
+    """去掉 markdown / HTML / 代码"""
+
+    def test_release_notes(self):
+        text = strip_markup(RELEASE_NOTES)
+        assert "from_pretrained" not in text
+        assert "https://" not in text and "@dev" not in text
+        assert "<p>" not in text and "**" not in text and "##" not in text
+        assert "Add FlashAttention-3 kernels for Hopper GPUs" in text
+        # 链接保留文字，短的行内代码保留内容
+        assert "Fix torch.compile crash with CUDA graphs" in text
+
+    def test_html_entities(self):
+        # 转义后的尖括号是正文内容，不当作标签去掉
+        assert strip_markup("<b>R&amp;D</b> &lt;tag&gt;") == " R&D <tag>"
+
+
+class TestSplitSentences:
+    """断句与去重"""
+
+    def test_mixed_language_and_duplicates(self):
+        text = (
+            "OpenAI released a model. It is fast!\n我们发布了新版本。推理速度提升 40%！It is fast!"
+        )
+        assert split_sentences(text) == [
+            "OpenAI released a model.",
+            "It is fast!",
+            "我们发布了新版本。",
+            "推理速度提升 40%！",
+        ]
+
+    def test_version_numbers_not_split(self):
+        assert split_sentences("Released v1.2.3 today. Update now.") == [
+            "Released v1.2.3 today.",
+            "Update now.",
+        ]
+
+
+class TestCompress:
+    """按 token 预算抽取句子"""
+
+    def test_short_text_only_cleaned(self):
+        assert compress("**Hello** world. Hello world.", 100) == "Hello world."
+
+    def test_within_budget_and_keeps_order(self):
+        sentences = [
+            f"Sentence number {n} talks about topic {n} in some detail." for n in range(30)
+        ]
+        text = " ".join(sentences)
+        result = compress(text, 60)
+        assert estimate_tokens(result) <= 60
+        kept = [s for s in sentences if s in result]
+        # 导语保留，其余按原顺序输出
+        assert kept[0] == sentences[0]
+        assert result == " ".join(kept)
+
+    def test_prefers_title_related_sentences(self):
+        text = (
+            "The weather was nice at the conference this year. "
+            "Lunch was served in the main hall for all attendees. "
+            "Meta released Llama 4 with a 10M token context window. "
+            "Parking was available in the north lot for visitors. "
+            "Llama 4 outperforms previous open models on reasoning benchmarks."
+        )
+        result = compress(text, 48, "Meta releases Llama 4")
+        assert "Llama 4 with a 10M token context window" in result
+        assert "Llama 4 outperforms" in result
+        assert "Parking" not in result
+
+    def test_long_lead_truncated(self):
+        result = compress("word " * 500, 20)
+        assert 0 < estimate_tokens(result) <= 20
+
+    def test_empty(self):
+        assert compress("", 100) == ""
+        assert compress("```\ncode only\n```", 100) == ""
+        assert compress("text", 0) == ""
+
+    def test_cache_does_not_keep_body(self, tmp_path):
+        store = BlobStore.create(str(tmp_path))
+        item = NewsItem(
+            title="Agents plan tasks",
+            url="https://example.com/a",
+            source="Test",
+            source_type="rss",
+            content="".join(f"Agent step {n} plans the next task in detail. " for n in range(200)),
+            published_at=datetime.now(timezone.utc),
+        )
+        item.offload(store)
+        body = item.content
+        result = compress(body, 50, item.title)
+        assert compress(item.content, 50, item.title) is result
+
+        store.close()
+        del item
+        # 存储关闭、条目释放后，只剩 body 变量（及 getrefcount 的参数）引用正文
+        assert sys.getrefcount(body) == 2
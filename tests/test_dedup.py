@@ -0,0 +1,275 @@
+"""测试近似重复检测"""
+
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+
+from dedup import (
+    MinHashLSH,
+    SimHashIndex,
+    char_shingles,
+    content_features,
+    normalize_text,
+    simhash,
+)
+from label_store import CATEGORY, LabelStore
+from models import NewsItem
+from processing import (
+    _CATEGORY_VERSION,
+    deduplicate_content,
+    deduplicate_fuzzy,
+    record_content_fingerprints,
+)
+
+
+def create_item(title, raw_score=0.5, url="https://example.com", content=""):
+    return NewsItem(
+        title=title,
+        url=url,
+        source="Test",
+        source_type="rss",
+        content=content,
+        published_at=datetime.now(timezone.utc),
+        raw_score=raw_score,
+    )
+
+
+class TestShingles:
+    """字符 n-gram 测试"""
+
+    def test_normalize_ignores_case_space_and_punctuation(self):
+        assert normalize_text("GPT-5 发布！") == normalize_text("gpt 5发布!")
+
+    def test_mixed_chinese_english(self):
+        shingles = char_shingles("智谱GLM-5")
+        # 中文片段 2-gram，英文数字片段 3-gram
+        assert "智谱" in shingles
+        assert "glm" in shingles
+        assert "lm5" in shingles
+
+    def test_short_text(self):
+        assert char_shingles("AI") == {"ai"}
+        assert char_shingles("") == set()
+
+
+class TestMinHashLSH:
+    """MinHash/LSH 索引测试"""
+
+    def test_identical_signatures(self):
+        lsh = MinHashLSH()
+        sig = lsh.signature(char_shingles("OpenAI releases GPT-5"))
+        lsh.insert("a", sig)
+        assert lsh.query(sig) == ["a"]
+        assert lsh.jaccard(sig, sig) == 1.0
+
+    def test_near_duplicate_is_candidate(self):
+        lsh = MinHashLSH()
+        lsh.insert("a", lsh.signature(char_shingles("Google announces new AI model Gemini")))
+        lsh.insert("b", lsh.signature(char_shingles("Tesla recalls vehicles over autopilot")))
+
+        query = lsh.signature(char_shingles("Google Announces New AI Model Gemini 2"))
+        assert lsh.query(query, min_jaccard=0.25) == ["a"]
+
+    def test_limit(self):
+        lsh = MinHashLSH()
+        sig = lsh.signature(char_shingles("same title"))
+        for key in range(5):
+            lsh.insert(key, sig)
+        assert len(lsh.query(sig, limit=2)) == 2
+
+
+class TestDeduplicateFuzzyLSH:
+    """基于 LSH 的模糊去重测试"""
+
+    def test_chinese_titles(self):
+        items = [
+            create_item("OpenAI 发布 GPT-5 预览版", raw_score=0.6),
+            create_item("OpenAI 正式发布 GPT-5 预览版", raw_score=0.7),
+            create_item("英伟达 H200 芯片全面出货"),
+        ]
+        result = deduplicate_fuzzy(items)
+        assert len(result) == 2
+        assert result[0].raw_score == 0.7
+
+    def test_replacement_keeps_position(self):
+        items = [
+            create_item("Meta releases Llama 4", raw_score=0.5, url="https://a.com"),
+            create_item("Anthropic ships Claude update", raw_score=0.5, url="https://b.com"),
+            create_item("Meta Releases Llama 4!", raw_score=0.9, url="https://c.com"),
+        ]
+        result = deduplicate_fuzzy(items)
+        assert [i.url for i in result] == ["https://c.com", "https://b.com"]
+
+    def test_replaced_item_still_matches_later_duplicates(self):
+        items = [
+            create_item("Meta releases Llama 4", raw_score=0.5),
+            create_item("Meta releases Llama 4 today", raw_score=0.9),
+            create_item("meta releases llama 4", raw_score=0.1),
+        ]
+        result = deduplicate_fuzzy(items)
+        assert len(result) == 1
+        assert result[0].raw_score == 0.9
+
+    def test_matches_pairwise_reference(self):
+        titles = [
+            "OpenAI releases GPT-5",
+            "Google announces new AI model Gemini",
+            "OpenAI Releases GPT-5",
+            "英伟达 H200 芯片全面出货",
+            "Google unveils new AI model Gemini",
+            "DeepSeek 开源第二代代码模型",
+            "英伟达H200芯片全面出货！",
+            "LangChain v0.2 brings streaming support",
+        ]
+        items = [create_item(t, raw_score=i / 10) for i, t in enumerate(titles)]
+
+        # 两两比较的参考结果
+        expected = []
+        for item in items:
+            dup = next(
+                (
+                    e
+                    for e in expected
+                    if SequenceMatcher(None, item.title.lower(), e.title.lower()).ratio() >= 0.75
+                ),
+                None,
+            )
+            if dup is None:
+                expected.append(item)
+            elif item.raw_score > dup.raw_score:
+                expected[expected.index(dup)] = item
+
+        assert deduplicate_fuzzy(items) == expected
+
+
+ARTICLE = (
+    "OpenAI today released a new reasoning model that outperforms previous versions on "
+    "math and coding benchmarks. The model is available to ChatGPT Plus users and through "
+    "the API, with pricing lower than the earlier generation. 该模型在多项推理基准上取得领先。"
+)
+SYNDICATED = ARTICLE.replace("today released", "has released") + " (via Reuters)"
+OTHER = (
+    "Nvidia reported quarterly revenue driven by data center demand for its H200 GPUs, "
+    "while warning that export restrictions could affect shipments to some regions. "
+    "英伟达称下一代芯片将于明年量产。"
+)
+
+
+class TestSimHash:
+    """SimHash 指纹测试"""
+
+    def test_near_duplicate_close(self):
+        a = simhash(content_features(ARTICLE))
+        b = simhash(content_features(SYNDICATED))
+        c = simhash(content_features(OTHER))
+        assert (a ^ b).bit_count() <= 6
+        assert (a ^ c).bit_count() > 10
+
+    def test_features_mixed_language(self):
+        features = content_features("GPT-5 发布，GPT-5 来了")
+        assert features["gpt"] == 2
+        assert features["发布"] == 1
+
+    def test_index_hamming_lookup(self):
+        index = SimHashIndex(max_distance=3)
+        index.add(0b1011 << 40, "a", "2026-01-01")
+        assert index.find((0b1011 << 40) ^ 0b111)[1] == "a"  # 距离 3
+        assert index.find((0b1011 << 40) ^ 0b1111) is None  # 距离 4
+
+    def test_persistence_window(self, tmp_path):
+        path = str(tmp_path / "index.json")
+        index = SimHashIndex()
+        index.add(1, "old", "2026-01-01")
+        index.add(2, "recent", "2026-01-09")
+        index.add(3, "today", "2026-01-10")
+        index.save(path)
+
+        loaded = SimHashIndex.load(path, "2026-01-10", window_days=7)
+        # 超出窗口的记录不加载；当天的记录加载，重复运行时保存不会丢失
+        assert [key for _, key, _ in loaded.entries] == ["recent", "today"]
+        assert loaded.find(3)[1] == "today"
+        assert loaded.find(3, before="2026-01-10")[1] == "recent"
+
+
+class TestDeduplicateContent:
+    """内容级去重测试"""
+
+    def test_drops_story_seen_previous_day(self):
+        index = SimHashIndex()
+        yesterday = [create_item("OpenAI ships new model", content=ARTICLE)]
+        deduplicate_content(yesterday, index, "2026-01-09")
+        record_content_fingerprints(yesterday, index, "2026-01-09")
+
+        today = [
+            create_item("New reasoning model from OpenAI", url="https://b.com", content=SYNDICATED),
+            create_item("Nvidia earnings", url="https://c.com", content=OTHER),
+        ]
+        result = deduplicate_content(today, index, "2026-01-10")
+        assert [i.url for i in result] == ["https://c.com"]
+
+    def test_same_run_keeps_higher_score(self):
+        items = [
+            create_item(
+                "OpenAI ships new model", raw_score=0.3, url="https://a.com", content=ARTICLE
+            ),
+            create_item("Nvidia earnings", url="https://b.com", content=OTHER),
+            create_item("Syndicated copy", raw_score=0.8, url="https://c.com", content=SYNDICATED),
+        ]
+        result = deduplicate_content(items, SimHashIndex(), "2026-01-10")
+        assert [i.url for i in result] == ["https://c.com", "https://b.com"]
+
+    def test_rerun_same_day_not_dropped(self, tmp_path):
+        path = str(tmp_path / "index.json")
+        items = [create_item("OpenAI ships new model", content=ARTICLE)]
+
+        index = SimHashIndex.load(path, "2026-01-10")
+        assert len(deduplicate_content(items, index, "2026-01-10")) == 1
+        assert record_content_fingerprints(items, index, "2026-01-10") == 1
+        index.save(path)
+
+        index = SimHashIndex.load(path, "2026-01-10")
+        assert len(deduplicate_content(items, index, "2026-01-10")) == 1
+        # 第二次运行的新条目与第一次运行的记录合并保存
+        other = [create_item("Nvidia earnings", url="https://c.com", content=OTHER)]
+        assert record_content_fingerprints(items + other, index, "2026-01-10") == 1
+        index.save(path)
+        assert len(SimHashIndex.load(path, "2026-01-10")) == 2
+
+    def test_unjudged_items_not_recorded(self):
+        # 前一天被过滤、没有经过 LLM 阶段的条目不记录，之后的同一报道不被丢弃
+        index = SimHashIndex()
+        yesterday = [
+            create_item("OpenAI ships new model", content=ARTICLE),
+            create_item("Nvidia earnings", url="https://c.com", content=OTHER),
+        ]
+        deduplicate_content(yesterday, index, "2026-01-09")
+        record_content_fingerprints(yesterday[1:], index, "2026-01-09")
+
+        today = [
+            create_item("New reasoning model from OpenAI", url="https://b.com", content=SYNDICATED),
+            create_item("Nvidia earnings again", url="https://d.com", content=OTHER),
+        ]
+        result = deduplicate_content(today, index, "2026-01-10")
+        assert [i.url for i in result] == ["https://b.com"]
+
+    def test_repeat_with_stored_label_kept(self, tmp_path):
+        # 第一天：经过 LLM 阶段，类别写入结果存储，指纹写入索引
+        labels = LabelStore(str(tmp_path / "labels.sqlite3"))
+        index = SimHashIndex()
+        day1 = [create_item("trending/repo", url="https://github.com/a/b", content=ARTICLE)]
+        assert deduplicate_content(day1, index, "2026-01-09", labels=labels) == day1
+        labels.put([(day1[0], "开源项目")], CATEGORY, _CATEGORY_VERSION)
+        record_content_fingerprints(day1, index, "2026-01-09")
+
+        # 第二天：同一条目再次采集到，保留并拿到保存的类别；换了链接的转载仍被丢弃
+        repeat = create_item("trending/repo", url="https://github.com/a/b", content=ARTICLE)
+        copy = create_item("Repost", url="https://b.com", content=SYNDICATED)
+        result = deduplicate_content([repeat, copy], index, "2026-01-10", labels=labels)
+        assert result == [repeat]
+        assert labels.get(result, CATEGORY, _CATEGORY_VERSION) == ["开源项目"]
+        # 没有结果存储时按原规则丢弃
+        assert deduplicate_content([repeat], index, "2026-01-10") == []
+        labels.close()
+
+    def test_short_content_skipped(self):
+        items = [create_item("A", content="short"), create_item("B", content="short")]
+        assert len(deduplicate_content(items, SimHashIndex(), "2026-01-10")) == 2
@@ -0,0 +1,68 @@
+"""测试本地抽取式摘要"""
+
+from extractive import rank_sentences, summarize
+from tokens import estimate_tokens
+
+RELEASE = (
+    "## What's Changed\n"
+    "OpenAI released GPT-5.1 Codex Max, a coding model for long-running agent sessions. "
+    "The model compacts its own context so coding sessions can run for hours. "
+    "On SWE-bench Verified the model scores 77.9%, up from 73.7% for GPT-5.1 Codex. "
+    "Follow us on Twitter for more updates!\n"
+    "```python\nclient.responses.create(model='gpt-5.1-codex-max')\n```"
+)
+
+ZH_NEWS = (
+    "阿里发布通义千问 3.0，推理能力大幅提升。"
+    "新模型在数学和代码基准上全面超过前代模型。"
+    "通义千问 3.0 已在魔搭社区开源，提供 7 个尺寸。"
+    "欢迎关注我们的公众号！"
+)
+
+
+class TestRankSentences:
+    """TextRank 排序"""
+
+    def test_scores_normalized(self):
+        scores = rank_sentences(["alpha beta gamma", "beta gamma delta", "unrelated words here"])
+        assert abs(sum(scores) - 1) < 1e-9
+        assert rank_sentences([]) == []
+
+    def test_central_and_title_sentences_first(self):
+        sentences = [
+            "Thanks for reading our newsletter this week.",
+            "Gemini 3 improves multimodal reasoning across video and audio.",
+            "Gemini 3 reasoning gains show up on video benchmarks.",
+            "The weather was nice during the event.",
+        ]
+        scores = rank_sentences(sentences, title="Google launches Gemini 3")
+        assert sorted(range(4), key=lambda i: scores[i], reverse=True)[:2] == [1, 2]
+
+
+class TestSummarize:
+    """抽取式摘要"""
+
+    def test_english(self):
+        summary = summarize(RELEASE, "OpenAI releases GPT-5.1 Codex Max", max_tokens=80)
+        assert summary.startswith("OpenAI released GPT-5.1 Codex Max")
+        assert "77.9%" in summary
+        assert "What's Changed" not in summary
+        assert "client.responses" not in summary
+        assert "Twitter" not in summary
+
+    def test_chinese(self):
+        summary = summarize(ZH_NEWS, "阿里发布通义千问 3.0", max_tokens=80, max_sentences=2)
+        assert summary.startswith("阿里发布通义千问 3.0")
+        assert "公众号" not in summary
+
+    def test_limits(self):
+        summary = summarize(RELEASE, "GPT-5.1 Codex Max", max_tokens=40)
+        assert 0 < estimate_tokens(summary) <= 40
+        assert summarize(RELEASE, max_sentences=1).count(". ") == 0
+        # 没有一句放得下时截断得分最高的句子
+        assert 0 < estimate_tokens(summarize(RELEASE, max_tokens=8)) <= 8
+
+    def test_empty(self):
+        assert summarize("") == ""
+        assert summarize("```\ncode only\n```") == ""
+        assert summarize(RELEASE, max_tokens=0) == ""
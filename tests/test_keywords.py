@@ -0,0 +1,104 @@
+"""测试关键词匹配"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
+
+import keywords
+from keywords import KeywordMatcher, load_keyword_matcher
+from models import NewsItem
+from processing import classify, filter_relevance_keyword
+
+
+def create_item(title, content=""):
+    return NewsItem(
+        title=title,
+        url="https://example.com",
+        source="Test",
+        source_type="rss",
+        content=content,
+        published_at=datetime.now(timezone.utc),
+    )
+
+
+class TestKeywordMatcher:
+    """匹配规则测试"""
+
+    def test_word_boundary(self):
+        matcher = KeywordMatcher({"black": ["nfl", "star"], "white": ["ai", "acl"]})
+        assert matcher.scan("Conflict at the station: startup said") == {}
+        assert matcher.scan("NFL stars? No: AI, ACL-2025!") == {
+            "black": ["nfl"],
+            "white": ["ai", "acl"],
+        }
+
+    def test_prefix(self):
+        matcher = KeywordMatcher({"release": ["release*"]})
+        assert matcher.scan("OpenAI released o3") == {"release": ["release*"]}
+        assert matcher.scan("Prerelease builds") == {}
+
+    def test_phrase(self):
+        matcher = KeywordMatcher({"l": ["machine learning", "open source", "neural network*"]})
+        assert matcher.scan("Machine-learning for open  source") == {
+            "l": ["machine learning", "open source"]
+        }
+        assert matcher.scan("machine vision learning") == {}
+        assert matcher.scan("graph neural networks") == {"l": ["neural network*"]}
+
+    def test_chinese_substring_and_overlap(self):
+        matcher = KeywordMatcher({"zh": ["训练", "预训练", "大模型", "模型推理"]})
+        hits = matcher.scan("国产大模型推理与预训练")
+        # 按配置顺序返回所有命中，包括相互重叠的关键词
+        assert hits == {"zh": ["训练", "预训练", "大模型", "模型推理"]}
+
+    def test_all_lists_in_one_scan(self):
+        matcher = KeywordMatcher({"a": ["gpt*", "人工智能"], "b": ["gpt*"], "c": ["film"]})
+        assert matcher.scan("GPT-4o 与人工智能") == {"a": ["gpt*", "人工智能"], "b": ["gpt*"]}
+
+    def test_invalid_keyword(self):
+        with pytest.raises(ValueError):
+            KeywordMatcher({"a": ["--"]})
+
+    def test_classify_priority(self):
+        matcher = KeywordMatcher({"first": ["paper"], "second": ["release*"]}, ["first", "second"])
+        assert matcher.classify(matcher.scan("paper release")) == "first"
+        assert matcher.classify(matcher.scan("nothing here")) is None
+
+    def test_concurrent_scans_with_cache_resets(self, monkeypatch):
+        # 缓存很小，各线程的扫描之间频繁清空缓存，结果仍与单线程一致
+        monkeypatch.setattr(keywords, "_CACHE_LIMIT", 20)
+        matcher = KeywordMatcher({"a": ["gpt*", "open source"], "b": ["release*"]})
+        texts = [f"GPT-{n} open source release w{n} x{n} y{n} z{n}" for n in range(2000)]
+        expected = {"a": ["gpt*", "open source"], "b": ["release*"]}
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(matcher.scan, texts))
+        assert all(hits == expected for hits in results)
+
+
+class TestConfiguredKeywords:
+    """keywords.yaml 配置测试"""
+
+    def test_config_loads(self):
+        matcher = load_keyword_matcher()
+        assert matcher.categories[0] == "论文与研究"
+        assert "hacker_news" in matcher.scan("Show HN: an AI agent for the terminal")
+
+    def test_relevance_filter(self):
+        items = [
+            create_item("NFL playoff schedule"),
+            create_item("OpenAI releases new model"),
+            create_item("Conflict in the Middle East"),
+            create_item("国产大模型发布"),
+        ]
+        whitelist, greyzone, blacklist = filter_relevance_keyword(items)
+        assert [i.title for i in blacklist] == ["NFL playoff schedule"]
+        assert [i.title for i in whitelist] == ["OpenAI releases new model", "国产大模型发布"]
+        # "conflict" 不再被 nfl 误判为体育新闻
+        assert [i.title for i in greyzone] == ["Conflict in the Middle East"]
+
+    def test_classify_star_not_substring(self):
+        # "start" 不再命中开源项目的 "star"
+        assert classify(create_item("The startup started hiring")) == "其他"
+        assert classify(create_item("Project hits 10k stars on GitHub")) == "开源项目"
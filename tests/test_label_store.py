@@ -0,0 +1,73 @@
+"""测试条目级 LLM 结果存储"""
+
+import time
+from datetime import datetime, timezone
+
+from label_store import CATEGORY, RELEVANCE, SUMMARY, LabelStore, prompt_version
+from models import NewsItem
+
+
+def make_item(n, content="body"):
+    return NewsItem(
+        title=f"news-{n}",
+        url=f"https://example.com/{n}",
+        source="Test",
+        source_type="rss",
+        content=content,
+        published_at=datetime.now(timezone.utc),
+        fingerprint=f"fp-{n}",
+    )
+
+
+class TestLabelStore:
+    """按 (指纹, 正文哈希, 字段, prompt 版本) 保存的结果"""
+
+    def test_round_trip(self, tmp_path):
+        store = LabelStore(str(tmp_path / "labels.sqlite3"))
+        items = [make_item(n) for n in range(3)]
+        store.put([(items[0], True), (items[1], False)], RELEVANCE, "v1")
+        store.put([(items[0], "开源项目")], CATEGORY, "v1")
+
+        assert store.get(items, RELEVANCE, "v1") == [True, False, None]
+        assert store.get(items, CATEGORY, "v1") == ["开源项目", None, None]
+        assert store.stats() == {"hits": 3, "misses": 3}
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "data" / "labels.sqlite3")
+        store = LabelStore(path)
+        store.put([(make_item(0), "summary-0")], SUMMARY, "v1")
+        store.close()
+
+        assert LabelStore(path).get([make_item(0)], SUMMARY, "v1") == ["summary-0"]
+
+    def test_content_and_version_invalidate(self, tmp_path):
+        store = LabelStore(str(tmp_path / "labels.sqlite3"))
+        store.put([(make_item(0), True)], RELEVANCE, "v1")
+
+        assert store.get([make_item(0, content="edited")], RELEVANCE, "v1") == [None]
+        assert store.get([make_item(0)], RELEVANCE, "v2") == [None]
+        assert store.get([make_item(0)], CATEGORY, "v1") == [None]
+
+    def test_skips_missing_values_and_fingerprints(self, tmp_path):
+        store = LabelStore(str(tmp_path / "labels.sqlite3"))
+        anonymous = make_item(1)
+        anonymous.fingerprint = ""
+        store.put([(make_item(0), None), (anonymous, True)], RELEVANCE, "v1")
+
+        assert store.get([make_item(0), anonymous], RELEVANCE, "v1") == [None, None]
+
+    def test_expired_entries(self, tmp_path, monkeypatch):
+        store = LabelStore(str(tmp_path / "labels.sqlite3"), ttl_days=1)
+        store.put([(make_item(0), True)], RELEVANCE, "v1")
+        later = time.time() + 2 * 86400
+        monkeypatch.setattr(time, "time", lambda: later)
+
+        assert store.get([make_item(0)], RELEVANCE, "v1") == [None]
+        # 之后的保存会删除过期记录
+        store.put([(make_item(1), True)], RELEVANCE, "v1")
+        assert store._conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0] == 1
+
+    def test_prompt_version(self):
+        assert prompt_version("a", "b") == prompt_version("a", "b")
+        assert prompt_version("a", "b") != prompt_version("a", "b ")
+        assert prompt_version("ab") != prompt_version("a", "b")
@@ -0,0 +1,837 @@
+"""测试 LLM 路由与并发批处理"""
+
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+
+import pytest
+
+from classifier import LocalClassifier, item_features
+from config import Settings
+from label_store import LabelStore
+from llm import LLMRouter, RateLimiter, ResponseCache
+from models import NewsItem
+from processing import (
+    classify,
+    classify_with_llm,
+    deduplicate,
+    filter_ai_relevance_llm,
+    filter_and_classify_llm,
+    summarize_with_llm,
+)
+from tokens import estimate_tokens
+
+
+class StubRouter(LLMRouter):
+    """不访问网络的路由器：按 prompt 中的标题编号生成响应"""
+
+    def __init__(self, respond, concurrency=4, delay=0.05, batch_items=10, **settings):
+        settings.setdefault("llm_cache_enabled", False)
+        super().__init__(
+            Settings(
+                _env_file=None,
+                qwen_api_key="test",
+                llm_strategy="primary",
+                llm_max_concurrency=concurrency,
+                llm_batch_max_items=batch_items,
+                **settings,
+            ),
+            "llm_providers.yaml",
+        )
+        self.respond = respond
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _request(self, provider, prompt):
+        self._limiters[provider.name].acquire()
+        self.requests += 1
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            return self.respond(prompt)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def create_items(n):
+    return [
+        NewsItem(
+            title=f"news-{i}",
+            url=f"https://example.com/{i}",
+            source="Test",
+            source_type="rss",
+            content="",
+            published_at=datetime.now(timezone.utc),
+        )
+        for i in range(n)
+    ]
+
+
+def numbers_in(prompt):
+    return [int(n) for n in re.findall(r"news-(\d+)", prompt)]
+
+
+def relevant_if_even(prompt):
+    return json.dumps(
+        [{"index": idx, "relevant": n % 2 == 0} for idx, n in enumerate(numbers_in(prompt))]
+    )
+
+
+class TestConcurrentBatches:
+    """并发批处理测试"""
+
+    def test_relevance_results_map_to_items(self):
+        router = StubRouter(relevant_if_even)
+        items = create_items(45)
+        result = filter_ai_relevance_llm(items, router)
+        # 结果顺序与串行执行一致
+        assert [i.title for i in result] == [f"news-{n}" for n in range(0, 45, 2)]
+        assert 1 < router.max_in_flight <= 4
+
+    def test_concurrency_reduces_wall_time(self):
+        items = create_items(80)
+        start = time.perf_counter()
+        filter_ai_relevance_llm(items, StubRouter(relevant_if_even, concurrency=1, delay=0.05))
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        filter_ai_relevance_llm(items, StubRouter(relevant_if_even, concurrency=4, delay=0.05))
+        concurrent = time.perf_counter() - start
+        assert concurrent < serial / 2
+
+    def test_failing_batch_isolated(self):
+        def respond(prompt):
+            if "news-10" in prompt:
+                raise RuntimeError("provider error")
+            return relevant_if_even(prompt)
+
+        items = create_items(30)
+        result = filter_ai_relevance_llm(items, StubRouter(respond))
+        titles = [i.title for i in result]
+        # 失败的批次（10-19）整批保留，其他批次正常过滤
+        assert titles == [f"news-{n}" for n in range(30) if n % 2 == 0 or 10 <= n < 20]
+
+    def test_classification_concurrent(self):
+        def respond(prompt):
+            return json.dumps(
+                [
+                    {"index": idx, "category": "开源项目" if n % 3 == 0 else "行业动态"}
+                    for idx, n in enumerate(numbers_in(prompt))
+                ]
+            )
+
+        items = create_items(40)
+        classify_with_llm(items, StubRouter(respond))
+        assert all(
+            item.category == ("开源项目" if n % 3 == 0 else "行业动态")
+            for n, item in enumerate(items)
+        )
+
+
+class TestRateLimiter:
+    """速率限制测试"""
+
+    def test_spacing(self):
+        limiter = RateLimiter(requests_per_minute=600)  # 间隔 0.1 秒
+        start = time.perf_counter()
+        threads = [threading.Thread(target=limiter.acquire) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert time.perf_counter() - start >= 0.29
+
+    def test_unlimited(self):
+        limiter = RateLimiter(requests_per_minute=0)
+        start = time.perf_counter()
+        for _ in range(100):
+            limiter.acquire()
+        assert time.perf_counter() - start < 0.05
+
+    def test_router_respects_rpm(self):
+        router = StubRouter(relevant_if_even, delay=0, llm_requests_per_minute=1200)
+        start = time.perf_counter()
+        filter_ai_relevance_llm(create_items(50), router)  # 5 批，间隔 0.05 秒
+        assert time.perf_counter() - start >= 0.19
+
+
+def fused_respond(prompt):
+    """合并阶段的响应：偶数编号相关，类别按编号；分类阶段 prompt 只返回类别"""
+    numbers = numbers_in(prompt)
+    if "relevant" not in prompt:
+        return json.dumps([{"index": idx, "category": "教程与观点"} for idx in range(len(numbers))])
+    return json.dumps(
+        [
+            {
+                "index": idx,
+                "relevant": n % 2 == 0,
+                "category": "开源项目" if n % 2 == 0 else None,
+            }
+            for idx, n in enumerate(numbers)
+        ]
+    )
+
+
+class TestFusedRelevanceClassification:
+    """相关性判断 + 分类合并调用测试"""
+
+    def test_whitelist_always_kept(self):
+        router = StubRouter(fused_respond, delay=0)
+        items = create_items(20)
+        whitelist, greyzone = items[:10], items[10:]
+        result = filter_and_classify_llm(whitelist, greyzone, router)
+
+        # 白名单条目即使模型判为不相关也保留；奇数编号的白名单条目没拿到类别，走单独分类
+        assert result == whitelist + [i for i in greyzone if int(i.title[5:]) % 2 == 0]
+        assert [i.category for i in whitelist[:2]] == ["开源项目", "教程与观点"]
+        assert all(i.category == "开源项目" for i in result[10:])
+
+    def test_made_up_category_classified_separately(self):
+        prompts = []
+
+        def respond(prompt):
+            prompts.append(prompt)
+            numbers = numbers_in(prompt)
+            if "relevant" not in prompt:
+                return json.dumps(
+                    [{"index": idx, "category": "行业动态"} for idx in range(len(numbers))]
+                )
+            return json.dumps(
+                [
+                    {"index": idx, "relevant": True, "category": "宇宙新闻"}
+                    for idx in range(len(numbers))
+                ]
+            )
+
+        items = create_items(4)
+        result = filter_and_classify_llm(items[:2], items[2:], StubRouter(respond, delay=0))
+
+        # 编造的类别不进入报告，条目交给单独的分类调用
+        assert result == items
+        assert len(prompts) == 2
+        assert all(i.category == "行业动态" for i in items)
+
+    def test_made_up_category_falls_back_to_keywords(self):
+        def respond(prompt):
+            return json.dumps(
+                [{"index": idx, "category": "宇宙新闻"} for idx in range(len(numbers_in(prompt)))]
+            )
+
+        items = create_items(3)
+        classify_with_llm(items, StubRouter(respond, delay=0))
+        assert [i.category for i in items] == [classify(i) for i in items]
+
+    def test_fewer_calls_than_two_stages(self):
+        def count_calls(run):
+            prompts = []
+
+            def respond(prompt):
+                prompts.append(prompt)
+                return fused_respond(prompt).replace("null", '"行业动态"')
+
+            run(StubRouter(respond, delay=0))
+            return len(prompts), sum(len(p) for p in prompts)
+
+        items = create_items(120)
+        for item in items:
+            item.content = "word " * 60
+        whitelist, greyzone = items[:40], items[40:]
+
+        def two_stages(router):
+            approved = filter_ai_relevance_llm(greyzone, router)
+            classify_with_llm(whitelist + approved, router)
+
+        old_calls, old_chars = count_calls(two_stages)
+        new_calls, new_chars = count_calls(
+            lambda router: filter_and_classify_llm(whitelist, greyzone, router)
+        )
+        assert new_calls < old_calls
+        # 灰区条目的正文只发送一次
+        assert new_chars < old_chars
+
+    def test_failed_batch_uses_classification_path(self):
+        def respond(prompt):
+            if "relevant" in prompt and "news-3" in prompt:
+                raise RuntimeError("provider error")
+            return fused_respond(prompt)
+
+        items = create_items(16)
+        result = filter_and_classify_llm([], items, StubRouter(respond, delay=0, batch_items=8))
+        # 第一批（0-7）失败：整批保留并由分类流程补上类别；第二批正常过滤
+        assert [i.title for i in result] == [f"news-{n}" for n in range(8)] + [
+            f"news-{n}" for n in range(8, 16, 2)
+        ]
+        assert all(i.category == "教程与观点" for i in result[:8])
+
+    def test_missing_index_kept(self):
+        def respond(prompt):
+            # 只返回 news-0 的结果，其余条目（包括补发时）一直缺失
+            return json.dumps(
+                [
+                    {"index": idx, "relevant": False, "category": None}
+                    for idx, n in enumerate(numbers_in(prompt))
+                    if n == 0
+                ]
+            )
+
+        items = create_items(3)
+        router = StubRouter(respond, delay=0)
+        result = filter_and_classify_llm([], items, router)
+        assert [i.title for i in result] == ["news-1", "news-2"]
+        assert router.retry_stats()["relevance_classify"] == {"requests": 1, "items": 2}
+
+
+class TestPartialBatchRecovery:
+    """批量响应损坏时只补发缺失的条目"""
+
+    def test_malformed_object_requeued(self):
+        prompts = []
+
+        def respond(prompt):
+            prompts.append(numbers_in(prompt))
+            text = relevant_if_even(prompt)
+            # 第一次响应中 news-3 的对象损坏
+            return text.replace('{"index": 3, "relevant": false}', '{"index": 3, "relevant": fals}')
+
+        items = create_items(8)
+        router = StubRouter(respond, delay=0)
+        result = filter_ai_relevance_llm(items, router)
+        assert [i.title for i in result] == [f"news-{n}" for n in range(0, 8, 2)]
+        # 补发批次只包含缺失的条目
+        assert prompts == [list(range(8)), [3]]
+        assert router.retry_stats() == {"relevance": {"requests": 1, "items": 1}}
+
+    def test_truncated_response_requeued(self):
+        prompts = []
+
+        def respond(prompt):
+            prompts.append(numbers_in(prompt))
+            text = json.dumps(
+                [
+                    {"index": idx, "category": "开源项目" if n % 2 else "行业动态"}
+                    for idx, n in enumerate(numbers_in(prompt))
+                ]
+            )
+            # 首个请求的输出在第 6 个对象中间被截断
+            return text[: text.index('{"index": 5') + 12] if len(prompts) == 1 else text
+
+        items = create_items(10)
+        router = StubRouter(respond, delay=0)
+        classify_with_llm(items, router)
+        assert prompts == [list(range(10)), list(range(5, 10))]
+        assert [i.category for i in items] == [
+            "开源项目" if n % 2 else "行业动态" for n in range(10)
+        ]
+        assert router.retry_stats()["classify"] == {"requests": 1, "items": 5}
+
+    def test_unparseable_batch_split_in_halves(self):
+        prompts = []
+
+        def respond(prompt):
+            numbers = numbers_in(prompt)
+            prompts.append(numbers)
+            return "无法完成" if len(numbers) > 4 else relevant_if_even(prompt)
+
+        items = create_items(8)
+        router = StubRouter(respond, delay=0)
+        result = filter_ai_relevance_llm(items, router)
+        assert prompts == [list(range(8)), [0, 1, 2, 3], [4, 5, 6, 7]]
+        assert [i.title for i in result] == [f"news-{n}" for n in range(0, 8, 2)]
+
+    def test_retries_disabled(self):
+        def respond(prompt):
+            return json.dumps([{"index": 0, "relevant": False}])
+
+        router = StubRouter(respond, delay=0, llm_batch_retries=0)
+        result = filter_ai_relevance_llm(create_items(3), router)
+        # 缺失结果的条目保守保留
+        assert [i.title for i in result] == ["news-1", "news-2"]
+        assert router.requests == 1
+        assert router.retry_stats() == {}
+
+    def test_truncated_summary_overview_recovered(self):
+        def respond(prompt):
+            text = summary_respond(prompt)
+            if "JSON对象" in prompt:
+                return text[: text.index('{"index": 3')]
+            return text
+
+        items = create_items(5)
+        router = StubRouter(respond, delay=0)
+        overview = summarize_with_llm(items, router)
+        assert overview == "batch overview"
+        assert [i.summary for i in items] == [f"summary-{n}" for n in range(3)] + [
+            "single-3",
+            "single-4",
+        ]
+
+
+class TestTokenBudgetBatches:
+    """按 token 预算分批测试"""
+
+    def test_budget_is_smallest_provider(self):
+        router = StubRouter(relevant_if_even, zhipu_api_key="test")
+        router.providers[1].context_window = 4096
+        budget = router.token_budget()
+        assert budget.context_window == 4096
+        assert budget.max_output_tokens == 4096
+
+    def test_short_items_fill_batches(self):
+        prompts = []
+
+        def respond(prompt):
+            prompts.append(prompt)
+            return relevant_if_even(prompt)
+
+        router = StubRouter(respond, delay=0, batch_items=30)
+        filter_ai_relevance_llm(create_items(90), router)
+        assert len(prompts) == 3
+
+    def test_long_chinese_items_respect_context_window(self):
+        prompts = []
+
+        def respond(prompt):
+            prompts.append(prompt)
+            return relevant_if_even(prompt)
+
+        router = StubRouter(respond, delay=0, batch_items=30)
+        router.providers[0].context_window = 2048
+        router.providers[0].max_output_tokens = 512
+        items = create_items(40)
+        for item in items:
+            item.content = "国产大模型发布新版本" * 50
+        result = filter_ai_relevance_llm(items, router)
+
+        assert len(result) == 20
+        assert len(prompts) > 3
+        assert all(estimate_tokens(p) <= router.token_budget().input_tokens for p in prompts)
+
+
+class TestResponseCache:
+    """LLM 响应缓存测试"""
+
+    def test_rerun_hits_cache(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        items = create_items(30)
+        first = StubRouter(relevant_if_even, delay=0, llm_cache_enabled=True, llm_cache_path=path)
+        filter_ai_relevance_llm(items, first)
+        assert first.requests == 3
+        assert first.cache.stats() == {"hits": 0, "misses": 3, "coalesced": 0}
+
+        # 重新运行（新进程）：全部命中，结果不变
+        second = StubRouter(relevant_if_even, delay=0, llm_cache_enabled=True, llm_cache_path=path)
+        result = filter_ai_relevance_llm(items, second)
+        assert second.requests == 0
+        assert second.cache.stats()["hits"] == 3
+        assert [i.title for i in result] == [f"news-{n}" for n in range(0, 30, 2)]
+
+    def test_key_includes_provider_and_model(self):
+        base = ResponseCache.key("通义千问", "qwen-plus", 0.3, "system", "prompt")
+        assert base == ResponseCache.key("通义千问", "qwen-plus", 0.3, "system", "prompt")
+        assert base != ResponseCache.key("智谱 GLM", "qwen-plus", 0.3, "system", "prompt")
+        assert base != ResponseCache.key("通义千问", "qwen-max", 0.3, "system", "prompt")
+        assert base != ResponseCache.key("通义千问", "qwen-plus", 0.7, "system", "prompt")
+        assert base != ResponseCache.key("通义千问", "qwen-plus", 0.3, "other", "prompt")
+
+    def test_ttl(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0.05, max_entries=10)
+        calls = []
+        cache.get_or_call("k", lambda: calls.append(1) or "v1")
+        assert cache.get_or_call("k", lambda: "v2") == "v1"
+        time.sleep(0.1)
+        assert cache.get_or_call("k", lambda: "v2") == "v2"
+        assert cache.stats() == {"hits": 1, "misses": 2, "coalesced": 0}
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=3600, max_entries=3)
+        for key in ["a", "b", "c"]:
+            cache.get_or_call(key, lambda key=key: key)
+            time.sleep(0.01)
+        cache.get_or_call("a", lambda: "new")  # 访问 a，b 成为最久未访问
+        time.sleep(0.01)
+        cache.get_or_call("d", lambda: "d")
+        assert cache.get_or_call("a", lambda: "new") == "a"
+        assert cache.get_or_call("b", lambda: "new") == "new"
+
+    def test_identical_in_flight_requests_coalesced(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=3600, max_entries=10)
+        calls = []
+
+        def slow_call():
+            calls.append(1)
+            time.sleep(0.1)
+            return "response"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_call("k", slow_call)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == ["response"] * 5
+        assert len(calls) == 1
+        assert cache.stats() == {"hits": 0, "misses": 1, "coalesced": 4}
+
+    def test_errors_not_cached(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=3600, max_entries=10)
+
+        def fail():
+            raise RuntimeError("provider error")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_call("k", fail)
+        assert cache.get_or_call("k", lambda: "ok") == "ok"
+
+
+def summary_respond(prompt, skip=()):
+    """按 prompt 类型返回摘要/概览；skip 中编号的条目在批量结果里缺失"""
+    numbers = numbers_in(prompt)
+    summaries = [
+        {"index": idx, "summary": f"summary-{n}"} for idx, n in enumerate(numbers) if n not in skip
+    ]
+    if "JSON对象" in prompt:
+        return json.dumps({"overview": "batch overview", "summaries": summaries})
+    if "JSON数组" in prompt:
+        return json.dumps(summaries)
+    if "新闻摘要列表" in prompt:
+        return "overview from summaries"
+    if "总体概览" in prompt:
+        return "overview from items"
+    return f"single-{numbers[0]}"
+
+
+class TestBatchedSummaries:
+    """批量摘要测试"""
+
+    def run(self, items, respond=summary_respond, **settings):
+        prompts = []
+
+        def recording(prompt):
+            prompts.append(prompt)
+            return respond(prompt)
+
+        router = StubRouter(recording, delay=0, **settings)
+        return summarize_with_llm(items, router), prompts
+
+    def test_single_request_with_overview(self):
+        items = create_items(10)
+        overview, prompts = self.run(items)
+        assert len(prompts) == 1
+        assert overview == "batch overview"
+        assert [i.summary for i in items] == [f"summary-{n}" for n in range(10)]
+
+    def test_overview_parallel_when_multiple_batches(self):
+        items = create_items(10)
+        overview, prompts = self.run(items, batch_items=4)
+        # 3 个摘要批次 + 1 个概览请求，全部并发
+        assert len(prompts) == 4
+        assert overview == "overview from items"
+        assert [i.summary for i in items] == [f"summary-{n}" for n in range(10)]
+
+    def test_missing_items_fall_back_to_single_calls(self):
+        items = create_items(10)
+        overview, prompts = self.run(items, partial(summary_respond, skip={3, 7}))
+        assert len(prompts) == 3
+        assert overview == "batch overview"
+        assert items[3].summary == "single-3"
+        assert items[7].summary == "single-7"
+        assert items[0].summary == "summary-0"
+
+    def test_unparseable_response_falls_back(self):
+        def respond(prompt):
+            if "JSON对象" in prompt:
+                return "抱歉，我无法按要求输出"
+            return summary_respond(prompt)
+
+        items = create_items(5)
+        overview, prompts = self.run(items, respond)
+        assert len(prompts) == 1 + 5 + 1
+        assert overview == "overview from summaries"
+        assert [i.summary for i in items] == [f"single-{n}" for n in range(5)]
+
+    def test_per_item_mode(self):
+        items = create_items(4)
+        overview, prompts = self.run(items, llm_batch_summaries=False)
+        assert len(prompts) == 5
+        assert overview == "overview from summaries"
+        assert items[2].summary == "single-2"
+
+    def test_failed_summary_extracted_locally(self):
+        def respond(prompt):
+            if "news-1" in prompt and "原文" in prompt:
+                raise RuntimeError("provider down")
+            return summary_respond(prompt)
+
+        items = create_items(3)
+        items[1].content = "Model 1 improves reasoning accuracy by 11% on benchmarks. Read more."
+        self.run(items, respond, llm_batch_summaries=False)
+        assert items[0].summary == "single-0"
+        assert items[1].summary == "Model 1 improves reasoning accuracy by 11% on benchmarks."
+
+        # 正文没有可用句子时用标题，摘要不会为空
+        items = create_items(2)
+        self.run(items, respond, llm_batch_summaries=False)
+        assert items[1].summary == "news-1"
+
+    def test_empty_summary_extracted_locally(self):
+        def respond(prompt):
+            if "news-1" in prompt and "原文" in prompt:
+                return "  \n"
+            return summary_respond(prompt)
+
+        items = create_items(2)
+        items[1].content = "Model 1 improves reasoning accuracy by 11% on benchmarks. Read more."
+        self.run(items, respond, llm_batch_summaries=False)
+        assert items[0].summary == "single-0"
+        assert items[1].summary == "Model 1 improves reasoning accuracy by 11% on benchmarks."
+
+    def test_failed_overview_uses_titles(self):
+        def respond(prompt):
+            if "新闻摘要列表" in prompt:
+                raise RuntimeError("provider down")
+            return summary_respond(prompt)
+
+        items = create_items(3)
+        overview, _ = self.run(items, respond, llm_batch_summaries=False)
+        assert overview.startswith("今日共 3 条 AI 新闻")
+        assert items[0].summary == "single-0"
+
+    def test_trending_terms_in_overview_prompt(self):
+        prompts = []
+
+        def recording(prompt):
+            prompts.append(prompt)
+            return summary_respond(prompt)
+
+        router = StubRouter(recording, delay=0, batch_items=4)
+        overview = summarize_with_llm(create_items(10), router, trends=["codex max", "智谱"])
+        # 只有概览请求带升温话题，摘要批次的 prompt 不变
+        assert overview == "overview from items"
+        trending = [p for p in prompts if "codex max、智谱" in p]
+        assert len(trending) == 1 and "JSON" not in trending[0]
+
+        prompts.clear()
+        self.run(create_items(10), recording, batch_items=4)
+        assert not any("升温" in p for p in prompts)
+
+    def test_low_ranked_items_extracted_locally(self):
+        items = create_items(8)
+        for n, item in enumerate(items):
+            item.content = f"Model {n} improves reasoning accuracy by {n + 10}% on benchmarks."
+        prompts = []
+
+        def recording(prompt):
+            prompts.append(prompt)
+            return summary_respond(prompt)
+
+        overview = summarize_with_llm(items, StubRouter(recording, delay=0), llm_items=5)
+        # 前 5 条一个摘要批次，概览根据全部 8 条并发生成
+        assert sorted(numbers_in(p) for p in prompts) == [list(range(5)), list(range(8))]
+        assert overview == "overview from items"
+        assert [i.summary for i in items[:5]] == [f"summary-{n}" for n in range(5)]
+        assert items[7].summary == "Model 7 improves reasoning accuracy by 17% on benchmarks."
+
+
+class TestBudgetDegradation:
+    """阶段预算用完后的降级"""
+
+    def test_greyzone_dropped_and_keyword_classification(self):
+        items = create_items(40)
+        whitelist, greyzone = items[:20], items[20:]
+        # 共 7 次请求：合并调用 2 次，classify 1 次（已提前用掉）
+        router = StubRouter(fused_respond, delay=0, concurrency=1, llm_budget_calls=7)
+        router.budget.reserve("classify", 0)
+        result = filter_and_classify_llm(whitelist, greyzone, router)
+
+        assert router.requests == 2
+        usage = {row["stage"]: row for row in router.budget.usage()}
+        assert usage["relevance_classify"]["calls"] == 2
+        assert usage["relevance_classify"]["denied"] == 2
+        # 合并调用不计入单独的相关性判断阶段
+        assert "relevance" not in usage
+        assert usage["classify"]["denied"] == 1
+        # 预算用完的批次（20-39）：灰色地带条目丢弃；白名单条目全部保留
+        assert [i.title for i in result] == [f"news-{n}" for n in range(20)]
+        # LLM 没给出类别的白名单条目回退到关键词分类
+        assert [i.category for i in whitelist[:2]] == ["开源项目", classify(whitelist[1])]
+
+    def test_summaries_degrade_to_local(self):
+        items = create_items(6)
+        for n, item in enumerate(items):
+            item.content = f"Model {n} improves reasoning accuracy by {n + 10}% on benchmarks."
+        router = StubRouter(summary_respond, delay=0, llm_budget_calls=1, llm_batch_summaries=False)
+        overview = summarize_with_llm(items, router)
+        # summary / overview 的配额都只有 1 次
+        assert items[0].summary == "single-0"
+        assert items[1].summary == "Model 1 improves reasoning accuracy by 11% on benchmarks."
+        assert overview == "overview from summaries"
+
+        router = StubRouter(summary_respond, delay=0, llm_budget_calls=1)
+        router.budget.reserve("summary", 0)
+        router.budget.reserve("overview", 0)
+        for item in items:
+            item.summary = ""
+        overview = summarize_with_llm(items, router)
+        assert router.requests == 0
+        assert overview.startswith("今日共 6 条 AI 新闻")
+        assert all(i.summary.startswith("Model") for i in items)
+
+    def test_cache_hits_not_counted(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        items = create_items(30)
+        settings = {"llm_cache_enabled": True, "llm_cache_path": path}
+        filter_ai_relevance_llm(items, StubRouter(relevant_if_even, delay=0, **settings))
+
+        router = StubRouter(relevant_if_even, delay=0, llm_budget_calls=1, **settings)
+        result = filter_ai_relevance_llm(items, router)
+        assert len(result) == 15
+        assert router.budget.usage() == []
+
+
+class StubLocalClassifier(LocalClassifier):
+    """按标题给出本地结论的模型"""
+
+    def __init__(self, relevance, categories):
+        super().__init__(audit_rate=0)
+        self.relevance_by_features = {tuple(item_features(i)): v for i, v in relevance}
+        self.category_by_features = {tuple(item_features(i)): v for i, v in categories}
+
+    def judge_relevance(self, features):
+        return self.relevance_by_features.get(tuple(features))
+
+    def classify(self, features):
+        return self.category_by_features.get(tuple(features))
+
+
+class TestLocalClassifierCascade:
+    """本地模型 + LLM 级联测试"""
+
+    def test_confident_items_skip_llm(self):
+        prompts = []
+
+        def respond(prompt):
+            prompts.append(prompt)
+            return fused_respond(prompt)
+
+        items = create_items(8)
+        whitelist, greyzone = items[:4], items[4:]
+        local = StubLocalClassifier(
+            relevance=[(items[4], False), (items[5], True)],
+            categories=[(items[0], "论文与研究"), (items[1], "行业动态")],
+        )
+        result = filter_and_classify_llm(whitelist, greyzone, StubRouter(respond, delay=0), local)
+
+        assert len(prompts) == 2  # 合并调用 + 奇数编号白名单条目的单独分类
+        sent = numbers_in(prompts[0])
+        # news-0/1 本地分类，news-4 本地判为不相关；news-5 本地判为相关，只需 LLM 分类
+        assert sent == [2, 3, 5, 6, 7]
+        assert "[已确认相关] 标题: news-5" in prompts[0]
+        assert "[已确认相关] 标题: news-6" not in prompts[0]
+        assert [i.title for i in result[:2]] == ["news-0", "news-1"]
+        assert items[0].category == "论文与研究"
+        assert {i.title for i in result} == {f"news-{n}" for n in [0, 1, 2, 3, 5, 6]}
+
+    def test_learns_from_llm_labels(self, tmp_path):
+        items = create_items(4)
+        local = LocalClassifier(label_log_path=str(tmp_path / "labels.jsonl"))
+        filter_and_classify_llm(items[:2], items[2:], StubRouter(fused_respond, delay=0), local)
+
+        # 白名单条目只记录类别；灰色地带条目记录相关性，不相关的没有类别
+        assert [(r["title"], r["relevant"], r["category"]) for r in local._pending_labels] == [
+            ("news-0", None, "开源项目"),
+            ("news-2", True, "开源项目"),
+            ("news-3", False, None),
+        ]
+        assert local.relevance.examples == 2
+        assert local.category.examples == 2
+
+
+class TestLabelStoreReuse:
+    """条目级结果存储：重复出现的条目不再发给 LLM"""
+
+    def recording(self, respond):
+        prompts = []
+
+        def call(prompt):
+            prompts.append(prompt)
+            return respond(prompt)
+
+        return StubRouter(call, delay=0), prompts
+
+    def test_second_run_skips_llm(self, tmp_path):
+        labels = LabelStore(str(tmp_path / "labels.sqlite3"))
+        items = deduplicate(create_items(6))
+        router, prompts = self.recording(fused_respond)
+        first = filter_and_classify_llm(items[:2], items[2:], router, labels=labels)
+        first_categories = {i.title: i.category for i in first}
+        assert prompts
+
+        items = deduplicate(create_items(6))
+        router, prompts = self.recording(fused_respond)
+        second = filter_and_classify_llm(items[:2], items[2:], router, labels=labels)
+
+        assert prompts == []
+        assert {i.title: i.category for i in second} == first_categories
+        # news-3/5 已判为不相关，直接丢弃
+        assert {i.title for i in second} == {"news-0", "news-1", "news-2", "news-4"}
+
+    def test_changed_content_is_resent(self, tmp_path):
+        labels = LabelStore(str(tmp_path / "labels.sqlite3"))
+        router, _ = self.recording(relevant_if_even)
+        filter_ai_relevance_llm(deduplicate(create_items(4)), router, labels)
+
+        items = deduplicate(create_items(4))
+        items[1].content = "updated"
+        router, prompts = self.recording(relevant_if_even)
+        result = filter_ai_relevance_llm(items, router, labels)
+
+        assert [numbers_in(p) for p in prompts] == [[1]]
+        assert [i.title for i in result] == ["news-0", "news-2"]
+
+    def test_classification_reused(self, tmp_path):
+        labels = LabelStore(str(tmp_path / "labels.sqlite3"))
+        router, _ = self.recording(fused_respond)
+        classify_with_llm(deduplicate(create_items(3)), router, labels)
+
+        items = deduplicate(create_items(4))
+        router, prompts = self.recording(fused_respond)
+        classify_with_llm(items, router, labels)
+
+        assert [numbers_in(p) for p in prompts] == [[3]]
+        assert {i.category for i in items} == {"教程与观点"}
+
+    def test_summaries_reused(self, tmp_path):
+        labels = LabelStore(str(tmp_path / "labels.sqlite3"))
+        router, _ = self.recording(summary_respond)
+        summarize_with_llm(deduplicate(create_items(3)), router, labels)
+
+        items = deduplicate(create_items(4))
+        router, prompts = self.recording(summary_respond)
+        overview = summarize_with_llm(items, router, labels)
+
+        # 只有新条目的摘要批次，概览根据全部条目并发生成
+        assert sorted(numbers_in(p) for p in prompts) == [[0, 1, 2, 3], [3]]
+        assert overview == "overview from items"
+        assert [i.summary for i in items] == [f"summary-{n}" for n in range(4)]
+
+    def test_local_summaries_not_stored(self, tmp_path):
+        labels = LabelStore(str(tmp_path / "labels.sqlite3"))
+        items = deduplicate(create_items(2))
+        router = StubRouter(summary_respond, delay=0, llm_budget_calls=1)
+        router.budget.reserve("summary", 0)  # 摘要阶段的预算已用完
+        summarize_with_llm(items, router, labels)
+
+        assert all(item.summary for item in items)
+        assert labels._conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0] == 0
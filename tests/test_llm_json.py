@@ -0,0 +1,55 @@
+"""测试 LLM 批量响应的容错解析"""
+
+from llm_json import extract_field, extract_objects, indexed_results, strip_code_fence
+
+
+class TestExtractObjects:
+    """逐个取出可解析的对象"""
+
+    def test_valid_array(self):
+        text = '```json\n[{"index": 0, "relevant": true}, {"index": 1, "relevant": false}]\n```'
+        assert extract_objects(text) == [
+            {"index": 0, "relevant": True},
+            {"index": 1, "relevant": False},
+        ]
+
+    def test_truncated_array(self):
+        text = '[{"index": 0, "category": "开源项目"}, {"index": 1, "category": "行业动态"}, {"ind'
+        assert [o["index"] for o in extract_objects(text)] == [0, 1]
+
+    def test_broken_object_skipped(self):
+        text = '[{"index": 0, "relevant": true}, {"index": 1, "relevant": tru}, {"index": 2}]'
+        assert [o["index"] for o in extract_objects(text)] == [0, 2]
+
+    def test_surrounding_text(self):
+        text = '结果如下：\n{"index": 0, "relevant": true}\n{"index": 1, "relevant": false}\n以上。'
+        assert [o["index"] for o in extract_objects(text)] == [0, 1]
+
+    def test_no_json(self):
+        assert extract_objects("抱歉，我无法按要求输出") == []
+
+    def test_truncated_outer_object_yields_inner(self):
+        text = '{"overview": "今日概览", "summaries": [{"index": 0, "summary": "a"}, {"index": 1'
+        assert extract_objects(text) == [{"index": 0, "summary": "a"}]
+        assert extract_field(text, "overview") == "今日概览"
+        assert extract_field(text, "missing") is None
+
+
+class TestIndexedResults:
+    """按编号整理结果"""
+
+    def test_range_duplicates_and_types(self):
+        objects = [
+            {"index": 0, "v": "first"},
+            {"index": 0, "v": "second"},
+            {"index": "2", "v": "string index"},
+            {"index": 5, "v": "out of range"},
+            {"index": True, "v": "bool"},
+            {"v": "no index"},
+        ]
+        results = indexed_results(objects, 3)
+        assert results == {0: {"index": 0, "v": "first"}, 2: {"index": "2", "v": "string index"}}
+
+    def test_strip_code_fence(self):
+        assert strip_code_fence("```json\n[]\n```") == "[]"
+        assert strip_code_fence("  []  ") == "[]"
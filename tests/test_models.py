@@ -1,5 +1,6 @@
 """测试数据模型"""
 
+from dataclasses import asdict
 from datetime import datetime, timezone
 
 from models import NewsItem
@@ -21,7 +22,7 @@ def test_newsitem_creation():
     assert item.source_type == "rss"
     assert item.raw_score == 0.0
     assert item.score == 0.0
-    assert item.tags == []
+    assert item.tags == ()
 
 
 def test_newsitem_with_optional_fields():
@@ -59,3 +60,67 @@ def test_newsitem_fingerprint():
     )
 
     assert item.fingerprint == "abc123"
+
+
+def test_newsitem_features_cached():
+    """测试派生特征只计算一次，且不影响比较和序列化"""
+    item = NewsItem(
+        title="OpenAI Releases GPT-5",
+        url="https://example.com",
+        source="Source",
+        source_type="rss",
+        content="A new model",
+        published_at=datetime(2026, 1, 1, 8, 0),
+    )
+
+    features = item.features
+    assert item.features is features
+    assert features.text == "openai releases gpt-5 a new model"
+    assert features.content_length == 11
+    assert features.published_utc.tzinfo == timezone.utc
+    assert "whitelist" in features.keyword_hits
+    assert item.features.title_shingles is features.title_shingles
+    # 小写全文不缓存，特征中不多留一份正文
+    assert features.text is not features.text
+    assert "openai releases gpt-5 a new model" not in vars(features).values()
+    assert "_features" not in asdict(item)
+
+
+def test_newsitem_features_invalidated():
+    """测试修改正文后特征重新计算"""
+    item = NewsItem(
+        title="Test",
+        url="https://example.com",
+        source="Source",
+        source_type="rss",
+        content="short",
+        published_at=datetime.now(timezone.utc),
+    )
+
+    assert item.features.content_length == 5
+    item.content = "a much longer content"
+    assert item.features.content_length == 21
+
+
+def test_newsitem_compact():
+    """测试紧凑表示：无实例 __dict__，低基数字段驻留，tags 为元组"""
+    items = [
+        NewsItem(
+            title=f"News {i}",
+            url=f"https://example.com/{i}",
+            source="".join(["Hacker ", "News"]),  # 运行时拼接的字符串（不是字面量常量）
+            source_type="rss",
+            content="",
+            published_at=datetime.now(timezone.utc),
+            tags=["ai"] if i else [],
+            category="".join(["产品", "与发布"]),
+        )
+        for i in range(2)
+    ]
+
+    assert not hasattr(items[0], "__dict__")
+    assert items[0].source is items[1].source
+    assert items[0].category is items[1].category
+    assert items[0].tags == ()
+    assert items[1].tags == ("ai",)
+    assert "_features" not in asdict(items[0])
@@ -1,15 +1,20 @@
 """测试处理逻辑"""
 
+import random
 from datetime import datetime, timedelta, timezone
 
 from models import NewsItem
 from processing import (
+    DiversityQuotas,
+    ScoringWeights,
     _fingerprint,
     classify,
     deduplicate,
     deduplicate_fuzzy,
     score,
+    score_batch,
     select_diverse_items,
+    shortlist_for_selection,
 )
 
 
@@ -161,6 +166,52 @@ class TestScore:
         assert score_old > score_new
 
 
+class TestScoreBatch:
+    """批量评分测试"""
+
+    def test_matches_score_exactly(self):
+        rng = random.Random(0)
+        now = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+        items = []
+        for i in range(5000):
+            published = now - timedelta(microseconds=rng.randrange(0, 200 * 3600 * 10**6))
+            if i % 3 == 0:
+                published = published.replace(tzinfo=None)  # 无时区按 UTC 处理
+            elif i % 3 == 1:
+                published = published.astimezone(timezone(timedelta(hours=8)))
+            item = create_test_item(raw_score=rng.choice([0.2, 0.5, 0.8, rng.random()]))
+            item.published_at = published
+            item.content = "A" * rng.choice([0, 100, 101, 500])
+            items.append(item)
+        # 边界：未来时间、刚好 1 小时、刚好 72 小时
+        for hours in [-5, 1, 72]:
+            item = create_test_item(raw_score=0.8, content="A" * 200)
+            item.published_at = now - timedelta(hours=hours)
+            items.append(item)
+
+        batch = score_batch(items, now=now).tolist()
+        assert batch == [score(item, now=now) for item in items]
+
+    def test_custom_weights(self):
+        now = datetime.now(timezone.utc)
+        weights = ScoringWeights(base=0.2, recency=0.6, content=0.2, recency_hours=24)
+        items = [
+            create_test_item(raw_score=0.9, hours_ago=20, content="A" * 200),
+            create_test_item(raw_score=0.6, hours_ago=1, content="A" * 200),
+        ]
+        assert score_batch(items, weights, now).tolist() == [
+            score(item, weights, now) for item in items
+        ]
+        # 加大时效性权重后，新内容反超
+        default = score_batch(items, now=now)
+        assert default[0] > default[1]
+        weighted = score_batch(items, weights, now)
+        assert weighted[0] < weighted[1]
+
+    def test_empty(self):
+        assert score_batch([]).tolist() == []
+
+
 class TestSelectDiverseItems:
     """多样性选择测试"""
 
@@ -222,6 +273,121 @@ class TestSelectDiverseItems:
         result = select_diverse_items(items, max_count=5)
         assert len(result) == 5
 
+    def test_select_diverse_matches_sorted_greedy(self):
+        """堆选择与“整体排序 + 贪心 + 补足”的结果逐条一致（已排序/未排序输入、同分条目）"""
+
+        def reference(items, max_count):
+            ordered = sorted(items, key=lambda x: x.score, reverse=True)
+            type_limit = max(2, int(max_count * 0.4))
+            category_limit = max(2, int(max_count * 0.35))
+            counts: dict[tuple[str, str], int] = {}
+            selected = []
+            for item in ordered:
+                if len(selected) >= max_count:
+                    break
+                keys = [
+                    ("type", item.source_type),
+                    ("source", item.source),
+                    ("category", item.category or "其他"),
+                ]
+                limits = [type_limit, 3, category_limit]
+                if all(counts.get(k, 0) < limit for k, limit in zip(keys, limits, strict=True)):
+                    selected.append(item)
+                    for k in keys:
+                        counts[k] = counts.get(k, 0) + 1
+            for item in ordered:
+                if len(selected) >= max_count:
+                    break
+                if all(item is not chosen for chosen in selected):
+                    selected.append(item)
+            return selected
+
+        rng = random.Random(7)
+        items = []
+        # 超过 1000 条：覆盖堆弹出次数达到上限后改为整体排序的路径
+        for i in range(1500):
+            item = create_test_item(
+                url=f"https://example.com/{i}",
+                source_type=rng.choice(["rss", "github", "reddit"]),
+                category=rng.choice(["论文与研究", "产品与发布", None]),
+            )
+            item.source = f"source_{rng.randrange(8)}"
+            item.score = rng.choice([0.3, 0.5, 0.7, rng.random()])
+            items.append(item)
+
+        for max_count in (1, 10, 60, 1200):
+            expected = reference(items, max_count)
+            result = select_diverse_items(items, max_count=max_count)
+            assert [id(x) for x in result] == [id(x) for x in expected]
+            presorted = sorted(items, key=lambda x: x.score, reverse=True)
+            result = select_diverse_items(presorted, max_count=max_count)
+            assert [id(x) for x in result] == [id(x) for x in expected]
+
+    def test_select_diverse_custom_quotas(self):
+        """自定义配额：每个来源最多 1 条，配额不足时按评分补足"""
+        items = []
+        for i in range(6):
+            item = create_test_item(
+                url=f"https://example.com/{i}", source_type=f"type_{i}", category=f"cat_{i}"
+            )
+            item.source = "Same" if i < 4 else f"Other_{i}"
+            item.score = 0.9 - i * 0.1
+            items.append(item)
+
+        quotas = DiversityQuotas(max_per_source=1)
+        result = select_diverse_items(items, max_count=3, quotas=quotas)
+        assert [item.source for item in result] == ["Same", "Other_4", "Other_5"]
+
+        result = select_diverse_items(items, max_count=5, quotas=quotas)
+        assert [id(x) for x in result] == [id(items[i]) for i in (0, 4, 5, 1, 2)]
+
+
+class TestShortlistForSelection:
+    """LLM 之前的预排序筛选"""
+
+    def make_items(self, n, source=lambda i: f"source_{i % 20}", score=lambda i: 1 - i / 10000):
+        items = []
+        for i in range(n):
+            item = create_test_item(url=f"https://example.com/{i}", source_type=f"type_{i % 5}")
+            item.source = source(i)
+            item.score = score(i)
+            items.append(item)
+        return items
+
+    def test_small_pool_unchanged(self):
+        items = self.make_items(30)
+        relevant, candidates = shortlist_for_selection(items[:10], items[10:], max_count=10)
+        assert relevant == items[:10] and candidates == items[10:]
+
+    def test_shortlist_size_independent_of_intake(self):
+        for n in (100, 1000, 10000):
+            items = self.make_items(n, score=lambda i, n=n: random.Random(i).random())
+            relevant, candidates = shortlist_for_selection(
+                items[: n // 2], items[n // 2 :], max_count=10, factor=5
+            )
+            kept = relevant + candidates
+            assert len(kept) == 50
+            # 保留的是评分最高的条目，各自保持原顺序
+            threshold = sorted((i.score for i in items), reverse=True)[49]
+            assert all(item.score >= threshold for item in kept)
+            kept_ids = {id(i) for i in kept}
+            assert [id(i) for i in relevant] == [
+                id(i) for i in items[: n // 2] if id(i) in kept_ids
+            ]
+
+    def test_source_quota_relaxed_by_factor(self):
+        # 前 100 条都来自同一个来源且评分最高
+        items = self.make_items(200, source=lambda i: "Dominant" if i < 100 else f"other_{i}")
+        relevant, candidates = shortlist_for_selection([], items, max_count=10, factor=2)
+        assert relevant == []
+        assert len(candidates) == 20
+        assert sum(1 for i in candidates if i.source == "Dominant") == 6  # 3 × 2
+
+    def test_disabled(self):
+        items = self.make_items(500)
+        relevant, candidates = shortlist_for_selection(items, [], max_count=10, factor=0)
+        assert len(relevant) == 500
+
 
 class TestFingerprint:
     """指纹测试"""
@@ -0,0 +1,160 @@
+"""测试报道聚类"""
+
+from datetime import datetime, timedelta, timezone
+
+from models import NewsItem
+from processing import merge_stories
+from stories import cluster_stories, linked_urls, normalize_url, title_entities
+
+NOW = datetime.now(timezone.utc)
+
+
+def make_item(title, source, url, content="", score=1.0, hours_ago=1):
+    return NewsItem(
+        title=title,
+        url=url,
+        source=source,
+        source_type="rss",
+        content=content,
+        published_at=NOW - timedelta(hours=hours_ago),
+        score=score,
+    )
+
+
+LAUNCH_BODY = (
+    "OpenAI released GPT-5.1 Codex Max, a coding model that works across long sessions "
+    "and compacts its own context."
+)
+
+
+def launch_reports():
+    return [
+        make_item(
+            "OpenAI unveils GPT-5.1 Codex Max for agentic coding",
+            "VentureBeat",
+            "https://venturebeat.com/ai/openai-gpt-5-1-codex-max",
+            LAUNCH_BODY,
+            score=0.9,
+        ),
+        make_item(
+            "GPT-5.1-Codex-Max: long-running coding agents",
+            "Hacker News",
+            "https://news.ycombinator.com/item?id=1",
+            "Discussion of https://openai.com/index/gpt-5-1-codex-max/",
+            score=0.7,
+        ),
+        make_item(
+            "OpenAI 发布 GPT-5.1 Codex Max，可连续编程数小时",
+            "机器之心",
+            "https://www.jiqizhixin.com/articles/1",
+            LAUNCH_BODY,
+            score=0.8,
+        ),
+        make_item(
+            "Codex Max is here",
+            "r/OpenAI",
+            "https://reddit.com/r/OpenAI/1",
+            "Blog post: https://openai.com/index/gpt-5-1-codex-max?utm_source=reddit",
+            score=0.5,
+        ),
+    ]
+
+
+class TestHelpers:
+    """链接规范化与实体抽取"""
+
+    def test_normalize_url(self):
+        assert normalize_url("https://www.Example.com/a/?utm_source=x&id=2#top") == (
+            "example.com/a?id=2"
+        )
+        assert normalize_url("http://example.com/a") == normalize_url("https://example.com/a/")
+
+    def test_linked_urls_skip_homepages(self):
+        item = make_item(
+            "t", "s", "https://example.com", "see https://foo.com and https://foo.com/x."
+        )
+        assert linked_urls(item) == {"foo.com/x"}
+
+    def test_title_entities(self):
+        assert title_entities("OpenAI 发布 GPT-5.1 Codex Max") == {
+            "openai",
+            "gpt-5.1",
+            "gpt",
+            "5.1",
+            "codex",
+            "max",
+        }
+        assert title_entities("How the New Model Works in 2025") == {"works"}
+
+
+class TestClusterStories:
+    """聚类规则"""
+
+    def test_same_event_grouped(self):
+        items = launch_reports()
+        stories = cluster_stories(items)
+
+        assert len(stories) == 1
+        story = stories[0]
+        assert story.representative is items[0]  # 评分最高
+        assert story.sources == ["VentureBeat", "机器之心", "Hacker News", "r/OpenAI"]
+
+    def test_single_shared_entity_not_enough(self):
+        items = [
+            make_item("Anthropic raises $13B Series F", "TechCrunch", "https://a.com/1"),
+            make_item("Anthropic ships Claude for Chrome", "The Verge", "https://b.com/2"),
+        ]
+        assert len(cluster_stories(items)) == 2
+
+    def test_common_entities_ignored(self):
+        # 每条都出现的实体不作为证据
+        topics = [
+            "earnings",
+            "supply chain",
+            "export rules",
+            "gaming GPUs",
+            "robotics lab",
+            "data centers",
+            "driver bugs",
+            "India deal",
+            "stock split",
+            "quantum push",
+            "auto partners",
+            "lawsuit",
+        ]
+        items = [
+            make_item(f"Nvidia Blackwell: {topic}", "s", f"https://a.com/{n}")
+            for n, topic in enumerate(topics)
+        ]
+        assert len(cluster_stories(items, max_entity_items=8)) == len(topics)
+
+    def test_time_window(self):
+        items = launch_reports()[:3]
+        items[2].published_at = NOW - timedelta(days=5)
+        stories = cluster_stories(items, window_hours=48)
+        assert [len(s.members) for s in stories] == [2, 1]
+
+    def test_order_follows_representatives(self):
+        unrelated = make_item("Mistral funding round", "s", "https://m.com/1", score=2.0)
+        items = [*launch_reports(), unrelated]
+        stories = cluster_stories(items)
+        assert [s.representative.title for s in stories] == [items[0].title, unrelated.title]
+
+
+class TestMergeStories:
+    """只把代表条目交给 LLM 阶段"""
+
+    def test_representatives_with_provenance(self):
+        reports = launch_reports()
+        other = make_item("Mistral funding round", "s", "https://m.com/1")
+        relevant, candidates = merge_stories(reports[2:3], [*reports[:2], reports[3], other])
+
+        # story 中有白名单条目，代表条目视为已确认相关
+        assert [item.title for item in relevant] == [reports[0].title]
+        assert [item.title for item in candidates] == [other.title]
+        assert reports[0].related == (
+            ("机器之心", "https://www.jiqizhixin.com/articles/1"),
+            ("Hacker News", "https://news.ycombinator.com/item?id=1"),
+            ("r/OpenAI", "https://reddit.com/r/OpenAI/1"),
+        )
+        assert other.related == ()
@@ -0,0 +1,91 @@
+"""测试 token 估算与批次装箱"""
+
+from tokens import TokenBudget, estimate_tokens, pack_batches, truncate_to_tokens
+
+
+class TestEstimateTokens:
+    """token 估算测试"""
+
+    def test_english(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("a" * 40) == 10
+
+    def test_chinese_costs_more_per_char(self):
+        english = "OpenAI releases a new model"
+        chinese = "国产大模型发布新版本性能提升"
+        assert estimate_tokens(chinese) == len(chinese)
+        assert estimate_tokens(chinese) / len(chinese) > estimate_tokens(english) / len(english)
+
+    def test_mixed(self):
+        # 4 个中文字符 + 8 个其他字符
+        assert estimate_tokens("发布 GPT-5 模型") == 6
+
+
+class TestTruncate:
+    """按 token 截断测试"""
+
+    def test_short_text_unchanged(self):
+        assert truncate_to_tokens("short text", 100) == "short text"
+
+    def test_longest_prefix_within_budget(self):
+        text = "国产大模型 hello world " * 20
+        truncated = truncate_to_tokens(text, 30)
+        assert text.startswith(truncated)
+        assert estimate_tokens(truncated) <= 30
+        assert estimate_tokens(text[: len(truncated) + 1]) > 30
+
+    def test_same_budget_keeps_fewer_chinese_chars(self):
+        assert len(truncate_to_tokens("模" * 500, 50)) == 50
+        assert len(truncate_to_tokens("m" * 500, 50)) == 200
+
+    def test_zero_budget(self):
+        assert truncate_to_tokens("anything", 0) == ""
+
+
+class TestPackBatches:
+    """批次装箱测试"""
+
+    def test_fills_up_to_input_budget(self):
+        budget = TokenBudget(context_window=1000, max_output_tokens=100)  # 输入 800
+        batches = pack_batches(
+            [300] * 7,
+            cost=int,
+            budget=budget,
+            overhead_tokens=200,
+            output_tokens_per_item=10,
+            max_items=50,
+        )
+        assert [len(b) for b in batches] == [2, 2, 2, 1]
+
+    def test_output_budget_and_max_items(self):
+        budget = TokenBudget(context_window=100_000, max_output_tokens=100)
+        by_output = pack_batches(
+            [1] * 25,
+            cost=int,
+            budget=budget,
+            overhead_tokens=0,
+            output_tokens_per_item=10,
+            max_items=50,
+        )
+        assert [len(b) for b in by_output] == [10, 10, 5]
+        by_count = pack_batches(
+            [1] * 25,
+            cost=int,
+            budget=budget,
+            overhead_tokens=0,
+            output_tokens_per_item=1,
+            max_items=8,
+        )
+        assert [len(b) for b in by_count] == [8, 8, 8, 1]
+
+    def test_oversized_item_alone(self):
+        budget = TokenBudget(context_window=1000, max_output_tokens=100)
+        batches = pack_batches(
+            [100, 5000, 100],
+            cost=int,
+            budget=budget,
+            overhead_tokens=0,
+            output_tokens_per_item=1,
+            max_items=10,
+        )
+        assert batches == [[100], [5000], [100]]
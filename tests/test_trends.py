@@ -0,0 +1,144 @@
+"""测试升温话题检测"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from models import NewsItem
+from processing import boost_trending
+from trends import CountMinSketch, Trend, TrendTracker, title_terms
+
+BACKGROUND = [
+    "Anthropic updates Claude apps",
+    "Nvidia earnings beat estimates",
+    "Hugging Face hosts new datasets",
+    "Mistral raises funding",
+    "Google Gemini adds features",
+]
+
+
+def make_item(title, score=1.0):
+    return NewsItem(
+        title=title,
+        url=f"https://example.com/{abs(hash(title))}",
+        source="s",
+        source_type="rss",
+        content="",
+        published_at=datetime(2026, 3, 1, tzinfo=timezone.utc),
+        score=score,
+    )
+
+
+def tracker_with_history(days=7):
+    tracker = TrendTracker("2026-03-10")
+    for n in range(1, days + 1):
+        day = TrendTracker(f"2026-03-{10 - n:02d}")
+        day.observe(make_item(title) for title in BACKGROUND * 4)
+        tracker.history[day.today] = (day.current, day.items)
+    return tracker
+
+
+class TestTitleTerms:
+    """标题分词"""
+
+    def test_terms(self):
+        assert title_terms("OpenAI ships GPT-5.1 Codex Max in 2026") == {
+            "openai",
+            "ships",
+            "gpt-5.1",
+            "codex",
+            "max",
+            "openai ships",
+            "ships gpt-5.1",
+            "gpt-5.1 codex",
+            "codex max",
+        }
+
+    def test_chinese_bigrams(self):
+        assert title_terms("智谱开源") == {"智谱", "谱开", "开源"}
+
+
+class TestCountMinSketch:
+    """计数估计与合并"""
+
+    def test_estimates_never_below_truth(self):
+        rng = np.random.default_rng(0)
+        words = [f"w{n}" for n in rng.integers(0, 2000, 20000)]
+        sketch = CountMinSketch(width=512, depth=4)
+        sketch.add(words)
+        truth = {w: words.count(w) for w in set(words[:200])}
+        estimates = sketch.estimate(list(truth))
+
+        assert all(est >= true for est, true in zip(estimates, truth.values(), strict=True))
+        over = estimates - np.array(list(truth.values()))
+        assert (over <= sketch.error_bound).mean() > 0.9
+
+    def test_merge(self):
+        a, b, both = CountMinSketch(), CountMinSketch(), CountMinSketch()
+        a.add(["x", "y"])
+        b.add(["x"])
+        both.add(["x", "y", "x"])
+        a += b
+        assert np.array_equal(a.counts, both.counts)
+        assert a.total == 3
+        assert a.estimate(["x", "y", "z"]).tolist() == [2, 1, 0]
+
+
+class TestTrendTracker:
+    """与历史比较"""
+
+    def test_surging_terms(self):
+        tracker = tracker_with_history()
+        tracker.observe(
+            make_item(title)
+            for title in [*BACKGROUND, *[f"Codex Max review {n}" for n in range(6)]]
+        )
+        trends = tracker.surging(top_k=5, min_count=3, min_surge=3.0)
+
+        terms = [trend.term for trend in trends]
+        # 词组优先，其中的单词不再单独列出；背景中每天都有的词不算升温
+        assert terms == ["codex max", "review"]
+        assert not set(terms) & {"anthropic", "nvidia", "mistral"}
+        assert all(trend.count >= 6 and trend.expected == 0 for trend in trends)
+
+    def test_no_history(self):
+        tracker = TrendTracker("2026-03-10")
+        tracker.observe(make_item("Codex Max") for _ in range(10))
+        assert tracker.surging() == []
+
+    def test_save_and_load_window(self, tmp_path):
+        path = str(tmp_path / "trends.npz")
+        tracker = tracker_with_history(days=7)
+        tracker.observe([make_item("Codex Max")])
+        tracker.save(path)
+
+        # 次日加载：包括前一天写入的当天 sketch，超出窗口的天数不加载
+        loaded = TrendTracker.load(path, "2026-03-11", window_days=5)
+        assert sorted(loaded.history) == [f"2026-03-{d:02d}" for d in range(6, 11)]
+        assert loaded.history["2026-03-10"][1] == 1
+        assert np.array_equal(
+            loaded.history["2026-03-09"][0].counts, tracker.history["2026-03-09"][0].counts
+        )
+
+        # 同一天重复运行：当天的 sketch 不加载
+        assert "2026-03-10" not in TrendTracker.load(path, "2026-03-10").history
+
+    def test_size_change_or_corrupt_file_resets(self, tmp_path):
+        path = str(tmp_path / "trends.npz")
+        tracker_with_history().save(path)
+        assert TrendTracker.load(path, "2026-03-10", width=1024).history == {}
+
+        (tmp_path / "broken.npz").write_bytes(b"not a zip")
+        assert TrendTracker.load(str(tmp_path / "broken.npz"), "2026-03-10").history == {}
+
+
+class TestBoostTrending:
+    """标题含升温话题的条目加分"""
+
+    def test_boost(self):
+        items = [make_item("Codex Max is here", 1.0), make_item("Max Planck news", 2.0)]
+        trends = [Trend("codex max", 6, 0.0, 7.0)]
+
+        assert boost_trending(items, trends, 0.2) == 1
+        assert [item.score for item in items] == [1.2, 2.0]
+        assert boost_trending(items, [], 0.2) == 0
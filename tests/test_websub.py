@@ -0,0 +1,208 @@
+"""测试 WebSub 推送采集（使用本地 hub 替身）"""
+
+import hashlib
+import hmac
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from websub import (
+    PushBuffer,
+    SubscriptionStore,
+    WebSubCollector,
+    WebSubReceiver,
+    WebSubSubscriber,
+    topic_token,
+    verify_signature,
+)
+
+TOPIC = "https://example.com/feed.xml"
+
+ATOM_FEED = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example AI Blog</title>
+  <link rel="hub" href="https://hub.example.com/"/>
+  <link rel="self" href="https://example.com/feed.xml"/>
+  <entry>
+    <title>OpenAI releases a new reasoning model</title>
+    <link href="https://example.com/posts/1"/>
+    <updated>2026-01-01T08:00:00Z</updated>
+    <summary>&lt;p&gt;The model improves math benchmarks.&lt;/p&gt;</summary>
+  </entry>
+</feed>
+"""
+
+
+class FakeHub:
+    """本地 hub 替身：收到订阅请求后回调验证 challenge"""
+
+    def __init__(self):
+        self.requests: list[dict] = []
+        self.challenge_echoed = threading.Event()
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                params = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+                hub.requests.append(params)
+                self.send_response(202)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                threading.Thread(target=hub.verify, args=(params,)).start()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def verify(self, params: dict) -> None:
+        resp = httpx.get(
+            params["hub.callback"],
+            params={
+                "hub.mode": "subscribe",
+                "hub.topic": params["hub.topic"],
+                "hub.challenge": "challenge-123",
+                "hub.lease_seconds": "3600",
+            },
+        )
+        if resp.status_code == 200 and resp.text == "challenge-123":
+            self.challenge_echoed.set()
+
+    def publish(self, params: dict, body: bytes, secret: str | None = None) -> httpx.Response:
+        digest = hmac.new((secret or params["hub.secret"]).encode(), body, "sha256").hexdigest()
+        return httpx.post(
+            params["hub.callback"],
+            content=body,
+            headers={
+                "Content-Type": "application/atom+xml",
+                "X-Hub-Signature": f"sha256={digest}",
+            },
+        )
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def receiver(tmp_path):
+    store = SubscriptionStore(str(tmp_path / "subs.json"))
+    buffer = PushBuffer(str(tmp_path / "buffer.jsonl"))
+    receiver = WebSubReceiver(store, buffer, host="127.0.0.1", port=0)
+    receiver.start()
+    yield receiver
+    receiver.stop()
+
+
+@pytest.fixture
+def hub():
+    hub = FakeHub()
+    yield hub
+    hub.close()
+
+
+def _subscribe(receiver, hub):
+    subscriber = WebSubSubscriber(receiver.store, f"{receiver.url}/websub", "global-secret")
+    assert subscriber.subscribe(hub.url, TOPIC, "Example Blog", TOPIC)
+    assert hub.challenge_echoed.wait(timeout=5)
+    return hub.requests[0]
+
+
+class TestVerifySignature:
+    """签名校验测试"""
+
+    def test_valid_signature(self):
+        body = b"payload"
+        digest = hmac.new(b"secret", body, hashlib.sha1).hexdigest()
+        assert verify_signature("secret", body, f"sha1={digest}")
+
+    def test_invalid_signature(self):
+        assert not verify_signature("secret", b"payload", "sha256=deadbeef")
+
+    def test_missing_or_unknown_method(self):
+        assert not verify_signature("secret", b"payload", None)
+        assert not verify_signature("secret", b"payload", "md5=abc")
+
+
+class TestWebSubFlow:
+    """订阅-验证-推送完整流程"""
+
+    def test_subscription_verified(self, receiver, hub):
+        _subscribe(receiver, hub)
+
+        active = receiver.store.active()
+        assert len(active) == 1
+        assert active[0]["topic"] == TOPIC
+        assert active[0]["feed_url"] == TOPIC
+
+    def test_signed_push_reaches_buffer(self, receiver, hub):
+        params = _subscribe(receiver, hub)
+
+        resp = hub.publish(params, ATOM_FEED.encode())
+        assert resp.status_code == 202
+
+        items = WebSubCollector(receiver.buffer).collect()
+        assert len(items) == 1
+        assert items[0].title == "OpenAI releases a new reasoning model"
+        assert items[0].source == "Example Blog"
+        assert items[0].source_type == "rss"
+        assert items[0].content == "The model improves math benchmarks."
+        assert items[0].fingerprint
+
+        # 取出后缓冲区清空
+        assert WebSubCollector(receiver.buffer).collect() == []
+
+    def test_bad_signature_ignored(self, receiver, hub):
+        params = _subscribe(receiver, hub)
+
+        resp = hub.publish(params, ATOM_FEED.encode(), secret="wrong-secret")
+        assert resp.status_code == 202
+        assert receiver.buffer.drain() == []
+
+    def test_unknown_callback_rejected(self, receiver):
+        resp = httpx.post(f"{receiver.url}/websub/{topic_token('other')}", content=b"x")
+        assert resp.status_code == 410
+
+    def test_verification_with_wrong_topic_rejected(self, receiver, hub):
+        params = _subscribe(receiver, hub)
+
+        resp = httpx.get(
+            params["hub.callback"],
+            params={"hub.mode": "subscribe", "hub.topic": "https://evil.com/feed"},
+        )
+        assert resp.status_code == 404
+
+    def test_subscribe_discovered_skips_active(self, receiver, hub):
+        _subscribe(receiver, hub)
+        subscriber = WebSubSubscriber(receiver.store, f"{receiver.url}/websub", "global-secret")
+
+        # 租约 3600 秒，不足续订阈值，会再次订阅
+        requested = subscriber.subscribe_discovered({"Example Blog": (hub.url, TOPIC, TOPIC)})
+        assert requested == 1
+
+    def test_expiring_lease_renewed_without_fetching_feed(self, receiver, hub):
+        _subscribe(receiver, hub)
+        subscriber = WebSubSubscriber(receiver.store, f"{receiver.url}/websub", "global-secret")
+        hub.challenge_echoed.clear()
+
+        # 租约有效的 feed 被跳过轮询，没有出现在 discovered_hubs 中，仍按订阅记录续订
+        assert subscriber.subscribe_discovered({}) == 1
+        assert hub.challenge_echoed.wait(timeout=5)
+        assert [r["hub.topic"] for r in hub.requests] == [TOPIC, TOPIC]
+        assert receiver.store.active()[0]["source"] == "Example Blog"
+
+    def test_verification_requires_lease_seconds(self, receiver, hub):
+        params = _subscribe(receiver, hub)
+
+        for lease in (None, "abc", "-5"):
+            query = {"hub.mode": "subscribe", "hub.topic": TOPIC, "hub.challenge": "c"}
+            if lease is not None:
+                query["hub.lease_seconds"] = lease
+            resp = httpx.get(params["hub.callback"], params=query)
+            assert resp.status_code == 400
@@ -0,0 +1,107 @@
+"""
+Token 估算与批次装箱
+
+不依赖具体模型的分词器，按字符类别估算 token 数：
+- 中日韩字符（含全角标点）每字约 1 个 token（各家分词器在 0.6~1.5 之间，取偏保守的值）
+- 其余字符（英文、数字、空白、半角标点）约 4 个字符 1 个 token
+
+估算只用于决定每个请求装多少条目，宁可略微高估也不要撑爆上下文窗口。
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_WIDE_CHAR = re.compile(
+    r"[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]"
+)
+_WIDE_TOKENS = 1.0
+_CHARS_PER_TOKEN = 4
+# 估算误差与消息格式（role、分隔符等）的余量：只使用上下文窗口的 90%
+_CONTEXT_MARGIN = 0.9
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本的 token 数"""
+    if not text:
+        return 0
+    if text.isascii():
+        return math.ceil(len(text) / _CHARS_PER_TOKEN)
+    wide = len(_WIDE_CHAR.findall(text))
+    return math.ceil(wide * _WIDE_TOKENS + (len(text) - wide) / _CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """按估算 token 数截断文本（替代按字符数截断，中英文截断后的长度大致相当）"""
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # 每个字符至少 1/4 个 token，更长的前缀必然超出预算；在此范围内二分查找最长前缀
+    lo, hi = 0, min(len(text), max_tokens * _CHARS_PER_TOKEN)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
+
+
+@dataclass(frozen=True)
+class TokenBudget:
+    """单次请求的 token 预算"""
+
+    context_window: int  # 输入 + 输出的总上限
+    max_output_tokens: int  # 单次响应的输出上限
+
+    @property
+    def input_tokens(self) -> int:
+        """可用于 prompt 的 token 数（扣除输出预留和余量）"""
+        return max(0, int(self.context_window * _CONTEXT_MARGIN) - self.max_output_tokens)
+
+
+def pack_batches(
+    items: Iterable[T],
+    cost: Callable[[T], int],
+    budget: TokenBudget,
+    overhead_tokens: int,
+    output_tokens_per_item: int,
+    max_items: int,
+) -> list[list[T]]:
+    """
+    按 token 预算把条目依次装进批次（保持原顺序）
+
+    cost: 单个条目在 prompt 中占用的 token 数
+    overhead_tokens: prompt 中与条目无关的固定部分（说明、格式要求等）
+    output_tokens_per_item: 响应中每个条目预计占用的 token 数
+    max_items: 每批条目数上限（避免单批过大、失败时影响面过大）
+
+    当前批次的输入或输出预算放不下下一个条目时另起一批；单个条目超出预算时单独成批
+    """
+    input_budget = budget.input_tokens - overhead_tokens
+    output_budget = budget.max_output_tokens
+    batches: list[list[T]] = []
+    batch: list[T] = []
+    used_input = used_output = 0
+    for item in items:
+        item_cost = cost(item)
+        if batch and (
+            len(batch) >= max_items
+            or used_input + item_cost > input_budget
+            or used_output + output_tokens_per_item > output_budget
+        ):
+            batches.append(batch)
+            batch, used_input, used_output = [], 0, 0
+        batch.append(item)
+        used_input += item_cost
+        used_output += output_tokens_per_item
+    if batch:
+        batches.append(batch)
+    return batches
@@ -0,0 +1,261 @@
+"""
+升温话题检测：今天标题中出现的词与过去几周相比明显增多的词
+
+每天一个固定大小的 count-min sketch（depth × width 的计数矩阵），按条目记录当天各标题词的出现次数，
+采集后一次遍历写入。历史只保留最近 window_days 天的 sketch，各天相加即为滚动窗口的计数
+（同尺寸的 sketch 可直接相加合并），内存和存储只与窗口天数有关，不随历史长度和词表大小增长。
+
+sketch 的计数只会高估，误差不超过 e / width × 写入总数的概率为 1 - e^-depth（error_bound）。
+比较时今天的计数取下界（估计值减去误差上限），历史计数取估计值本身，误差只会让结果更保守。
+候选词来自今天的标题（sketch 本身不能列出词），升温程度为 (今天下界 + 1) / (按历史频率推算的今天条数 + 1)。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import unicodedata
+import zipfile
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+
+from compression import STOP_WORDS
+from models import NewsItem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTH = 2**14
+DEFAULT_DEPTH = 4
+
+# 英文词（含型号：gpt-5.1、c++、llama-3）与连续汉字
+_LATIN = re.compile(r"[a-z0-9][a-z0-9.+-]*[a-z0-9+]|[a-z]")
+_TOKEN = re.compile(rf"{_LATIN.pattern}|[\u4e00-\u9fff]+")
+# 标题中常见但不表示话题的词
+_TITLE_STOP_WORDS = STOP_WORDS | frozenset(
+    "new how why about after more now out up vs via show ask tell using use based "
+    "launch launches launched release releases released announces introducing update "
+    "today week first open source model models ai".split()
+)
+
+
+def title_terms(title: str) -> set[str]:
+    """
+    标题中的词：英文单词（去掉停用词和纯数字）、相邻两个英文单词组成的词组、中文连续汉字的 2-gram
+    同一标题中重复出现的词只算一次（计数为出现该词的条目数）
+    """
+    text = unicodedata.normalize("NFKC", title).lower()
+    terms: set[str] = set()
+    previous: str | None = None
+    for token in _TOKEN.findall(text):
+        if not token.isascii():
+            terms.update(token[i : i + 2] for i in range(len(token) - 1))
+            previous = None
+            continue
+        if token in _TITLE_STOP_WORDS or token.isdigit() or len(token) < 2:
+            previous = None
+            continue
+        terms.add(token)
+        if previous is not None:
+            terms.add(f"{previous} {token}")
+        previous = token
+    return terms
+
+
+class CountMinSketch:
+    """depth 行 width 列的计数矩阵，每个词在每行按独立的哈希落到一列；估计值取各行的最小值"""
+
+    def __init__(
+        self,
+        width: int = DEFAULT_WIDTH,
+        depth: int = DEFAULT_DEPTH,
+        counts: np.ndarray | None = None,
+    ) -> None:
+        self.width = width
+        self.depth = depth
+        self.counts = np.zeros((depth, width), dtype=np.uint32) if counts is None else counts
+        self.total = int(self.counts[0].sum())
+
+    def _columns(self, terms: list[str]) -> np.ndarray:
+        """(depth, len(terms)) 的列下标：双重哈希 h1 + i × h2"""
+        digests = b"".join(
+            hashlib.blake2b(term.encode("utf-8"), digest_size=16).digest() for term in terms
+        )
+        hashes = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return (
+            (hashes[:, 0] + rows * (hashes[:, 1] | np.uint64(1))) % np.uint64(self.width)
+        ).astype(np.intp)
+
+    def add(self, terms: Iterable[str]) -> None:
+        """每个词计数加一（重复的词重复计数）"""
+        terms = list(terms)
+        if not terms:
+            return
+        flat = self._columns(terms) + (np.arange(self.depth) * self.width)[:, None]
+        np.add.at(self.counts.reshape(-1), flat.reshape(-1), 1)
+        self.total += len(terms)
+
+    def estimate(self, terms: list[str]) -> np.ndarray:
+        """各词计数的估计值（不低于真实值）"""
+        if not terms:
+            return np.zeros(0, dtype=np.int64)
+        columns = self._columns(terms)
+        rows = np.arange(self.depth)[:, None]
+        return self.counts[rows, columns].min(axis=0).astype(np.int64)
+
+    @property
+    def error_bound(self) -> float:
+        """估计值比真实值最多高出多少（概率 1 - e^-depth）"""
+        return math.e / self.width * self.total
+
+    def __iadd__(self, other: CountMinSketch) -> CountMinSketch:
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("cannot merge sketches of different sizes")
+        self.counts += other.counts
+        self.total += other.total
+        return self
+
+
+@dataclass(frozen=True)
+class Trend:
+    term: str
+    count: int  # 今天出现该词的条目数（估计值）
+    expected: float  # 按过去几周的频率推算，今天应有的条目数
+    surge: float  # 升温程度：(今天下界 + 1) / (expected + 1)
+
+
+class TrendTracker:
+    """
+    按天保存的标题词 sketch
+    当天的 sketch 不加载：同一天重复运行时由本次运行重新写入（与 SimHashIndex 相同）
+    """
+
+    def __init__(
+        self,
+        today: str,
+        window_days: int = 28,
+        width: int = DEFAULT_WIDTH,
+        depth: int = DEFAULT_DEPTH,
+    ) -> None:
+        self.today = today
+        self.window_days = window_days
+        self.width = width
+        self.depth = depth
+        # 历史：{日期: (sketch, 条目数)}
+        self.history: dict[str, tuple[CountMinSketch, int]] = {}
+        self.current = CountMinSketch(width, depth)
+        self.items = 0
+        self._candidates: set[str] = set()
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        today: str,
+        window_days: int = 28,
+        width: int = DEFAULT_WIDTH,
+        depth: int = DEFAULT_DEPTH,
+    ) -> TrendTracker:
+        """加载最近 window_days 天（不含今天）的 sketch；尺寸改变或文件损坏时从空历史开始"""
+        tracker = cls(today, window_days, width, depth)
+        if not os.path.exists(path):
+            return tracker
+        oldest = (date.fromisoformat(today) - timedelta(days=window_days)).isoformat()
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                if (meta["width"], meta["depth"]) != (width, depth):
+                    logger.warning("Trend sketch size changed, starting a new history")
+                    return tracker
+                for day, items in meta["items"].items():
+                    if oldest <= day < today:
+                        sketch = CountMinSketch(width, depth, data[f"day_{day}"].astype(np.uint32))
+                        tracker.history[day] = (sketch, items)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            logger.warning(f"Failed to load trend history from {path}: {e}")
+            tracker.history.clear()
+        return tracker
+
+    def save(self, path: str) -> None:
+        days = dict(self.history)
+        if self.items:
+            days[self.today] = (self.current, self.items)
+        meta = {
+            "width": self.width,
+            "depth": self.depth,
+            "items": {day: items for day, (_, items) in days.items()},
+        }
+        arrays = {f"day_{day}": sketch.counts for day, (sketch, _) in days.items()}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp, path)
+
+    def observe(self, items: Iterable[NewsItem]) -> None:
+        """把今天的条目标题写入当天的 sketch（每个词每条计一次）"""
+        terms: list[str] = []
+        for item in items:
+            item_terms = title_terms(item.title)
+            terms.extend(item_terms)
+            self._candidates.update(item_terms)
+            self.items += 1
+        self.current.add(terms)
+
+    def surging(self, top_k: int = 5, min_count: int = 3, min_surge: float = 3.0) -> list[Trend]:
+        """
+        今天明显升温的词，按升温程度排序
+        - min_count: 今天至少出现在这么多条目中（取计数下界）
+        - min_surge: 升温程度下限
+        已选中的词包含的单词（或汉字）不再重复入选（"codex max" 入选后不再单独列出 "codex"）
+        没有历史时返回空列表
+        """
+        history_items = sum(items for _, items in self.history.values())
+        if not self._candidates or not history_items or not self.items:
+            return []
+        baseline = CountMinSketch(self.width, self.depth)
+        for sketch, _ in self.history.values():
+            baseline += sketch
+
+        terms = sorted(self._candidates)
+        counts = self.current.estimate(terms)
+        lower = np.maximum(counts - self.current.error_bound, 0)
+        expected = baseline.estimate(terms) * (self.items / history_items)
+        surge = (lower + 1) / (expected + 1)
+
+        selected = np.flatnonzero((lower >= min_count) & (surge >= min_surge))
+        # 同样升温时词组优先（"codex max" 比单独的 "codex"、"max" 信息更完整）
+        ranked = sorted(
+            selected.tolist(),
+            key=lambda i: (-surge[i], -counts[i], -len(_parts(terms[i])), terms[i]),
+        )
+        trends: list[Trend] = []
+        covered: set[str] = set()
+        for i in ranked:
+            parts = _parts(terms[i])
+            if parts & covered:
+                continue
+            covered |= parts
+            trends.append(
+                Trend(
+                    terms[i],
+                    int(counts[i]),
+                    round(float(expected[i]), 2),
+                    round(float(surge[i]), 2),
+                )
+            )
+            if len(trends) >= top_k:
+                break
+        return trends
+
+
+def _parts(term: str) -> set[str]:
+    """词组的单词；中文 2-gram 的汉字"""
+    return set(term.split()) if term.isascii() else set(term)
@@ -0,0 +1,385 @@
+"""
+WebSub (PubSubHubbub) 推送采集
+
+支持 WebSub 的 feed 会在 <link rel="hub"> 中声明 hub。订阅后 hub 会在内容更新时
+主动 POST 到本地回调端点，接收端校验签名后把条目转换为 NewsItem 写入推送缓冲区，
+日常运行时由 WebSubCollector 取出，与轮询结果一起进入处理流程。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import feedparser
+import httpx
+
+from collectors import BaseCollector, RSSCollector
+from models import NewsItem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_PATH = os.path.join("data", "websub_buffer.jsonl")
+DEFAULT_SUBSCRIPTIONS_PATH = os.path.join("data", "websub_subscriptions.json")
+
+# 推送内容大小上限，防止异常请求占满内存
+MAX_BODY_BYTES = 5 * 1024 * 1024
+
+# 租约剩余不足该时长时重新订阅
+RENEW_BEFORE_SECONDS = 86400
+
+SIGNATURE_ALGORITHMS = {
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "sha384": hashlib.sha384,
+    "sha512": hashlib.sha512,
+}
+
+
+def verify_signature(secret: str, body: bytes, header: str | None) -> bool:
+    """校验 X-Hub-Signature 头（格式: method=hexdigest）"""
+    if not secret or not header or "=" not in header:
+        return False
+    method, _, signature = header.partition("=")
+    digestmod = SIGNATURE_ALGORITHMS.get(method.strip().lower())
+    if digestmod is None:
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, digestmod).hexdigest()
+    return hmac.compare_digest(expected, signature.strip().lower())
+
+
+class PushBuffer:
+    """
+    推送条目缓冲区（JSONL 文件）
+    接收端追加写入，日常运行时一次性取出；取出时先原子重命名文件，避免与写入竞争
+    """
+
+    def __init__(self, path: str = DEFAULT_BUFFER_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, items: list[NewsItem]) -> None:
+        if not items:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        lines = [json.dumps(_item_to_dict(item), ensure_ascii=False) for item in items]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def drain(self) -> list[NewsItem]:
+        draining = f"{self.path}.{os.getpid()}.draining"
+        with self._lock:
+            try:
+                os.replace(self.path, draining)
+            except FileNotFoundError:
+                return []
+
+        items: list[NewsItem] = []
+        with open(draining, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    items.append(_item_from_dict(json.loads(line)))
+                except Exception as e:
+                    logger.warning(f"Skip malformed WebSub buffer line: {e}")
+        os.remove(draining)
+        return items
+
+
+class SubscriptionStore:
+    """
+    订阅状态（JSON 文件）
+    以回调 token 为键，记录 topic、hub、来源名、租约到期时间和是否已通过 hub 验证
+    """
+
+    def __init__(self, path: str = DEFAULT_SUBSCRIPTIONS_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._subs: dict[str, dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._subs = json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to load WebSub subscriptions: {e}")
+
+    def get(self, token: str) -> dict | None:
+        with self._lock:
+            sub = self._subs.get(token)
+            return dict(sub) if sub else None
+
+    def upsert(self, token: str, **fields) -> None:
+        with self._lock:
+            self._subs.setdefault(token, {}).update(fields)
+            self._save()
+
+    def remove(self, token: str) -> None:
+        with self._lock:
+            self._subs.pop(token, None)
+            self._save()
+
+    def active(self, now: float | None = None) -> list[dict]:
+        """已验证且租约未过期的订阅"""
+        now = now or time.time()
+        with self._lock:
+            return [
+                dict(sub)
+                for sub in self._subs.values()
+                if sub.get("verified") and sub.get("lease_expires", 0) > now
+            ]
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._subs, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+
+def topic_token(topic: str) -> str:
+    """每个 topic 使用独立的回调路径，接收推送时据此找到订阅"""
+    return hashlib.sha256(topic.encode("utf-8")).hexdigest()[:24]
+
+
+class WebSubSubscriber:
+    """向 hub 发起订阅/续订请求"""
+
+    def __init__(
+        self,
+        store: SubscriptionStore,
+        callback_url: str,
+        secret: str,
+        lease_seconds: int = 432000,
+    ) -> None:
+        self.store = store
+        self.callback_url = callback_url.rstrip("/")
+        self.secret = secret
+        self.lease_seconds = lease_seconds
+
+    def topic_secret(self, topic: str) -> str:
+        """由全局密钥派生每个 topic 的签名密钥"""
+        return hmac.new(self.secret.encode("utf-8"), topic.encode("utf-8"), "sha256").hexdigest()
+
+    def subscribe(self, hub: str, topic: str, source: str, feed_url: str | None = None) -> bool:
+        token = topic_token(topic)
+        self.store.upsert(
+            token,
+            hub=hub,
+            topic=topic,
+            source=source,
+            feed_url=feed_url or topic,
+            secret=self.topic_secret(topic),
+        )
+        data = {
+            "hub.mode": "subscribe",
+            "hub.topic": topic,
+            "hub.callback": f"{self.callback_url}/{token}",
+            "hub.lease_seconds": str(self.lease_seconds),
+            "hub.secret": self.topic_secret(topic),
+        }
+        try:
+            resp = httpx.post(hub, data=data, timeout=20)
+        except Exception as e:
+            logger.warning(f"WebSub subscribe to {hub} for {source} failed: {e}")
+            return False
+        if resp.status_code not in (202, 204):
+            logger.warning(f"WebSub hub {hub} rejected {source}: status {resp.status_code}")
+            return False
+        logger.info(f"WebSub subscription requested for {source} via {hub}")
+        return True
+
+    def subscribe_discovered(self, discovered: dict[str, tuple[str, str, str]]) -> int:
+        """
+        订阅采集时发现的 hub，跳过租约仍然充足的订阅；
+        并续订即将到期的已有订阅（renew_expiring），返回发起请求数
+        """
+        renew_before = time.time() + RENEW_BEFORE_SECONDS
+        requested = 0
+        for source, (hub, topic, feed_url) in discovered.items():
+            sub = self.store.get(topic_token(topic))
+            if sub and sub.get("verified") and sub.get("lease_expires", 0) > renew_before:
+                continue
+            if self.subscribe(hub, topic, source, feed_url):
+                requested += 1
+        topics = {topic for _, topic, _ in discovered.values()}
+        return requested + self.renew_expiring(skip_topics=topics)
+
+    def renew_expiring(self, skip_topics: set[str] | None = None) -> int:
+        """
+        按订阅记录中的 hub/topic 续订租约即将到期的订阅，返回发起请求数
+        租约有效的 feed 不再轮询，也就不会出现在 discovered_hubs 中，只能由这里续订
+        skip_topics: 本次已经处理过的 topic
+        """
+        renew_before = time.time() + RENEW_BEFORE_SECONDS
+        requested = 0
+        for sub in self.store.active():
+            if sub.get("lease_expires", 0) > renew_before or sub["topic"] in (skip_topics or ()):
+                continue
+            if self.subscribe(sub["hub"], sub["topic"], sub["source"], sub.get("feed_url")):
+                requested += 1
+        return requested
+
+
+class _WebSubHandler(BaseHTTPRequestHandler):
+    server: _WebSubHTTPServer
+
+    def do_GET(self) -> None:
+        """hub 的订阅意图验证：回显 hub.challenge"""
+        token = self._token()
+        params = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        mode = params.get("hub.mode", "")
+        topic = params.get("hub.topic", "")
+        store = self.server.receiver.store
+        sub = store.get(token)
+
+        if not sub or sub.get("topic") != topic:
+            self._respond(404)
+            return
+
+        if mode == "subscribe":
+            try:
+                lease = int(params["hub.lease_seconds"])
+            except (KeyError, ValueError):
+                lease = 0
+            if lease <= 0:
+                # 订阅验证请求必须带有效的租约时长
+                self._respond(400)
+                return
+            store.upsert(token, verified=True, lease_expires=time.time() + lease)
+            logger.info(f"WebSub subscription verified for {sub.get('source')} ({lease}s)")
+        elif mode == "unsubscribe":
+            store.remove(token)
+        elif mode == "denied":
+            logger.warning(f"WebSub hub denied {sub.get('source')}: {params.get('hub.reason')}")
+            store.remove(token)
+            self._respond(200)
+            return
+        else:
+            self._respond(400)
+            return
+        self._respond(200, params.get("hub.challenge", "").encode("utf-8"))
+
+    def do_POST(self) -> None:
+        """内容分发：校验签名后解析条目写入缓冲区"""
+        sub = self.server.receiver.store.get(self._token())
+        if not sub:
+            self._respond(410)
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._respond(413)
+            return
+        body = self.rfile.read(length)
+
+        # 按规范签名无效时仍返回 2xx，但丢弃内容
+        if not verify_signature(sub.get("secret", ""), body, self.headers.get("X-Hub-Signature")):
+            logger.warning(f"WebSub signature mismatch for {sub.get('source')}, ignored")
+            self._respond(202)
+            return
+
+        try:
+            count = self.server.receiver.ingest(body, sub["source"])
+            logger.info(f"WebSub received {count} items from {sub['source']}")
+        except Exception as e:
+            logger.warning(f"Failed to ingest WebSub content from {sub['source']}: {e}")
+        self._respond(202)
+
+    def _token(self) -> str:
+        return urlsplit(self.path).path.rstrip("/").rsplit("/", 1)[-1]
+
+    def _respond(self, status: int, body: bytes = b"") -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("WebSub %s - %s", self.address_string(), format % args)
+
+
+class _WebSubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    receiver: WebSubReceiver
+
+
+class WebSubReceiver:
+    """本地回调 HTTP 端点，在后台线程中运行"""
+
+    def __init__(
+        self,
+        store: SubscriptionStore,
+        buffer: PushBuffer,
+        host: str = "0.0.0.0",
+        port: int = 8765,
+    ) -> None:
+        self.store = store
+        self.buffer = buffer
+        self._converter = RSSCollector(sources_path="")
+        self._server = _WebSubHTTPServer((host, port), _WebSubHandler)
+        self._server.receiver = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def ingest(self, body: bytes, source: str) -> int:
+        feed = feedparser.parse(body)
+        items = []
+        for entry in feed.entries:
+            item = self._converter.entry_to_item(entry, source)
+            if item:
+                items.append(item)
+        self.buffer.append(items)
+        return len(items)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="websub-receiver", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"WebSub receiver listening on {self.url}")
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+class WebSubCollector(BaseCollector):
+    """取出推送缓冲区中的条目"""
+
+    source_type = "rss"
+
+    def __init__(self, buffer: PushBuffer) -> None:
+        self.buffer = buffer
+
+    def collect(self) -> list[NewsItem]:
+        return self.buffer.drain()
+
+
+def _item_to_dict(item: NewsItem) -> dict:
+    data = asdict(item)
+    data["published_at"] = item.published_at.isoformat()
+    return data
+
+
+def _item_from_dict(data: dict) -> NewsItem:
+    data = dict(data)
+    data["published_at"] = datetime.fromisoformat(data["published_at"])
+    return NewsItem(**data)